@@ -1,23 +1,47 @@
 import os
 import yaml
-from fastapi import FastAPI, HTTPException, UploadFile, File, Form, WebSocket, WebSocketDisconnect, BackgroundTasks
-from fastapi.responses import HTMLResponse, FileResponse
+from fastapi import FastAPI, HTTPException, UploadFile, File, Form, Header, Query, WebSocket, WebSocketDisconnect, BackgroundTasks
+from fastapi.responses import HTMLResponse, FileResponse, PlainTextResponse
 from fastapi.staticfiles import StaticFiles
 from pydantic import BaseModel
-from typing import List, Optional, Dict
+from typing import List, Optional, Dict, Any, Tuple
+import io
 import json
 import asyncio
+import uuid
+from contextlib import asynccontextmanager
 
-from modules.dork_loader import load_dorks
+from modules.dork_loader import parse_dorks
 from modules.google_search import google_search
 from modules.selenium_scraper import SeleniumScraper
-from modules.ai_analyzer import AIAnalyzer
-from modules.risk_scoring import calculate_risk_score
+from modules.risk_scoring import RiskScorer
 from modules.report_builder import generate_reports
-from modules.bug_bounty_dorks import get_bug_bounty_dorks
-from modules.osint_explorer import OSINTExplorer
+from modules.bug_bounty_dorks import get_categorized_bug_bounty_dorks
+from modules.batch_scan import normalize_domain, parse_domains, interleave_dorks, combine_results, write_batch_summary
+from modules.osint_explorer import OSINTExplorer, subdomains_from_urls
+from modules.job_queue import JobQueue
+from modules.result_store import ResultStore, SORT_COLUMNS
+from modules.secret_index import SecretIndex, DEFAULT_TYPES, load_salt
+from modules.profiling import ScanProfiler
+from modules.deadlines import ScanBudget
+from modules.concurrency import AdaptiveLimit, ConcurrencyLimits
+from modules.findings import compact, finding_json_default
+from modules.url_frontier import UrlFrontier
+from modules.url_scheduler import UrlPriorityModel, categorize_dork
+from modules.metrics import (
+    timed, render_metrics, FINDINGS_TOTAL, PAGES_TOTAL, SCANS_TOTAL, QUEUE_DEPTH, WEBSOCKET_CLIENTS
+)
 
-app = FastAPI(title="Aegis Dorking AI")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    open_stores()
+    # Scans of a previous process that stopped mid-scan will never finish
+    interrupted = result_store.fail_unfinished("interrupted by a server restart")
+    if interrupted:
+        print(f"[!] Marked {interrupted} interrupted scans as failed")
+    yield
+
+app = FastAPI(title="Aegis Dorking AI", lifespan=lifespan)
 
 # Mount reports directory as static
 if not os.path.exists("reports"):
@@ -41,13 +65,125 @@ class ConnectionManager:
         self.active_connections.remove(websocket)
 
     async def broadcast(self, message: dict):
+        # Encode once for all clients; findings are serialized lazily here
+        payload = json.dumps(message, default=finding_json_default)
         for connection in self.active_connections:
             try:
-                await connection.send_json(message)
+                await connection.send_text(payload)
             except:
                 continue
 
 manager = ConnectionManager()
+risk_scorer = RiskScorer(config)
+
+# Adaptive concurrency per fetched host and external API (see modules/concurrency.py)
+concurrency_settings = config.get("concurrency", {})
+concurrency = None
+if concurrency_settings.get("enabled", True):
+    concurrency = ConcurrencyLimits.from_config(concurrency_settings)
+
+osint_settings = config.get("osint", {})
+osint_explorer = OSINTExplorer(
+    cache_ttl=osint_settings.get("cache_ttl", 3600),
+    max_concurrency=osint_settings.get("max_concurrency", 5),
+    limit=concurrency.api("shodan") if concurrency else None
+)
+WEBSOCKET_CLIENTS.set_function(lambda: len(manager.active_connections))
+
+# Fetch order: likely high-risk URLs first (see modules/url_scheduler.py)
+scheduler_settings = config.get("scheduler", {})
+url_model = None
+if scheduler_settings.get("enabled", True):
+    url_model = UrlPriorityModel(
+        stats_path=scheduler_settings.get("stats_path", "scheduler_stats.json"),
+        history_weight=scheduler_settings.get("history_weight", 10)
+    )
+
+# Per-page results, served a page at a time by /scans/{scan_id}/results
+result_settings = config.get("results", {})
+result_store: Optional[ResultStore] = None
+
+# Salted hashes of every matched secret across scans (GET /secrets/{hash})
+index_settings = config.get("secret_index", {})
+secret_index: Optional[SecretIndex] = None
+
+# Job queue for distributed scan workers (see worker.py)
+worker_settings = config.get("workers", {})
+job_queue: Optional[JobQueue] = None
+
+def open_stores():
+    """
+    Opens the result store, the secret index and the job queue, creating
+    their files in the current directory as configured. Runs at server
+    startup (and from batch_scan.py), not on import; stores already set,
+    e.g. by tests, are kept.
+    """
+    global result_store, secret_index, job_queue
+    if result_store is None:
+        result_store = ResultStore(
+            db_path=result_settings.get("db_path", "results.db"),
+            max_scans=result_settings.get("max_scans", 20)
+        )
+    if secret_index is None and index_settings.get("enabled", True):
+        secret_index = SecretIndex(
+            db_path=index_settings.get("db_path", "secret_index.db"),
+            salt=load_salt(index_settings.get("salt_path", "secret_index.salt")),
+            types=index_settings.get("types", DEFAULT_TYPES)
+        )
+    if job_queue is None and worker_settings.get("enabled"):
+        job_queue = JobQueue(
+            db_path=worker_settings.get("queue_path", "jobs.db"),
+            lease_seconds=worker_settings.get("lease_seconds", 120),
+            max_attempts=worker_settings.get("max_attempts", 3)
+        )
+        QUEUE_DEPTH.set_function(job_queue.pending, queue="worker_jobs")
+
+# Multi-domain scans (POST /bug-bounty-batch, batch_scan.py)
+batch_settings = config.get("batch", {})
+
+# Scan deadline and per-stage time limits (see modules/deadlines.py)
+budget_settings = config.get("budgets", {})
+
+class LeaseRequest(BaseModel):
+    worker_id: str
+
+class JobResult(BaseModel):
+    worker_id: str
+    result: Dict[str, Any]
+
+class JobFailure(BaseModel):
+    worker_id: str
+    error: str
+
+class SecretLookup(BaseModel):
+    secret: str
+    type: str = ""
+
+def check_worker(token: Optional[str]):
+    if not job_queue:
+        raise HTTPException(status_code=404, detail="Worker mode disabled")
+    expected = os.getenv("WORKER_TOKEN")
+    if expected and token != expected:
+        raise HTTPException(status_code=401, detail="Invalid worker token")
+
+@app.post("/jobs/lease")
+async def lease_job(req: LeaseRequest, x_worker_token: Optional[str] = Header(None)):
+    check_worker(x_worker_token)
+    return {"job": job_queue.lease(req.worker_id)}
+
+@app.post("/jobs/{job_id}/complete")
+async def complete_job(job_id: str, req: JobResult, x_worker_token: Optional[str] = Header(None)):
+    check_worker(x_worker_token)
+    if not job_queue.complete(job_id, req.worker_id, req.result):
+        raise HTTPException(status_code=409, detail="Lease lost")
+    return {"status": "ok"}
+
+@app.post("/jobs/{job_id}/fail")
+async def fail_job(job_id: str, req: JobFailure, x_worker_token: Optional[str] = Header(None)):
+    check_worker(x_worker_token)
+    if not job_queue.fail(job_id, req.worker_id, req.error):
+        raise HTTPException(status_code=409, detail="Lease lost")
+    return {"status": "ok"}
 
 @app.websocket("/ws")
 async def websocket_endpoint(websocket: WebSocket):
@@ -62,6 +198,10 @@ async def websocket_endpoint(websocket: WebSocket):
 async def read_index():
     return FileResponse("frontend/index.html")
 
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4")
+
 @app.get("/download/{filename}")
 async def download_report(filename: str):
     file_path = os.path.join("reports", filename)
@@ -69,44 +209,377 @@ async def download_report(filename: str):
         return FileResponse(file_path, filename=filename)
     raise HTTPException(status_code=404, detail="File not found")
 
-async def run_scan_task(urls: List[str]):
-    scraper = SeleniumScraper(
-        headless=config["scraper"]["headless"],
-        timeout=config["scraper"]["timeout"],
-        rate_limit_delay=config["scraper"]["rate_limit_delay"]
-    )
-    analyzer = AIAnalyzer()
-    
-    unique_urls = list(set(urls))
+@app.get("/scans")
+async def list_scans(limit: int = Query(20, ge=1, le=100)):
+    return {"scans": result_store.list_scans(limit)}
+
+@app.get("/scans/{scan_id}")
+async def get_scan(scan_id: str):
+    scan = result_store.get_scan(scan_id)
+    if scan is None:
+        raise HTTPException(status_code=404, detail="Scan not found")
+    if scan["summary"] is None:
+        # Still running: report progress so far
+        scan["summary"] = result_store.summary(scan_id)
+    return scan
+
+@app.get("/scans/{scan_id}/results")
+async def get_scan_results(
+    scan_id: str,
+    page: int = Query(1, ge=1),
+    page_size: int = Query(50, ge=1, le=500),
+    sort: str = Query("seq"),
+    order: str = Query("asc", pattern="^(asc|desc)$"),
+    risk_level: Optional[str] = None,
+    finding_type: Optional[str] = None,
+    q: Optional[str] = None,
+    domain: Optional[str] = None
+):
+    if result_store.get_scan(scan_id) is None:
+        raise HTTPException(status_code=404, detail="Scan not found")
+    if sort not in SORT_COLUMNS:
+        raise HTTPException(status_code=400, detail=f"sort must be one of {', '.join(SORT_COLUMNS)}")
+    return result_store.query(scan_id, page, page_size, sort, order, risk_level, finding_type, q, domain)
+
+def check_secret_index():
+    if not secret_index:
+        raise HTTPException(status_code=404, detail="Secret index disabled")
+
+@app.get("/secrets/{secret_hash}")
+async def get_secret(secret_hash: str):
+    check_secret_index()
+    entry = secret_index.lookup(secret_hash.lower())
+    if entry is None:
+        raise HTTPException(status_code=404, detail="Secret not seen in any scan")
+    return entry
+
+@app.post("/secrets/lookup")
+async def lookup_secret(req: SecretLookup):
+    """
+    Looks up a raw value by its salted hash; the value itself is not stored.
+    """
+    check_secret_index()
+    entry = secret_index.lookup_value(req.type, req.secret)
+    if entry is None:
+        raise HTTPException(status_code=404, detail="Secret not seen in any scan")
+    return entry
+
+def record_findings(findings: List[Dict]):
+    PAGES_TOTAL.inc(outcome="analyzed")
+    for finding in findings:
+        FINDINGS_TOTAL.inc(type=finding["type"])
+
+def record_outcome(frontier: UrlFrontier, url: str, risk_score: int):
+    if url_model:
+        url_model.record(frontier.category_of(url), risk_score > 0)
+
+async def publish_result(scan_id: str, result: Dict):
+    """
+    Stores a page result and broadcasts only its summary row; clients fetch
+    findings through the results API.
+    """
+    if secret_index:
+        # Tags findings with secret_hash/seen_elsewhere before they are stored
+        for entry in secret_index.record(scan_id, result["url"], result.get("findings", [])):
+            if entry["other_locations"]:
+                await manager.broadcast({"type": "log", "message": (
+                    f"[!] {entry['type']} on {result['url']} was already seen at "
+                    f"{entry['other_locations']} other location(s) (secret {entry['hash'][:12]})"
+                )})
+    seq = result_store.add(scan_id, result)
+    await manager.broadcast({"type": "result", "data": {
+        "scan_id": scan_id,
+        "seq": seq,
+        "url": result["url"],
+        "risk_score": result.get("risk_score", 0),
+        "risk_level": result.get("risk_level", "NONE"),
+        "finding_count": len(result.get("findings", [])),
+        "skipped": result.get("skipped", [])
+    }})
+
+async def fail_scan(scan_id: str, error: BaseException):
+    """
+    Marks a scan that raised as failed, keeping the pages it stored, and
+    tells the UI it is over.
+    """
+    print(f"[!] Scan {scan_id} failed: {error!r}")
+    summary = result_store.summary(scan_id)
+    summary["error"] = str(error) or type(error).__name__
+    result_store.finish(scan_id, summary, status="failed")
+    await manager.broadcast({"type": "scan_failed", "data": {"scan_id": scan_id, "message": f"Scan failed: {summary['error']}"}})
+
+def scan_summary(scan_id: str, **extra) -> Dict[str, Any]:
+    summary = result_store.summary(scan_id)
+    summary.update(extra)
+    result_store.finish(scan_id, summary)
+    return summary
+
+async def search_dorks(dorks: List[Tuple[Optional[str], Optional[str], str]], frontier: UrlFrontier,
+                      budget: ScanBudget) -> List[str]:
+    """
+    Runs each (group, category, dork) triple and feeds new URLs into the
+    frontier under that group as soon as it returns. Closes the frontier when
+    all searches are done or the scan deadline passed. Returns every URL found.
+    Up to the search API's ceiling run at once; its adaptive limit decides how
+    many of them actually search.
+    """
+    found = []
+    not_searched = 0
+    search_limit = concurrency.api("search") if concurrency else None
+    pending = iter(enumerate(dorks, 1))
+
+    async def searcher():
+        nonlocal not_searched
+        for i, (group, category, dork) in pending:
+            if budget.expired:
+                not_searched += 1
+                continue
+            try:
+                urls = await asyncio.wait_for(asyncio.to_thread(
+                    google_search, dork, num_results=config["google_search"]["max_results_per_dork"], limit=search_limit
+                ), budget.limit("search"))
+            except asyncio.TimeoutError:
+                budget.skip("dorks")
+                await manager.broadcast({"type": "log", "message": f"[!] Dork {i}/{len(dorks)} timed out: {dork}"})
+                continue
+            new = [url for url in urls if frontier.put(url, category, group)]
+            found.extend(urls)
+            if new:
+                await manager.broadcast({"type": "log", "message": f"[*] Dork {i}/{len(dorks)} queued {len(new)} new URLs"})
+
+    try:
+        await asyncio.gather(*(searcher() for _ in range(search_limit.max_limit if search_limit else 1)))
+        if not_searched:
+            budget.skip("dorks", not_searched)
+            await manager.broadcast({"type": "log", "message": f"[!] Scan deadline reached, {not_searched} dorks not searched"})
+    finally:
+        frontier.close()
+    return list(dict.fromkeys(found))
+
+async def scan_urls_locally(frontier: UrlFrontier, scan_id: str, budget: ScanBudget, log_prefix: str = "Scraping") -> List[Dict]:
+    """
+    Fetches with a pool of browsers (concurrency.browsers; each host's
+    adaptive limit decides how many load from it at once) and analyzes the
+    pages one at a time. A URL takes a slot on its host before it takes a
+    browser, so URLs waiting on a busy host leave the browsers to others.
+    """
+    browsers = concurrency_settings.get("browsers", 4) if concurrency else 1
+    scrapers = [SeleniumScraper.from_config(config["scraper"], limits=concurrency) for _ in range(browsers)]
+    idle = asyncio.Queue()
+    for scraper in scrapers:
+        idle.put_nowait(scraper)
+    # Creating the analyzer loads the NLP and ML backends (spaCy, transformers/torch or ONNX); do it with the first scan, not at startup
+    from modules.ai_analyzer import AIAnalyzer
+    analyzer = AIAnalyzer(concurrency=concurrency)
+    analysis_lock = asyncio.Lock()
     scan_results = []
-    
-    for i, url in enumerate(unique_urls, 1):
-        await manager.broadcast({"type": "log", "message": f"Scraping {i}/{len(unique_urls)}: {url}"})
-        content = scraper.fetch_content(url)
-        if content:
-            findings = analyzer.analyze(content)
-            score, level = calculate_risk_score(findings, config)
+    i = 0
+
+    async def host_slot(url: str) -> Optional[AdaptiveLimit]:
+        # Awaited on the loop, so a waiting URL holds neither a browser nor a thread; only the scan deadline ends the wait
+        host_limit = concurrency.host(url)
+        return host_limit if await host_limit.acquire_async(budget.remaining()) else None
+
+    async def fetcher():
+        nonlocal i
+        async for url in frontier:
+            held = await host_slot(url) if concurrency and not budget.expired else None
+            if budget.expired:
+                # Drain the frontier without fetching; the scan ends with what it has
+                budget.skip("urls")
+                if held:
+                    held.cancel()
+                continue
+            scraper = None
+            content = None
+            try:
+                scraper = await idle.get()
+                i += 1
+                total = f"{len(frontier)}" if frontier.closed else f"{len(frontier)}+"
+                await manager.broadcast({"type": "log", "message": f"{log_prefix} {i}/{total}: {url}"})
+                fetch, held = asyncio.to_thread(scraper.fetch_content, url, budget.limit("fetch"), held_slot=held), None
+                content = await fetch  # the fetch releases the host slot from here on, whatever happens
+            except Exception as e:
+                # One broken fetch costs its page, not the scan
+                print(f"[!] Fetch failed for {url}: {e!r}")
+            finally:
+                if held:
+                    held.cancel()
+                if scraper:
+                    idle.put_nowait(scraper)
+            if content:
+                await process_page(url, content)
+            else:
+                PAGES_TOTAL.inc(outcome="failed")
+
+    async def process_page(url: str, content: Dict[str, Any]):
+        async with analysis_lock:
+            page_budget = budget.page_budget()
+            # The analysis gets the time left in the scan; past that the page keeps its regex/entropy findings
+            findings = None
+            if not budget.expired:
+                try:
+                    findings = await asyncio.wait_for(asyncio.to_thread(analyzer.analyze, content, page_budget), budget.remaining())
+                except asyncio.TimeoutError:
+                    pass
+            if findings is None:
+                page_budget.skip("analysis")
+                findings = await asyncio.to_thread(analyzer.baseline, content)
+            findings = compact(findings, content.get("text"))
+            skipped = (["fetch"] if content.get("partial") else []) + page_budget.skipped
+            with timed("score"):
+                score, level = risk_scorer.score(findings)
+            record_findings(findings)
+            record_outcome(frontier, url, score)
             result = {
                 "url": url,
                 "findings": findings,
                 "risk_score": score,
                 "risk_level": level
             }
+            if frontier.group_of(url):
+                result["domain"] = frontier.group_of(url)
+            if skipped:
+                result["skipped"] = skipped
+                budget.record_page(skipped)
             scan_results.append(result)
-            await manager.broadcast({"type": "result", "data": result})
+            await publish_result(scan_id, result)
             if score > 0:
                  await manager.broadcast({"type": "log", "message": f"⚠️ Found {len(findings)} exposures on {url} (Risk: {level})"})
-    
-    scraper.close()
-    await manager.broadcast({"type": "log", "message": "Scan complete. Generating reports..."})
-    json_report, csv_report = generate_reports(scan_results, "reports")
+
+    try:
+        # Twice as many fetchers as browsers: while some wait on busy hosts, the rest keep the browsers loading
+        await asyncio.gather(*(fetcher() for _ in range(2 * browsers if concurrency else 1)))
+    finally:
+        for scraper in scrapers:
+            scraper.close()
+    return scan_results
+
+async def scan_urls_with_workers(frontier: UrlFrontier, scan_id: str, budget: ScanBudget) -> List[Dict]:
+    """
+    Queues one fetch/analyze job per URL and waits for workers to report back.
+    Past the scan deadline, jobs still queued or running are cancelled; if no
+    worker has asked for a job within a lease period, they are failed.
+    """
+    scan_results = []
+    queued = 0
+    done = 0
+    poll_interval = worker_settings.get("poll_interval", 1)
+    while True:
+        expired = budget.expired
+        url = frontier.get_nowait()
+        while url is not None:
+            if expired:
+                budget.skip("urls")
+            else:
+                payload = {"url": url, "limits": budget.page_limits()}
+                job_queue.enqueue(scan_id, "fetch_analyze", payload, priority=frontier.priority_of(url))
+                queued += 1
+            url = frontier.get_nowait()
+        if expired:
+            cancelled = job_queue.cancel(scan_id)
+            budget.skip("urls", cancelled)
+            queued -= cancelled
+        elif job_queue.idle_seconds() > job_queue.lease_seconds and job_queue.outstanding(scan_id):
+            abandoned = job_queue.abandon(scan_id, "no live workers")
+            await manager.broadcast({"type": "log", "message": f"[!] No worker polled for {job_queue.lease_seconds}s, {abandoned} jobs failed"})
+
+        for job in job_queue.collect(scan_id):
+            done += 1
+            url = job["payload"]["url"]
+            if job["status"] == "failed":
+                PAGES_TOTAL.inc(outcome="failed")
+                await manager.broadcast({"type": "log", "message": f"[!] Worker failed on {url}: {job['error']}"})
+                continue
+            result = job["result"]
+            if result:
+                record_findings(result.get("findings", []))
+                record_outcome(frontier, url, result.get("risk_score", 0))
+                if frontier.group_of(url):
+                    result["domain"] = frontier.group_of(url)
+                budget.record_page(result.get("skipped", []))
+                scan_results.append(result)
+                await publish_result(scan_id, result)
+            else:
+                PAGES_TOTAL.inc(outcome="failed")
+            await manager.broadcast({"type": "log", "message": f"[*] Completed {done}/{queued}: {url}"})
+        if frontier.drained and done >= queued and job_queue.outstanding(scan_id) == 0:
+            break
+        await asyncio.sleep(poll_interval)
+
+    return scan_results
+
+async def scan_urls(frontier: UrlFrontier, scan_id: str, budget: ScanBudget, log_prefix: str = "Scraping") -> List[Dict]:
+    try:
+        if job_queue:
+            return await scan_urls_with_workers(frontier, scan_id, budget)
+        return await scan_urls_locally(frontier, scan_id, budget, log_prefix)
+    finally:
+        # Keep per-category hit rates for the next scan's ordering
+        if url_model:
+            url_model.save()
+
+async def cancel_tasks(*tasks: Optional[asyncio.Future]):
+    """
+    Cancels the helper tasks of a scan (search, OSINT, fetching) that are
+    still running because the scan failed before awaiting them, and waits
+    for them so none keeps using API quota or leaves its exception unread.
+    """
+    tasks = [task for task in tasks if task is not None]
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+
+def start_profiler(label: str) -> ScanProfiler:
+    settings = config.get("profiling", {})
+    return ScanProfiler(
+        output_dir="reports",
+        label=label,
+        interval=settings.get("interval", 0.005),
+        top_allocations=settings.get("top_allocations", 25)
+    ).start()
+
+def budget_log(budget: ScanBudget) -> Optional[str]:
+    report = budget.report()
+    if report["complete"]:
+        return None
+    skipped = ", ".join(f"{count} {what}" for what, count in report["skipped"].items())
+    reason = "deadline reached" if report["deadline_hit"] else "time limits hit"
+    return f"[!] Partial results ({reason}), skipped: {skipped}"
+
+async def run_scan_task(scan_id: str, urls: List[str], dorks: List[str] = None, profile: bool = False,
+                        deadline: Optional[float] = None):
+    SCANS_TOTAL.inc(kind="scan")
+    profiler = start_profiler(f"scan_{scan_id[:8]}") if profile else None
+    budget = ScanBudget.from_config(budget_settings, deadline)
+    search_task = None
+    try:
+        # Manual URLs are fetched right away while the dorks are searched
+        frontier = UrlFrontier(url_model)
+        for url in urls:
+            frontier.put(url)
+        categorized = [(None, categorize_dork(dork), dork) for dork in dorks or []]
+        search_task = asyncio.create_task(search_dorks(categorized, frontier, budget))
+        scan_results = await scan_urls(frontier, scan_id, budget)
+        await search_task
+
+        await manager.broadcast({"type": "log", "message": budget_log(budget) or "Scan complete. Generating reports..."})
+        json_report, csv_report = generate_reports(scan_results, "reports", budget=budget.report())
+    except Exception as e:
+        await fail_scan(scan_id, e)
+        raise
+    finally:
+        await cancel_tasks(search_task)
+        profile_files = profiler.stop() if profiler else {}
     
     final_data = {
         "type": "final_results",
         "data": {
-            "message": "Scan complete",
-            "results": scan_results,
-            "reports": {"json": json_report, "csv": csv_report}
+            "message": "Scan complete" if budget.report()["complete"] else "Scan complete (partial results)",
+            "scan_id": scan_id,
+            "summary": scan_summary(scan_id, budget=budget.report()),
+            "reports": {"json": json_report, "csv": csv_report},
+            "profile": profile_files
         }
     }
     await manager.broadcast(final_data)
@@ -117,6 +590,8 @@ async def start_scan(
     manual_urls: Optional[str] = Form(None),
     dork_file: Optional[UploadFile] = File(None),
     authorized: bool = Form(...),
+    profile: bool = Form(False),
+    deadline_seconds: Optional[float] = Form(None, gt=0),
 ):
     if not authorized:
         raise HTTPException(status_code=400, detail="Not authorized")
@@ -125,69 +600,92 @@ async def start_scan(
     if manual_urls:
         urls.extend([u.strip() for u in manual_urls.split(",") if u.strip()])
     
+    # Parse the upload line by line; searching happens in the background job
+    dorks = []
     if dork_file:
-        content = await dork_file.read()
-        dorks = content.decode().splitlines()
-        for dork in dorks:
-            if dork.strip():
-                urls.extend(google_search(dork.strip(), num_results=config["google_search"]["max_results_per_dork"]))
+        lines = io.TextIOWrapper(dork_file.file, encoding="utf-8", errors="replace")
+        dorks = list(parse_dorks(lines))
+        lines.detach()
     
-    if not urls:
-        return {"message": "No URLs found", "status": "error"}
+    if not urls and not dorks:
+        return {"message": "No URLs or dorks provided", "status": "error"}
 
-    background_tasks.add_task(run_scan_task, urls)
-    return {"message": "Scan started in background", "status": "started"}
+    scan_id = uuid.uuid4().hex
+    result_store.create_scan(scan_id, "scan")
+    background_tasks.add_task(run_scan_task, scan_id, urls, dorks, profile, deadline_seconds)
+    return {"message": "Scan started in background", "status": "started", "scan_id": scan_id,
+            "urls": len(urls), "dorks": len(dorks)}
 
-async def run_bug_bounty_task(target_domain: str):
+async def run_bug_bounty_task(scan_id: str, target_domain: str, profile: bool = False,
+                              deadline: Optional[float] = None):
+    SCANS_TOTAL.inc(kind="bug_bounty")
     await manager.broadcast({"type": "log", "message": f"[*] Starting Bug Bounty Auto-Scan for: {target_domain}"})
-    
-    osint_results = {}
-    if config.get("osint", {}).get("shodan_enabled"):
-        explorer = OSINTExplorer()
-        osint_results = explorer.scan_domain(target_domain)
-        if osint_results.get("enabled"):
-            await manager.broadcast({"type": "osint", "data": osint_results})
-    
-    dorks = get_bug_bounty_dorks(target_domain)
-    await manager.broadcast({"type": "log", "message": f"[*] Generated {len(dorks)} automated dorks."})
-    
-    urls = []
-    for dork in dorks:
-        found_urls = google_search(dork, num_results=config["google_search"]["max_results_per_dork"])
-        urls.extend(found_urls)
-            
-    urls = list(set(urls))
-    await manager.broadcast({"type": "log", "message": f"[*] Found {len(urls)} unique URLs to scan"})
-    
-    scraper = SeleniumScraper(headless=config["scraper"]["headless"], timeout=config["scraper"]["timeout"], rate_limit_delay=config["scraper"]["rate_limit_delay"])
-    analyzer = AIAnalyzer()
-    scan_results = []
-    
-    for i, url in enumerate(urls, 1):
-        await manager.broadcast({"type": "log", "message": f"[*] Scanning {i}/{len(urls)}: {url}"})
-        content = scraper.fetch_content(url)
-        if content:
-            findings = analyzer.analyze(content)
-            score, level = calculate_risk_score(findings, config)
-            result = {"url": url, "findings": findings, "risk_score": score, "risk_level": level}
-            scan_results.append(result)
-            await manager.broadcast({"type": "result", "data": result})
-    
-    scraper.close()
-    json_report, csv_report = generate_reports(scan_results, "reports")
-    
+    profiler = start_profiler(f"bug_bounty_{scan_id[:8]}") if profile else None
+    budget = ScanBudget.from_config(budget_settings, deadline)
+    osint_task = scan_task = subdomain_task = None
+    try:
+        # OSINT runs alongside the search phase instead of before it
+        osint_results = {}
+        if osint_settings.get("shodan_enabled"):
+            osint_task = asyncio.create_task(osint_explorer.scan_domains([target_domain]))
+
+        dorks = get_categorized_bug_bounty_dorks(target_domain)
+        await manager.broadcast({"type": "log", "message": f"[*] Generated {len(dorks)} automated dorks."})
+
+        # Pages are fetched as soon as the first dorks return
+        frontier = UrlFrontier(url_model)
+        scan_task = asyncio.create_task(scan_urls(frontier, scan_id, budget, "[*] Scanning"))
+        urls = await search_dorks([(None, category, dork) for category, dork in dorks], frontier, budget)
+        await manager.broadcast({"type": "log", "message": f"[*] Found {len(urls)} unique URLs to scan"})
+
+        # Look up subdomains found by the dorks while pages are being fetched
+        if osint_task:
+            try:
+                osint_results = await asyncio.wait_for(osint_task, budget.remaining())
+            except asyncio.TimeoutError:
+                budget.skip("osint")
+            if osint_results.get("enabled"):
+                await manager.broadcast({"type": "osint", "data": osint_results})
+                subdomains = subdomains_from_urls(urls, target_domain)
+                if subdomains:
+                    await manager.broadcast({"type": "log", "message": f"[*] Looking up {len(subdomains)} subdomains via OSINT"})
+                    subdomain_task = asyncio.create_task(osint_explorer.scan_domains([target_domain] + subdomains))
+
+        scan_results = await scan_task
+
+        if subdomain_task:
+            try:
+                # Only waited for while the scan has time left
+                osint_results = await asyncio.wait_for(subdomain_task, budget.remaining())
+                await manager.broadcast({"type": "osint", "data": osint_results})
+            except asyncio.TimeoutError:
+                budget.skip("osint")
+        if budget_log(budget):
+            await manager.broadcast({"type": "log", "message": budget_log(budget)})
+        json_report, csv_report = generate_reports(scan_results, "reports", budget=budget.report())
+    except Exception as e:
+        await fail_scan(scan_id, e)
+        raise
+    finally:
+        await cancel_tasks(osint_task, scan_task, subdomain_task)
+        profile_files = profiler.stop() if profiler else {}
+
+    summary = scan_summary(scan_id, total_dorks=len(dorks), urls_found=len(urls), budget=budget.report())
+    levels = summary["risk_levels"]
     final_data = {
         "type": "final_results",
         "data": {
-            "message": "Bug Bounty scan complete",
-            "results": scan_results,
+            "message": "Bug Bounty scan complete" if budget.report()["complete"] else "Bug Bounty scan complete (partial results)",
+            "scan_id": scan_id,
+            "summary": summary,
             "osint": osint_results,
             "reports": {"json": json_report, "csv": csv_report},
+            "profile": profile_files,
             "stats": {
                 "total_dorks": len(dorks), "urls_found": len(urls),
-                "high_risk": len([r for r in scan_results if r["risk_level"] == "HIGH"]),
-                "medium_risk": len([r for r in scan_results if r["risk_level"] == "MEDIUM"]),
-                "low_risk": len([r for r in scan_results if r["risk_level"] == "LOW"])
+                "high_risk": levels.get("HIGH", 0),
+                "medium_risk": levels.get("MEDIUM", 0),
+                "low_risk": levels.get("LOW", 0)
             }
         }
     }
@@ -197,14 +695,120 @@ async def run_bug_bounty_task(target_domain: str):
 async def bug_bounty_scan(
     background_tasks: BackgroundTasks,
     target_domain: str = Form(...),
-    authorized: bool = Form(...)
+    authorized: bool = Form(...),
+    profile: bool = Form(False),
+    deadline_seconds: Optional[float] = Form(None, gt=0)
 ):
     if not authorized:
         raise HTTPException(status_code=400, detail="Not authorized")
     
-    target_domain = target_domain.strip().replace('http://', '').replace('https://', '').replace('www.', '')
-    background_tasks.add_task(run_bug_bounty_task, target_domain)
-    return {"message": "Bug Bounty scan started", "status": "started"}
+    target_domain = normalize_domain(target_domain)
+    scan_id = uuid.uuid4().hex
+    result_store.create_scan(scan_id, "bug_bounty", target_domain)
+    background_tasks.add_task(run_bug_bounty_task, scan_id, target_domain, profile, deadline_seconds)
+    return {"message": "Bug Bounty scan started", "status": "started", "scan_id": scan_id}
+
+async def run_batch_task(scan_id: str, domains: List[str], profile: bool = False,
+                         deadline: Optional[float] = None) -> Dict[str, Any]:
+    """
+    Bug bounty scan of several domains at once. All domains share one search
+    quota, one frontier and one browser/analyzer: dorks are searched one
+    domain at a time in turn and the frontier hands out URLs round-robin by
+    domain, so a large domain cannot starve the rest of the list.
+    """
+    SCANS_TOTAL.inc(kind="batch")
+    await manager.broadcast({"type": "log", "message": f"[*] Starting batch scan of {len(domains)} domains"})
+    profiler = start_profiler(f"batch_{scan_id[:8]}") if profile else None
+    budget = ScanBudget.from_config(budget_settings, deadline)
+    batch_dir = os.path.join("reports", f"batch_{scan_id[:8]}")
+    osint_task = scan_task = None
+    try:
+        if osint_settings.get("shodan_enabled"):
+            # One lookup per domain; the explorer's cache and concurrency limit are shared
+            osint_task = asyncio.gather(*(osint_explorer.scan_domains([domain]) for domain in domains))
+
+        dorks = interleave_dorks({domain: get_categorized_bug_bounty_dorks(domain) for domain in domains},
+                                 batch_settings.get("max_searches"))
+        await manager.broadcast({"type": "log", "message": f"[*] Generated {len(dorks)} automated dorks."})
+
+        frontier = UrlFrontier(url_model, max_per_group=batch_settings.get("max_urls_per_domain"))
+        scan_task = asyncio.create_task(scan_urls(frontier, scan_id, budget, "[*] Scanning"))
+        urls = await search_dorks(dorks, frontier, budget)
+        await manager.broadcast({"type": "log", "message": f"[*] Found {len(urls)} unique URLs, {len(frontier)} queued"})
+        scan_results = await scan_task
+
+        osint_results = {}
+        if osint_task:
+            try:
+                osint_results = dict(zip(domains, await asyncio.wait_for(osint_task, budget.remaining())))
+            except asyncio.TimeoutError:
+                budget.skip("osint")
+
+        await manager.broadcast({"type": "log", "message": budget_log(budget) or "Batch scan complete. Generating reports..."})
+        domain_reports = {}
+        for domain in domains:
+            domain_results = [result for result in scan_results if result.get("domain") == domain]
+            if domain_results:
+                json_report, csv_report = generate_reports(domain_results, os.path.join(batch_dir, domain),
+                                                           budget=budget.report_for(domain_results))
+                domain_reports[domain] = {"json": json_report, "csv": csv_report}
+        combined = combine_results(domains, scan_results, domain_reports, osint_results)
+        combined["budget"] = budget.report()
+        json_report, csv_report = write_batch_summary(combined, "reports", f"batch_{scan_id[:8]}_summary")
+    except Exception as e:
+        await fail_scan(scan_id, e)
+        raise
+    finally:
+        await cancel_tasks(osint_task, scan_task)
+        profile_files = profiler.stop() if profiler else {}
+
+    summary = scan_summary(scan_id, domains=combined["domains"], total_dorks=len(dorks), urls_found=len(urls),
+                           budget=budget.report())
+    levels = summary["risk_levels"]
+    final_data = {
+        "type": "final_results",
+        "data": {
+            "message": "Batch scan complete" if budget.report()["complete"] else "Batch scan complete (partial results)",
+            "scan_id": scan_id,
+            "summary": summary,
+            "reports": {"json": json_report, "csv": csv_report},
+            "domain_reports": domain_reports,
+            "profile": profile_files,
+            "stats": {
+                "domains": len(domains), "total_dorks": len(dorks), "urls_found": len(urls),
+                "high_risk": levels.get("HIGH", 0),
+                "medium_risk": levels.get("MEDIUM", 0),
+                "low_risk": levels.get("LOW", 0)
+            }
+        }
+    }
+    await manager.broadcast(final_data)
+    return final_data["data"]
+
+@app.post("/bug-bounty-batch")
+async def bug_bounty_batch(
+    background_tasks: BackgroundTasks,
+    domain_file: UploadFile = File(...),
+    authorized: bool = Form(...),
+    profile: bool = Form(False),
+    deadline_seconds: Optional[float] = Form(None, gt=0)
+):
+    if not authorized:
+        raise HTTPException(status_code=400, detail="Not authorized")
+
+    lines = io.TextIOWrapper(domain_file.file, encoding="utf-8", errors="replace")
+    domains = parse_domains(lines)
+    lines.detach()
+    if not domains:
+        return {"message": "No domains provided", "status": "error"}
+    max_domains = batch_settings.get("max_domains", 50)
+    if len(domains) > max_domains:
+        raise HTTPException(status_code=400, detail=f"At most {max_domains} domains per batch")
+
+    scan_id = uuid.uuid4().hex
+    result_store.create_scan(scan_id, "batch", f"{len(domains)} domains")
+    background_tasks.add_task(run_batch_task, scan_id, domains, profile, deadline_seconds)
+    return {"message": "Batch scan started", "status": "started", "scan_id": scan_id, "domains": domains}
 
 if __name__ == "__main__":
     import uvicorn
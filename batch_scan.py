@@ -0,0 +1,66 @@
+"""
+Aegis Batch Scan
+Runs the bug bounty scan over every domain in a scope file from the command
+line, with the same shared search quota, browser and analyzer as the
+/bug-bounty-batch endpoint. Progress is printed instead of sent over the
+WebSocket; results are stored like any other scan.
+
+Usage:
+    python batch_scan.py scope.txt --authorized [--profile]
+"""
+import sys
+import json
+import uuid
+import asyncio
+import argparse
+
+from modules.batch_scan import parse_domains
+from modules.utils import log_info, log_error, log_success
+
+
+class ConsoleSink:
+    """
+    Stands in for a WebSocket client and prints the scan's log messages.
+    """
+    async def send_text(self, payload):
+        message = json.loads(payload)
+        if message["type"] == "log":
+            print(message["message"])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Aegis multi-domain bug bounty scan")
+    parser.add_argument("domain_file", help="One domain per line; '#' starts a comment")
+    parser.add_argument("--authorized", action="store_true", help="Confirm you are authorized to test every domain")
+    parser.add_argument("--profile", action="store_true", help="Profile the scan (see the profiling config)")
+    parser.add_argument("--deadline", type=float, help="Finish within this many seconds, with partial results if needed")
+    args = parser.parse_args(argv)
+
+    if not args.authorized:
+        log_error("Only scan domains you are authorized to test; pass --authorized to confirm")
+        return 1
+    with open(args.domain_file, "r", encoding="utf-8", errors="replace") as f:
+        domains = parse_domains(f)
+    if not domains:
+        log_error(f"No domains in {args.domain_file}")
+        return 1
+
+    # Loads config.yaml and opens the shared stores
+    import app
+    app.open_stores()
+    app.manager.active_connections.append(ConsoleSink())
+    scan_id = uuid.uuid4().hex
+    app.result_store.create_scan(scan_id, "batch", f"{len(domains)} domains")
+    log_info(f"Batch scan {scan_id}: {', '.join(domains)}")
+    data = asyncio.run(app.run_batch_task(scan_id, domains, args.profile, args.deadline))
+
+    for row in data["summary"]["domains"]:
+        levels = row["risk_levels"]
+        print(f"{row['domain']:<40}{row['pages']:>6} pages{row['findings']:>6} findings  "
+              f"HIGH {levels.get('HIGH', 0)}  MEDIUM {levels.get('MEDIUM', 0)}  LOW {levels.get('LOW', 0)}")
+    log_success(f"Summary: {data['reports']['json']}, {data['reports']['csv']}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,106 @@
+"""
+Browser fetch benchmark: page time and bytes transferred per page for the
+default Chrome profile versus the text-only fetch profile (blocked images,
+fonts, media and tracker domains, eager page loads), against a local server.
+Needs Chrome; chromedriver is fetched by webdriver_manager as in production.
+
+Usage:
+    python -m benchmarks.browser_fetch [--pages 10] [--no-headless]
+"""
+import os
+import sys
+import time
+import argparse
+from typing import Any, Dict
+
+from benchmarks.server import CorpusServer
+from benchmarks.run_benchmarks import percentile
+from modules.selenium_scraper import SeleniumScraper
+
+# Host name the "third-party" tracker is served from; the page itself uses 127.0.0.1
+TRACKER_HOST = "localhost"
+
+
+def build_site(pages: int) -> Dict[str, Any]:
+    """
+    HTML pages that pull in the usual weight of a real site: hero images, an
+    image without extension, web fonts, a video, and a slow third-party script.
+    """
+    site: Dict[str, Any] = {
+        "hero.jpg": os.urandom(400_000),
+        "thumb.png": os.urandom(60_000),
+        "pixel": os.urandom(20_000),
+        "font.woff2": os.urandom(120_000),
+        "clip.mp4": os.urandom(1_500_000),
+        "tracker.js": b"window.tracked = true;",
+    }
+    for i in range(pages):
+        images = "".join(f'<img src="/thumb.png?v={i}-{n}">' for n in range(8))
+        site[f"page{i}.html"] = f"""<!DOCTYPE html>
+<html><head><style>
+@font-face {{ font-family: Brand; src: url('/font.woff2?v={i}') format('woff2'); }}
+body {{ font-family: Brand, sans-serif; }}
+</style></head><body>
+<h1>Deployment notes {i}</h1>
+<p>DB_PASSWORD=benchmark-{i} is rotated weekly; see the runbook.</p>
+<img src="/hero.jpg?v={i}">{images}<img src="/pixel?v={i}">
+<video src="/clip.mp4?v={i}" preload="auto" autoplay muted></video>
+<script async src="http://{TRACKER_HOST}:{{port}}/tracker.js?v={i}"></script>
+</body></html>"""
+    return site
+
+
+def measure(scraper: SeleniumScraper, server: CorpusServer, names) -> Dict[str, float]:
+    scraper.fetch_content(server.url_for(names[0]))  # browser start-up is not page time
+    times, sizes = [], []
+    for name in names:
+        before = server.bytes_sent
+        start = time.perf_counter()
+        content = scraper.fetch_content(server.url_for(name))
+        times.append(time.perf_counter() - start)
+        if not content or "DB_PASSWORD" not in content["text"]:
+            raise RuntimeError(f"{name}: page text missing")
+        sizes.append(server.bytes_sent - before)
+    scraper.close()
+    return {
+        "p50_ms": round(percentile(times, 50) * 1000, 1),
+        "p95_ms": round(percentile(times, 95) * 1000, 1),
+        "kb_per_page": round(sum(sizes) / len(sizes) / 1024, 1),
+    }
+
+
+def run(pages: int = 10, headless: bool = True, tracker_delay: float = 1.5) -> Dict[str, Dict[str, float]]:
+    site = build_site(pages)
+    names = [name for name in site if name.endswith(".html")]
+    with CorpusServer(site, delays={"tracker.js": tracker_delay, "clip.mp4": 0.5}) as server:
+        for name in names:
+            server.pages[name] = server.pages[name].replace(b"{port}", str(server.port).encode())
+        common = {"headless": headless, "timeout": 30, "rate_limit_delay": 0, "screenshots": False}
+        default = SeleniumScraper(page_load_strategy="normal", block_resources=(), block_domains=(), **common)
+        text_only = SeleniumScraper(block_domains=(TRACKER_HOST,), **common)
+        return {
+            "default": measure(default, server, names),
+            "text_only": measure(text_only, server, names),
+        }
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Aegis browser fetch benchmark")
+    parser.add_argument("--pages", type=int, default=10)
+    parser.add_argument("--no-headless", action="store_true")
+    parser.add_argument("--tracker-delay", type=float, default=1.5, help="Seconds the third-party script takes")
+    args = parser.parse_args(argv)
+
+    report = run(args.pages, not args.no_headless, args.tracker_delay)
+    print(f"{'profile':<12}{'p50 ms':>10}{'p95 ms':>10}{'KB/page':>10}")
+    for profile, stats in report.items():
+        print(f"{profile:<12}{stats['p50_ms']:>10}{stats['p95_ms']:>10}{stats['kb_per_page']:>10}")
+    default, fast = report["default"], report["text_only"]
+    print(f"[*] text_only: {1 - fast['p50_ms'] / default['p50_ms']:.0%} less page time, "
+          f"{1 - fast['kb_per_page'] / max(default['kb_per_page'], 0.1):.0%} fewer bytes "
+          f"(the old fetch also slept rate_limit_delay after every load)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,162 @@
+"""
+Cold-start benchmark for the API entry point.
+Measures `python -X importtime` for app.py in a fresh interpreter, lists the
+slowest imports, checks that heavy optional packages are not loaded at startup,
+and times how long a fresh uvicorn process takes to answer GET /.
+
+Usage:
+    python -m benchmarks.cold_start [--runs 3] [--no-server] [--thresholds benchmarks/thresholds.yaml]
+"""
+import os
+import sys
+import json
+import time
+import socket
+import argparse
+import subprocess
+import urllib.request
+from typing import Any, Dict, List, Tuple
+
+import yaml
+
+BENCH_DIR = os.path.dirname(__file__)
+ROOT_DIR = os.path.abspath(os.path.join(BENCH_DIR, ".."))
+DEFAULT_THRESHOLDS = os.path.join(BENCH_DIR, "thresholds.yaml")
+
+# Loaded on first use (first scan, report, search or OSINT lookup), never by `import app`
+LAZY_MODULES = (
+    "selenium", "webdriver_manager", "bs4", "PIL", "pandas", "googleapiclient",
+    "shodan", "spacy", "transformers", "torch", "onnxruntime", "tokenizers",
+)
+
+
+def parse_importtime(stderr: str) -> List[Tuple[str, float, float, int]]:
+    """
+    (module, self ms, cumulative ms, nesting depth) for each line of -X importtime output.
+    """
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        depth = (len(name) - len(name.lstrip())) // 2
+        rows.append((name.strip(), int(self_us) / 1000, int(cumulative_us) / 1000, depth))
+    return rows
+
+
+def import_profile(module: str = "app") -> Dict[str, Any]:
+    """
+    Imports module in a fresh interpreter and returns its total import time,
+    the slowest direct imports and the heavy modules it loaded.
+    """
+    code = f"import sys, json; import {module}; print(json.dumps(sorted(sys.modules)))"
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", code],
+                          cwd=ROOT_DIR, capture_output=True, text=True)
+    if proc.returncode != 0:
+        raise RuntimeError(f"import {module} failed: {proc.stderr.strip().splitlines()[-1]}")
+    rows = parse_importtime(proc.stderr)
+    loaded = set(json.loads(proc.stdout.strip().splitlines()[-1]))
+    # A module's own imports are listed before it, one level deeper
+    direct, total = [], None
+    for name, _, cumulative, depth in rows:
+        if depth == 1:
+            direct.append((name, cumulative))
+        elif depth == 0:
+            if name == module:
+                total = cumulative
+                break
+            direct = []
+    direct.sort(key=lambda row: -row[1])
+    return {
+        "import_ms": round(total, 1),
+        "slowest": [{"module": name, "ms": round(ms, 1)} for name, ms in direct[:10]],
+        "eager_heavy_modules": sorted(m for m in LAZY_MODULES if m in loaded),
+    }
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def first_response(timeout: float = 30.0) -> float:
+    """
+    Seconds from launching `uvicorn app:app` until GET / returns 200.
+    """
+    port = free_port()
+    start = time.perf_counter()
+    server = subprocess.Popen([sys.executable, "-m", "uvicorn", "app:app", "--port", str(port)],
+                              cwd=ROOT_DIR, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        while time.perf_counter() - start < timeout:
+            if server.poll() is not None:
+                raise RuntimeError("uvicorn exited before serving a request")
+            try:
+                with urllib.request.urlopen(f"http://127.0.0.1:{port}/", timeout=1) as response:
+                    if response.status == 200:
+                        return time.perf_counter() - start
+            except OSError:
+                time.sleep(0.02)
+        raise RuntimeError(f"no response within {timeout}s")
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def run(runs: int = 3, server: bool = True) -> Dict[str, Any]:
+    profiles = [import_profile() for _ in range(runs)]
+    best = min(profiles, key=lambda p: p["import_ms"])
+    report = {
+        "runs": runs,
+        "import_ms": best["import_ms"],
+        "slowest": best["slowest"],
+        "eager_heavy_modules": best["eager_heavy_modules"],
+    }
+    if server:
+        report["first_response_ms"] = round(min(first_response() for _ in range(runs)) * 1000, 1)
+    return report
+
+
+def check_budgets(report: Dict[str, Any], thresholds: Dict[str, Any]) -> List[str]:
+    failures = []
+    if report["eager_heavy_modules"]:
+        failures.append(f"imported at startup: {', '.join(report['eager_heavy_modules'])}")
+    for key, budget in (thresholds.get("cold_start_ms") or {}).items():
+        value = report.get(f"{key}_ms")
+        if value is not None and value > budget:
+            failures.append(f"{key}: {value}ms exceeds budget {budget}ms")
+    return failures
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Aegis cold-start benchmark")
+    parser.add_argument("--runs", type=int, default=3, help="Fresh interpreters per measurement (best is kept)")
+    parser.add_argument("--no-server", action="store_true", help="Skip the time-to-first-response measurement")
+    parser.add_argument("--thresholds", default=DEFAULT_THRESHOLDS)
+    parser.add_argument("--json", help="Also write the report to this file")
+    args = parser.parse_args(argv)
+
+    report = run(args.runs, not args.no_server)
+    print(f"[*] import app: {report['import_ms']}ms (best of {report['runs']})")
+    for row in report["slowest"]:
+        print(f"    {row['module']:<40}{row['ms']:>10}ms")
+    if "first_response_ms" in report:
+        print(f"[*] uvicorn start to first GET /: {report['first_response_ms']}ms")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+
+    with open(args.thresholds, "r") as f:
+        thresholds = yaml.safe_load(f) or {}
+    failures = check_budgets(report, thresholds)
+    for failure in failures:
+        print(f"[!] REGRESSION {failure}")
+    if not failures:
+        print("[+] Cold start within budget")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
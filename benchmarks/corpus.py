@@ -0,0 +1,88 @@
+"""
+Benchmark page corpus.
+Synthetic pages are generated deterministically so numbers are comparable
+between runs; recorded pages are loaded from benchmarks/corpus/.
+"""
+import os
+import random
+import string
+from typing import Dict, List
+
+CORPUS_DIR = os.path.join(os.path.dirname(__file__), "corpus")
+
+WORDS = ("lorem ipsum dolor sit amet consectetur adipiscing elit sed do eiusmod tempor "
+         "incididunt ut labore et dolore magna aliqua admin database config root").split()
+
+
+def _words(rng: random.Random, count: int) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(count))
+
+
+def _token(rng: random.Random, length: int, alphabet: str = string.ascii_letters + string.digits) -> str:
+    return "".join(rng.choice(alphabet) for _ in range(length))
+
+
+def small_html(rng: random.Random, scale: float = 1.0) -> str:
+    paragraphs = "".join(f"<p>{_words(rng, 60)}</p>" for _ in range(max(1, int(20 * scale))))
+    return (f"<html><head><title>Welcome</title><style>p {{color: #333}}</style></head>"
+            f"<body><nav>Home About Contact</nav>{paragraphs}"
+            f"<footer>Contact us at info@example.com</footer></body></html>")
+
+
+def sql_dump(rng: random.Random, scale: float = 1.0) -> str:
+    rows = max(10, int(40000 * scale))
+    lines = ["-- MySQL dump 10.13", "DROP TABLE IF EXISTS `users`;",
+             "CREATE TABLE `users` (`id` int, `email` varchar(255), `password` varchar(255));"]
+    for i in range(rows):
+        lines.append(f"INSERT INTO `users` VALUES ({i},'user{i}@example.com','{_token(rng, 32, 'abcdef0123456789')}');")
+    return "\n".join(lines)
+
+
+def env_file(rng: random.Random, scale: float = 1.0) -> str:
+    lines = [
+        "APP_ENV=production",
+        f"DB_PASSWORD={_token(rng, 20)}",
+        f"AWS_ACCESS_KEY_ID=AKIA{_token(rng, 16, string.ascii_uppercase + string.digits)}",
+        f"AWS_SECRET_ACCESS_KEY={_token(rng, 40)}",
+        f"STRIPE_KEY=sk_live_{_token(rng, 24)}",
+        f"GOOGLE_API_KEY=AIza{_token(rng, 35)}",
+        f"GITHUB_TOKEN=ghp_{_token(rng, 36)}",
+        f"OPENAI_API_KEY=sk-{_token(rng, 48)}",
+        f"SESSION_SECRET={_token(rng, 32)}",
+    ]
+    for i in range(max(0, int(40 * scale))):
+        lines.append(f"FEATURE_FLAG_{i}=true")
+    return "\n".join(lines)
+
+
+def email_dense(rng: random.Random, scale: float = 1.0) -> str:
+    count = max(10, int(5000 * scale))
+    entries = [f"{_token(rng, 8, string.ascii_lowercase)}.{_token(rng, 6, string.ascii_lowercase)}@corp{i % 50}.example.com"
+               for i in range(count)]
+    return "<html><body><h1>Staff directory</h1><ul>" + "".join(f"<li>{e}</li>" for e in entries) + "</ul></body></html>"
+
+
+SYNTHETIC = {
+    "small_html.html": small_html,
+    "sql_dump.sql": sql_dump,
+    "production.env": env_file,
+    "email_dense.html": email_dense,
+}
+
+
+def build_corpus(scale: float = 1.0, seed: int = 1337, include_recorded: bool = True) -> Dict[str, str]:
+    """
+    Returns {page name: raw page body}.
+    """
+    rng = random.Random(seed)
+    pages = {name: generator(rng, scale) for name, generator in SYNTHETIC.items()}
+
+    if include_recorded and os.path.isdir(CORPUS_DIR):
+        for name in sorted(os.listdir(CORPUS_DIR)):
+            with open(os.path.join(CORPUS_DIR, name), "r", encoding="utf-8") as f:
+                pages[f"recorded/{name}"] = f.read()
+    return pages
+
+
+def page_names(pages: Dict[str, str]) -> List[str]:
+    return sorted(pages)
@@ -0,0 +1,91 @@
+"""
+Deterministic stand-ins for the external backends (search, browser, ML model,
+vision API) so benchmarks measure our own code rather than the network.
+"""
+import time
+import requests
+from typing import Any, Dict, List
+
+from modules.selenium_scraper import extract_blocks
+from modules.ml_threat_classifier import MLThreatClassifier
+
+
+class FakeSearch:
+    """
+    Returns corpus URLs for any query, round-robin.
+    """
+    def __init__(self, urls: List[str]):
+        self.urls = urls
+        self._offset = 0
+
+    def __call__(self, query: str, num_results: int = 10) -> List[str]:
+        picked = [self.urls[(self._offset + i) % len(self.urls)] for i in range(min(num_results, len(self.urls)))]
+        self._offset += 1
+        return picked
+
+
+class HttpScraper:
+    """
+    Drop-in for SeleniumScraper that fetches over plain HTTP and runs the same
+    text extraction.
+    """
+    def __init__(self, timeout: int = 10):
+        self.timeout = timeout
+        self.session = requests.Session()
+
+    def fetch_html(self, url: str) -> str:
+        response = self.session.get(url, timeout=self.timeout)
+        response.raise_for_status()
+        return response.text
+
+    def fetch_content(self, url: str) -> Dict[str, Any]:
+        html = self.fetch_html(url)
+        blocks = extract_blocks(html)
+        return {"url": url, "html": html, "text": " ".join(blocks), "blocks": blocks, "screenshot": None}
+
+    def close(self):
+        self.session.close()
+
+
+class FakeThreatClassifier(MLThreatClassifier):
+    """
+    Keyword-based replacement for the transformer pipeline with optional
+    simulated inference latency.
+    """
+    KEYWORDS = {
+        "private key": "private key exposure",
+        "password": "credential leak",
+        "akia": "api key exposure",
+        "create table": "database configuration",
+        "token": "authentication token",
+    }
+
+    def __init__(self, latency: float = 0.0):
+        self.latency = latency
+        self.threat_labels = []
+        self.classifier = self._classify
+
+    def _classify(self, text, candidate_labels=None, multi_label=True):
+        if self.latency:
+            time.sleep(self.latency)
+        lowered = text.lower()
+        for keyword, label in self.KEYWORDS.items():
+            if keyword in lowered:
+                return {"labels": [label, "benign content"], "scores": [0.9, 0.1]}
+        return {"labels": ["benign content"], "scores": [0.8]}
+
+
+class FakeVisionAnalyzer:
+    def __init__(self, latency: float = 0.0):
+        self.latency = latency
+
+    def analyze_screenshot(self, base64_image: str, timeout: float = 30) -> Dict[str, Any]:
+        if self.latency:
+            time.sleep(self.latency)
+        return {"enabled": True, "classification": "benign", "is_sensitive": False}
+
+    def mock_analyze(self, text_content: str) -> Dict[str, Any]:
+        lowered = text_content.lower()
+        if "dashboard" in lowered or "admin" in lowered:
+            return {"enabled": False, "classification": "potential admin dashboard (heuristic)", "is_sensitive": True}
+        return {"enabled": False, "classification": "benign", "is_sensitive": False}
@@ -0,0 +1,126 @@
+"""
+Latency and memory benchmark for the ML threat classifier backends.
+Each backend is loaded in its own subprocess so peak RSS is not shared, then
+classifies text samples from the benchmark corpus. Top labels are compared
+against the first backend to report agreement.
+
+Usage:
+    python -m benchmarks.ml_backends [--backends pytorch onnx] [--samples 20]
+        [--onnx-model-dir models/distilbart-mnli-12-1-int8]
+"""
+import sys
+import json
+import time
+import resource
+import argparse
+import subprocess
+from typing import Any, Dict, List
+
+from benchmarks.corpus import build_corpus, page_names
+from benchmarks.run_benchmarks import percentile
+from modules.selenium_scraper import extract_text
+from modules.onnx_classifier import DEFAULT_MODEL_DIR
+
+
+def rss_mb() -> float:
+    # ru_maxrss is in KB on Linux, bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def samples(count: int) -> List[str]:
+    pages = build_corpus(scale=1.0)
+    texts = [extract_text(pages[name]) for name in page_names(pages)]
+    texts = [text for text in texts if text.strip()]
+    return [texts[i % len(texts)] for i in range(count)]
+
+
+def measure(backend: str, count: int, onnx_model_dir: str) -> Dict[str, Any]:
+    from modules.ml_threat_classifier import MLThreatClassifier
+
+    texts = samples(count)
+    baseline_rss = rss_mb()
+    start = time.perf_counter()
+    classifier = MLThreatClassifier(backend=backend, onnx_model_dir=onnx_model_dir)
+    load_s = time.perf_counter() - start
+    if not classifier.classifier:
+        return {"backend": backend, "error": "backend unavailable"}
+    loaded_rss = rss_mb()
+
+    classifier.classify_threat(texts[0])  # warm-up
+    latencies, results = [], []
+    for text in texts:
+        start = time.perf_counter()
+        results.append(classifier.classify_threat(text))
+        latencies.append(time.perf_counter() - start)
+
+    return {
+        "backend": backend,
+        "load_s": round(load_s, 2),
+        "p50_ms": round(percentile(latencies, 50) * 1000, 1),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 1),
+        "rss_before_mb": baseline_rss,
+        "rss_loaded_mb": loaded_rss,
+        "rss_peak_mb": rss_mb(),
+        "top_threats": [r.get("top_threat") for r in results],
+    }
+
+
+def run(backends: List[str], count: int, onnx_model_dir: str) -> List[Dict[str, Any]]:
+    reports = []
+    for backend in backends:
+        proc = subprocess.run(
+            [sys.executable, "-m", "benchmarks.ml_backends", "--child", backend,
+             "--samples", str(count), "--onnx-model-dir", onnx_model_dir],
+            capture_output=True, text=True
+        )
+        lines = proc.stdout.strip().splitlines()
+        if proc.returncode != 0 or not lines:
+            errors = proc.stderr.strip().splitlines()
+            reports.append({"backend": backend, "error": errors[-1] if errors else "failed"})
+            continue
+        reports.append(json.loads(lines[-1]))
+
+    reference = next((r for r in reports if "top_threats" in r), None)
+    for report in reports:
+        if reference and "top_threats" in report:
+            same = sum(a == b for a, b in zip(report["top_threats"], reference["top_threats"]))
+            report["top_label_agreement"] = round(same / len(reference["top_threats"]), 3)
+    return reports
+
+
+def print_report(reports: List[Dict[str, Any]]):
+    print(f"{'backend':<10}{'load s':>8}{'p50 ms':>9}{'p95 ms':>9}{'RSS MB':>9}{'peak MB':>9}{'agree':>7}")
+    for r in reports:
+        if "error" in r:
+            print(f"{r['backend']:<10} {r['error']}")
+            continue
+        print(f"{r['backend']:<10}{r['load_s']:>8}{r['p50_ms']:>9}{r['p95_ms']:>9}"
+              f"{r['rss_loaded_mb']:>9}{r['rss_peak_mb']:>9}{r.get('top_label_agreement', 1.0):>7}")
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Compare ML threat classifier backends")
+    parser.add_argument("--backends", nargs="+", default=["pytorch", "onnx"])
+    parser.add_argument("--samples", type=int, default=20)
+    parser.add_argument("--onnx-model-dir", default=DEFAULT_MODEL_DIR)
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    parser.add_argument("--json", help="Also write the results to this file")
+    args = parser.parse_args(argv)
+
+    if args.child:
+        report = measure(args.child, args.samples, args.onnx_model_dir)
+        # Last stdout line is the result; model loading logs go before it
+        print(json.dumps(report))
+        return 0
+
+    reports = run(args.backends, args.samples, args.onnx_model_dir)
+    print_report(reports)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(reports, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,212 @@
+"""
+Offline benchmark harness.
+Runs every scan stage over the benchmark corpus with mocked search, fetch, ML
+and vision backends, and reports throughput and latency percentiles per stage.
+
+Usage:
+    python -m benchmarks.run_benchmarks [--scale 1.0] [--iterations 5]
+        [--baseline benchmarks/baseline.json] [--save-baseline]
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+from collections import defaultdict
+from typing import Any, Callable, Dict, List
+
+import yaml
+
+from benchmarks.corpus import build_corpus, page_names
+from benchmarks.server import CorpusServer
+from benchmarks.fakes import FakeSearch, HttpScraper, FakeThreatClassifier, FakeVisionAnalyzer
+from modules.ai_analyzer import AIAnalyzer
+from modules.selenium_scraper import extract_text
+from modules.risk_scoring import RiskScorer
+from modules.report_builder import generate_reports
+
+BENCH_DIR = os.path.dirname(__file__)
+DEFAULT_THRESHOLDS = os.path.join(BENCH_DIR, "thresholds.yaml")
+DEFAULT_BASELINE = os.path.join(BENCH_DIR, "baseline.json")
+
+
+class StageTimer:
+    def __init__(self):
+        self.samples: Dict[str, List[float]] = defaultdict(list)
+        self.bytes: Dict[str, int] = defaultdict(int)
+
+    def measure(self, stage: str, fn: Callable[[], Any], size: int = 0) -> Any:
+        start = time.perf_counter()
+        result = fn()
+        self.samples[stage].append(time.perf_counter() - start)
+        self.bytes[stage] += size
+        return result
+
+
+def percentile(values: List[float], pct: float) -> float:
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    index = min(len(ordered) - 1, max(0, int(round(pct / 100.0 * len(ordered) + 0.5)) - 1))
+    return ordered[index]
+
+
+def summarize(timer: StageTimer) -> Dict[str, Dict[str, float]]:
+    summary = {}
+    for stage, samples in timer.samples.items():
+        total = sum(samples)
+        summary[stage] = {
+            "calls": len(samples),
+            "p50_ms": round(percentile(samples, 50) * 1000, 3),
+            "p95_ms": round(percentile(samples, 95) * 1000, 3),
+            "p99_ms": round(percentile(samples, 99) * 1000, 3),
+            "calls_per_sec": round(len(samples) / total, 2) if total else 0.0,
+            "mb_per_sec": round(timer.bytes[stage] / total / 1e6, 2) if total and timer.bytes[stage] else 0.0,
+        }
+    return summary
+
+
+def build_analyzer(use_nlp: bool, ml_latency: float, vision_latency: float) -> AIAnalyzer:
+    """
+    AIAnalyzer with every backend replaced by a local fake (NLP only if spaCy is installed).
+    """
+    analyzer = AIAnalyzer(config_path=os.devnull)
+    analyzer.ml_engine = FakeThreatClassifier(latency=ml_latency)
+    analyzer.use_ml = True
+    analyzer.vision_engine = FakeVisionAnalyzer(latency=vision_latency)
+    analyzer.use_vision = True
+    if use_nlp:
+        from modules.nlp_analyzer import NLPAnalyzer
+        nlp = NLPAnalyzer()
+        if nlp.nlp:
+            analyzer.nlp_engine = nlp
+            analyzer.use_nlp = True
+    return analyzer
+
+
+def run(scale: float = 1.0, iterations: int = 5, use_nlp: bool = False,
+        ml_latency: float = 0.0, vision_latency: float = 0.0) -> Dict[str, Any]:
+    pages = build_corpus(scale=scale)
+    names = page_names(pages)
+    timer = StageTimer()
+    analyzer = build_analyzer(use_nlp, ml_latency, vision_latency)
+    with open(os.path.join(BENCH_DIR, "..", "config.yaml"), "r") as f:
+        scorer = RiskScorer(yaml.safe_load(f))
+
+    with CorpusServer(pages) as server, tempfile.TemporaryDirectory() as report_dir:
+        search = FakeSearch([server.url_for(name) for name in names])
+        scraper = HttpScraper()
+        for _ in range(iterations):
+            urls = timer.measure("search", lambda: search("site:example.com ext:env", num_results=len(names)))
+            results = []
+            for url in urls:
+                html = timer.measure("fetch", lambda: scraper.fetch_html(url))
+                size = len(html.encode("utf-8"))
+                text = timer.measure("extract", lambda: extract_text(html), size)
+                content = {"url": url, "html": html, "text": text, "screenshot": None}
+
+                timer.measure("regex", lambda: analyzer._regex_analyze(text), size)
+                timer.measure("entropy", lambda: analyzer.entropy_detector.analyze(text), size)
+                if analyzer.nlp_engine:
+                    timer.measure("nlp", lambda: analyzer.nlp_engine.analyze(content), size)
+                timer.measure("vision", lambda: analyzer.vision_engine.mock_analyze(text))
+
+                findings = timer.measure("analyze", lambda: analyzer.analyze(content), size)
+                results.append({"url": url, "findings": findings})
+
+            scores = timer.measure("score_batch", lambda: scorer.score_batch([r["findings"] for r in results]))
+            for result, (score, level) in zip(results, scores):
+                timer.measure("score", lambda: scorer.score(result["findings"]))
+                result["risk_score"], result["risk_level"] = score, level
+
+            timer.measure("report", lambda: generate_reports(results, report_dir))
+        scraper.close()
+
+    return {
+        "scale": scale,
+        "iterations": iterations,
+        "pages": len(names),
+        "corpus_mb": round(sum(len(body) for body in pages.values()) / 1e6, 2),
+        "stages": summarize(timer),
+        "cascade": dict(analyzer.cascade.decisions) if analyzer.cascade else {},
+    }
+
+
+def check_regressions(report: Dict[str, Any], thresholds: Dict[str, Any],
+                      baseline: Dict[str, Any] = None) -> List[str]:
+    failures = []
+    stages = report["stages"]
+    for stage, budget in (thresholds.get("budgets_ms") or {}).items():
+        if stage in stages and stages[stage]["p95_ms"] > budget:
+            failures.append(f"{stage}: p95 {stages[stage]['p95_ms']}ms exceeds budget {budget}ms")
+
+    if baseline:
+        metric = thresholds.get("compare_metric", "p50_ms")
+        allowed = 1.0 + thresholds.get("max_regression", 0.25)
+        for stage, stats in stages.items():
+            before = baseline.get("stages", {}).get(stage, {}).get(metric)
+            if before and stats[metric] > before * allowed:
+                failures.append(f"{stage}: {metric} {stats[metric]}ms vs baseline {before}ms "
+                                f"(+{(stats[metric] / before - 1) * 100:.0f}%)")
+    return failures
+
+
+def print_report(report: Dict[str, Any]):
+    print(f"[*] {report['pages']} pages, {report['corpus_mb']} MB corpus, {report['iterations']} iterations")
+    print(f"{'stage':<10}{'calls':>7}{'p50 ms':>11}{'p95 ms':>11}{'p99 ms':>11}{'calls/s':>11}{'MB/s':>9}")
+    for stage, s in sorted(report["stages"].items()):
+        print(f"{stage:<10}{s['calls']:>7}{s['p50_ms']:>11}{s['p95_ms']:>11}{s['p99_ms']:>11}"
+              f"{s['calls_per_sec']:>11}{s['mb_per_sec']:>9}")
+    decided = sum(report.get("cascade", {}).values())
+    if decided:
+        shares = ", ".join(f"{tier} {count / decided:.0%}" for tier, count in report["cascade"].items())
+        print(f"[*] Findings verified by cascade tier: {shares}")
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Aegis offline benchmark suite")
+    parser.add_argument("--scale", type=float, default=1.0, help="Corpus size multiplier")
+    parser.add_argument("--iterations", type=int, default=5)
+    parser.add_argument("--nlp", action="store_true", help="Include the spaCy stage (requires spaCy)")
+    parser.add_argument("--ml-latency", type=float, default=0.0, help="Simulated model latency per call (s)")
+    parser.add_argument("--vision-latency", type=float, default=0.0, help="Simulated vision latency per call (s)")
+    parser.add_argument("--thresholds", default=DEFAULT_THRESHOLDS)
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    parser.add_argument("--save-baseline", action="store_true", help="Write results as the new baseline")
+    parser.add_argument("--json", help="Also write the report to this file")
+    args = parser.parse_args(argv)
+
+    report = run(args.scale, args.iterations, args.nlp, args.ml_latency, args.vision_latency)
+    print_report(report)
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+
+    if args.save_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"[+] Baseline saved to {args.baseline}")
+        return 0
+
+    with open(args.thresholds, "r") as f:
+        thresholds = yaml.safe_load(f) or {}
+    baseline = None
+    if os.path.exists(args.baseline):
+        with open(args.baseline, "r") as f:
+            baseline = json.load(f)
+        if baseline.get("scale") != report["scale"]:
+            print("[!] Baseline was recorded at a different scale; skipping relative comparison")
+            baseline = None
+
+    failures = check_regressions(report, thresholds, baseline)
+    for failure in failures:
+        print(f"[!] REGRESSION {failure}")
+    if not failures:
+        print("[+] No regressions")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,87 @@
+"""
+Local HTTP server fixture that serves a page corpus, so fetch/extract stages
+can be benchmarked without touching the network.
+"""
+import time
+import mimetypes
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional, Union
+from urllib.parse import quote, unquote
+
+
+class CorpusServer:
+    """
+    Serves pages (str) and binary assets (bytes) by name. Paths listed in
+    delays are answered after that many seconds; bytes_sent counts every
+    response body, for bandwidth comparisons.
+    """
+
+    def __init__(self, pages: Dict[str, Union[str, bytes]], host: str = "127.0.0.1", port: int = 0,
+                 delays: Optional[Dict[str, float]] = None):
+        self.pages = {name: body if isinstance(body, bytes) else body.encode("utf-8")
+                      for name, body in pages.items()}
+        self.binary = {name for name, body in pages.items() if isinstance(body, bytes)}
+        self.delays = delays or {}
+        self.host = host
+        self.port = port
+        self.bytes_sent = 0
+        self._lock = threading.Lock()
+        self._server = None
+        self._thread = None
+
+    def url_for(self, name: str) -> str:
+        return f"http://{self.host}:{self.port}/{quote(name)}"
+
+    def _count(self, size: int):
+        with self._lock:
+            self.bytes_sent += size
+
+    def _handler(self):
+        corpus = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                name = unquote(self.path.split("?", 1)[0].lstrip("/"))
+                body = corpus.pages.get(name)
+                if body is None:
+                    self.send_response(404)
+                    self.end_headers()
+                    return
+                if name in corpus.delays:
+                    time.sleep(corpus.delays[name])
+                if name in corpus.binary:
+                    content_type = mimetypes.guess_type(name)[0] or "application/octet-stream"
+                else:
+                    content_type = "text/html" if name.endswith(".html") else "text/plain"
+                    content_type += "; charset=utf-8"
+                self.send_response(200)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+                corpus._count(len(body))
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def start(self):
+        self._server = ThreadingHTTPServer((self.host, self.port), self._handler())
+        self.port = self._server.server_address[1]
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
@@ -0,0 +1,88 @@
+from typing import Any, Dict, List, Optional, Tuple
+
+# Finding types whose matches are compared case-insensitively
+CASE_INSENSITIVE_TYPES = {"email", "sql_dump", "env_exposure", "private_key", "sensitive_organization", "visual_exposure"}
+
+RISK_ORDER = {"NONE": 0, "LOW": 1, "MEDIUM": 2, "HIGH": 3}
+
+# Findings about a whole page (the page classifier's label) rather than a value seen on it
+PAGE_SOURCES = {"ml_page"}
+
+
+def normalize_match(ftype: str, match: str) -> str:
+    normalized = " ".join(str(match or "").split()).strip("'\"")
+    if ftype in CASE_INSENSITIVE_TYPES:
+        normalized = normalized.lower()
+    return normalized
+
+
+def exposure_key(finding: Any, url: Optional[str] = None) -> Tuple[str, ...]:
+    """
+    Identity of an exposure across pages: (type, normalized match). A
+    page-level finding is never the same exposure on two pages: (type,
+    label, url).
+    """
+    key = finding["type"], normalize_match(finding["type"], finding.get("match", ""))
+    if finding.get("source") in PAGE_SOURCES:
+        return key + (url or "",)
+    return key
+
+
+class ExposureAggregator:
+    """
+    Collapses repeated findings (the same email or key on every page of a site)
+    into one exposure per (type, normalized match), recording every URL it was
+    seen at and how often. Page-level findings stay one exposure per page.
+    """
+
+    def __init__(self):
+        self._exposures: Dict[Tuple[str, ...], Dict[str, Any]] = {}
+
+    def add(self, url: str, findings: List[Any], risk_score: int = 0, risk_level: str = "NONE"):
+        for finding in findings:
+            key = exposure_key(finding, url)
+            exposure = self._exposures.get(key)
+            if exposure is None:
+                exposure = {
+                    "type": finding["type"],
+                    "match": finding.get("match", ""),
+                    "context": finding.get("context", ""),
+                    "source": finding.get("source", "regex"),
+                    "confidence": finding.get("confidence", 1.0),
+                    "severity": finding.get("severity"),
+                    "ml_verification": finding.get("ml_verification"),
+                    "occurrences": 0,
+                    "max_risk_score": risk_score,
+                    "max_risk_level": risk_level,
+                    "_locations": {}
+                }
+                self._exposures[key] = exposure
+            exposure["occurrences"] += 1
+            exposure["confidence"] = max(exposure["confidence"], finding.get("confidence", 1.0))
+            if risk_score > exposure["max_risk_score"]:
+                exposure["max_risk_score"] = risk_score
+            if RISK_ORDER.get(risk_level, 0) > RISK_ORDER.get(exposure["max_risk_level"], 0):
+                exposure["max_risk_level"] = risk_level
+            locations = exposure["_locations"]
+            locations[url] = locations.get(url, 0) + 1
+
+    def add_results(self, results: List[Dict[str, Any]]):
+        for entry in results:
+            self.add(entry.get("url"), entry.get("findings", []),
+                     entry.get("risk_score", 0), entry.get("risk_level", "NONE"))
+
+    def __len__(self):
+        return len(self._exposures)
+
+    def exposures(self) -> List[Dict[str, Any]]:
+        """
+        Unique exposures, highest risk and most widespread first.
+        """
+        output = []
+        for exposure in self._exposures.values():
+            item = {k: v for k, v in exposure.items() if k != "_locations" and v is not None}
+            item["url_count"] = len(exposure["_locations"])
+            item["locations"] = [{"url": url, "count": count} for url, count in exposure["_locations"].items()]
+            output.append(item)
+        output.sort(key=lambda e: (-e["max_risk_score"], -e["url_count"], e["type"]))
+        return output
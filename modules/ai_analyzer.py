@@ -4,19 +4,27 @@ import os
 from modules.nlp_analyzer import NLPAnalyzer
 from modules.ml_threat_classifier import MLThreatClassifier
 from modules.vision_analyzer import VisionAnalyzer
+from modules.metrics import timed, record_cache
+from modules.findings import Finding
+from modules.aggregation import exposure_key
+from modules.detection_cascade import DetectionCascade
+from modules.entropy_detector import EntropyDetector
+from modules.boilerplate import BoilerplateFilter
+from modules.page_classifier import PageClassifier, LABEL_TYPES
 
 class AIAnalyzer:
-    def __init__(self, config_path="config.yaml"):
+    def __init__(self, config_path="config.yaml", concurrency=None):
         # Load configuration
         self.config = {}
         if os.path.exists(config_path):
             with open(config_path, 'r') as f:
-                self.config = yaml.safe_load(f)
+                self.config = yaml.safe_load(f) or {}
         
         self.ai_settings = self.config.get("ai_settings", {})
         self.use_ml = self.ai_settings.get("use_ml", False)
         self.use_nlp = self.ai_settings.get("use_nlp", False)
         self.use_vision = self.ai_settings.get("use_vision", False)
+        self.use_entropy = self.ai_settings.get("use_entropy", True)
         
         # Specific patterns for detection (Fast regex baseline)
         self.patterns = {
@@ -30,15 +38,59 @@ class AIAnalyzer:
             "password_alike": r'(?:password|pwd|secret|auth_token)\s*[:=]\s*["\']?([a-zA-Z0-9_@#$%^&+=]{4,})["\']?',
             "env_exposure": r'(?:DB_PASSWORD|AWS_SECRET_ACCESS_KEY|STRIPE_KEY)\s*='
         }
+        self.compiled_patterns = {key: re.compile(pattern, re.IGNORECASE) for key, pattern in self.patterns.items()}
         
         # Initialize AI/ML modules
         self.nlp_engine = NLPAnalyzer() if self.use_nlp else None
-        self.ml_engine = MLThreatClassifier() if self.use_ml else None
-        self.vision_engine = VisionAnalyzer() if self.use_vision else None
+        # How much text NLP gets through per second: a page is cut to what fits in its analysis budget
+        self.nlp_chars_per_second = self.config.get("budgets", {}).get("nlp_chars_per_second")
+        self.ml_engine = MLThreatClassifier(
+            backend=self.ai_settings.get("ml_backend", "pytorch"),
+            onnx_model_dir=self.ai_settings.get("ml_onnx_model_dir", "models/distilbart-mnli-12-1-int8")
+        ) if self.use_ml else None
+        # concurrency: shared ConcurrencyLimits (modules/concurrency.py) for the vision API
+        self.vision_engine = VisionAnalyzer(limit=concurrency.api("vision") if concurrency else None) if self.use_vision else None
+        self.entropy_detector = EntropyDetector() if self.use_entropy else None
+        # Validators and a small n-gram model settle most findings before the transformer
+        self.cascade = None
+        if self.config.get("cascade", {}).get("enabled", True):
+            self.cascade = DetectionCascade.from_config(self.config)
 
-    def analyze(self, content):
+        # Page-level threat label from windows around hotspots, scored as a finding
+        self.page_classifier = None
+        if self.config.get("page_classification", {}).get("enabled", True):
+            self.page_classifier = PageClassifier.from_config(self.config)
+
+        # ML verdicts per (type, normalized match): a secret repeated across
+        # pages is only verified once per scan (see reset())
+        self._verified = {}
+
+        # Header/navigation/footer text repeated across a host's pages goes
+        # through NLP/ML once per scan, on the first page it appears on
+        template_settings = self.config.get("templates", {})
+        self.boilerplate = None
+        self.template_drop_types = set(template_settings.get("drop_types", ["email"]))
+        if template_settings.get("enabled", True):
+            self.boilerplate = BoilerplateFilter(
+                shingle_size=template_settings.get("shingle_size", 3),
+                max_hosts=template_settings.get("max_hosts", 200)
+            )
+
+    def reset(self):
+        """
+        Forgets what was learned from earlier pages. Called when an analyzer
+        that lives longer than one scan (a worker's) starts on another scan.
+        """
+        self._verified.clear()
+        if self.boilerplate:
+            self.boilerplate.clear()
+
+    def analyze(self, content, budget=None):
         """
         Main entry point for analysis. Uses an ensemble approach if enabled.
+        With a PageBudget (modules/deadlines.py), the text given to NLP is cut
+        to what fits in the time left and NLP, ML and vision are skipped once
+        it runs out; regex and entropy findings are always kept.
         """
         text = content.get("text", "")
         screenshot = content.get("screenshot", "")
@@ -46,72 +98,143 @@ class AIAnalyzer:
         if not text and not screenshot:
             return []
             
-        # 1. Regex Baseline (Always run)
-        findings = self._regex_analyze(text)
-        
+        # 1. Regex Baseline (Always run) + 1b. high-entropy tokens
+        findings = self.baseline(content)
+
+        # Only text outside the host's template goes to the expensive stages.
+        # Secrets are still matched on the whole page; repeats of low-value
+        # types (emails in the footer) are reported on the first page only.
+        unique_text = text
+        page = None
+        if self.boilerplate and content.get("blocks"):
+            with timed("template"):
+                page = self.boilerplate.split(content.get("url", ""), content["blocks"])
+            unique_text = page.unique_text
+            findings = [f for f in findings
+                        if f["type"] not in self.template_drop_types or not page.in_template(f.start, f.end)]
+
         # 2. NLP Analysis (Entity extraction & context)
         nlp_data = {}
-        if self.nlp_engine and text:
-            nlp_data = self.nlp_engine.analyze(content)
+        if self.nlp_engine and unique_text and (budget is None or budget.allows("nlp")):
+            nlp_text = budget.truncate("nlp", unique_text, self.nlp_chars_per_second) if budget is not None else unique_text
+            with timed("nlp"):
+                nlp_data = self.nlp_engine.analyze(dict(content, text=nlp_text))
             # Add NLP findings to total findings
             for pattern in nlp_data.get("sensitive_patterns", []):
-                findings.append({
-                    "type": pattern["type"],
-                    "match": pattern.get("organization", "N/A"),
-                    "context": pattern["context"],
-                    "source": "nlp",
-                    "confidence": pattern.get("confidence", 0.5)
-                })
+                findings.append(Finding(
+                    pattern["type"],
+                    source="nlp",
+                    match=pattern.get("organization", "N/A"),
+                    context=pattern["context"],
+                    confidence=pattern.get("confidence", 0.5)
+                ))
 
         # 3. ML Threat Classification
         if self.ml_engine and text:
-            # Classify overall content
-            overall_classification = self.ml_engine.classify_threat(text)
-            
-            # Analyze context for each regex finding with ML
-            for finding in findings:
-                if finding.get("source") != "nlp":
-                    context_analysis = self.ml_engine.analyze_context(text, finding)
-                    finding["ml_verification"] = context_analysis
-                    finding["severity"] = context_analysis.get("severity", "UNKNOWN")
-                    finding["confidence"] = context_analysis.get("ml_confidence", 0.5)
+            with timed("ml"):
+                # Classify the page around its hotspots (the template was classified with the host's first page)
+                page_threat = None
+                if self.page_classifier and unique_text and (budget is None or budget.allows("ml")):
+                    page_threat = self._classify_page(text, unique_text, findings, page, budget)
+
+                # Analyze context for each regex finding with ML
+                for finding in findings:
+                    if finding.get("source") != "nlp":
+                        key = exposure_key(finding)
+                        context_analysis = self._verified.get(key)
+                        record_cache("ml_verification", context_analysis is not None)
+                        if context_analysis is None:
+                            if budget is not None and not budget.allows("ml"):
+                                continue
+                            if self.cascade:
+                                context_analysis = self.cascade.verify(text, finding, self.ml_engine)
+                            else:
+                                context_analysis = self.ml_engine.analyze_context(text, finding)
+                            self._verified[key] = context_analysis
+                        finding["ml_verification"] = context_analysis
+                        finding["severity"] = context_analysis.get("severity", "UNKNOWN")
+                        finding["confidence"] = context_analysis.get("ml_confidence", 0.5)
+
+                if page_threat:
+                    findings.append(page_threat)
 
         # 4. Visual Analysis
         if self.use_vision:
             vision_result = {}
-            if screenshot:
-                vision_result = self.vision_engine.analyze_screenshot(screenshot)
-            else:
-                vision_result = self.vision_engine.mock_analyze(text)
+            with timed("vision"):
+                if screenshot:
+                    if budget is None:
+                        vision_result = self.vision_engine.analyze_screenshot(screenshot)
+                    elif budget.allows("vision"):
+                        timeout = budget.vision_timeout()
+                        vision_result = self.vision_engine.analyze_screenshot(screenshot, 30 if timeout is None else timeout)
+                        if vision_result.get("timed_out"):
+                            budget.skip("vision")
+                else:
+                    vision_result = self.vision_engine.mock_analyze(text)
             
             if vision_result.get("is_sensitive"):
-                findings.append({
-                    "type": "visual_exposure",
-                    "match": vision_result.get("classification"),
-                    "context": vision_result.get("analysis", "Detected via visual pattern matching."),
-                    "source": "vision",
-                    "confidence": 0.8 if vision_result.get("enabled") else 0.4
-                })
+                findings.append(Finding(
+                    "visual_exposure",
+                    source="vision",
+                    match=vision_result.get("classification"),
+                    context=vision_result.get("analysis", "Detected via visual pattern matching."),
+                    confidence=0.8 if vision_result.get("enabled") else 0.4
+                ))
+
+        return findings
+
+    def baseline(self, content):
+        """
+        Regex and entropy findings only, the part of analyze() that always
+        runs. Also the fallback for a page whose full analysis overran.
+        """
+        text = content.get("text", "")
+        with timed("regex"):
+            findings = self._regex_analyze(text)
 
+        # Generic high-entropy tokens not already matched by a pattern
+        if self.entropy_detector and text:
+            with timed("entropy"):
+                known = [(f.start, f.end) for f in findings]
+                findings.extend(self.entropy_detector.analyze(text, known))
         return findings
 
+    def _classify_page(self, text, unique_text, findings, page, budget):
+        """
+        Page-level classification as a finding of the label's type, or None if
+        no threat label reached the confidence threshold.
+        """
+        exclude = page.in_template if page else None
+        spans = [(f.start, f.end) for f in findings if f.source != "nlp"]
+        hotspots = self.page_classifier.hotspots(text, spans, exclude)
+        # Without hotspots the top of the page is classified, minus the template
+        result = self.page_classifier.classify(text if hotspots else unique_text, self.ml_engine, hotspots, budget)
+        if not result or not result["label"] or result["confidence"] < self.page_classifier.threshold:
+            return None
+        label = result["label"]
+        source = text if hotspots else unique_text
+        middle = (result["start"] + result["end"]) // 2
+        snippet = source[max(result["start"], middle - 100):min(result["end"], middle + 100)].replace('\n', ' ').strip()
+        threat = Finding(
+            LABEL_TYPES.get(label, label.replace(" ", "_")),
+            source="ml_page",
+            match=label,
+            context=f"...{snippet}...",
+            confidence=result["confidence"],
+            severity=self.ml_engine.get_severity_score({"enabled": True, "top_threat": label,
+                                                        "top_confidence": result["confidence"]})
+        )
+        threat["page_classification"] = {key: result[key] for key in ("windows_classified", "windows_total", "early_exit")}
+        return threat
+
     def _regex_analyze(self, text):
         """
         Performs classic regex-based pattern matching.
         """
         findings = []
-        for key, pattern in self.patterns.items():
-            matches = re.finditer(pattern, text, re.IGNORECASE)
-            for match in matches:
-                # Extract context (50 chars before and after)
-                start = max(0, match.start() - 50)
-                end = min(len(text), match.end() + 50)
-                context = text[start:end].replace('\n', ' ').strip()
-                
-                findings.append({
-                    "type": key,
-                    "match": match.group(),
-                    "context": f"...{context}...",
-                    "source": "regex"
-                })
+        for key, pattern in self.compiled_patterns.items():
+            # Findings keep offsets into text; match and context are built lazily
+            for match in pattern.finditer(text):
+                findings.append(Finding(key, page=text, start=match.start(), end=match.end()))
         return findings
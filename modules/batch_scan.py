@@ -0,0 +1,117 @@
+import os
+import csv
+import json
+from collections import Counter
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+RISK_LEVELS = ("HIGH", "MEDIUM", "LOW")
+
+
+def normalize_domain(raw: str) -> str:
+    """
+    Bare host name from user input such as "https://www.Example.com/path".
+    """
+    domain = raw.strip().lower()
+    for prefix in ("http://", "https://"):
+        if domain.startswith(prefix):
+            domain = domain[len(prefix):]
+    domain = domain.split("/", 1)[0]
+    if domain.startswith("www."):
+        domain = domain[4:]
+    return domain
+
+
+def parse_domains(lines: Iterable[str]) -> List[str]:
+    """
+    Domains from a scope file: one per line, '#' comments and duplicates skipped.
+    """
+    domains = []
+    for line in lines:
+        line = line.split("#", 1)[0]
+        domain = normalize_domain(line)
+        if domain and domain not in domains:
+            domains.append(domain)
+    return domains
+
+
+def interleave_dorks(domain_dorks: Dict[str, List[Tuple[Optional[str], str]]],
+                     max_searches: Optional[int] = None) -> List[Tuple[str, Optional[str], str]]:
+    """
+    (domain, category, dork) triples taking one dork per domain in turn, so a
+    search quota that runs out leaves every domain with the same number of
+    searches instead of spending it all on the first domains of the list.
+    """
+    interleaved = []
+    longest = max((len(dorks) for dorks in domain_dorks.values()), default=0)
+    for i in range(longest):
+        for domain, dorks in domain_dorks.items():
+            if i < len(dorks):
+                interleaved.append((domain, *dorks[i]))
+    return interleaved[:max_searches] if max_searches else interleaved
+
+
+def combine_results(domains: List[str], results: List[Dict[str, Any]],
+                    reports: Dict[str, Dict[str, str]], osint: Optional[Dict[str, Dict[str, Any]]] = None) -> Dict[str, Any]:
+    """
+    Combined batch summary: one row per domain (most HIGH-risk pages first)
+    and totals across the batch.
+    """
+    rows = {domain: {"domain": domain, "pages": 0, "findings": 0, "risk_levels": Counter(), "finding_types": Counter(),
+                     "max_risk_score": 0, "reports": reports.get(domain, {})} for domain in domains}
+    for result in results:
+        row = rows.get(result.get("domain"))
+        if row is None:
+            continue
+        findings = result.get("findings", [])
+        row["pages"] += 1
+        row["findings"] += len(findings)
+        row["risk_levels"][result.get("risk_level", "NONE")] += 1
+        row["finding_types"].update(finding["type"] for finding in findings)
+        row["max_risk_score"] = max(row["max_risk_score"], result.get("risk_score", 0))
+
+    for domain, row in rows.items():
+        host = (osint or {}).get(domain)
+        if host and host.get("enabled"):
+            row["osint_exposures"] = len(host.get("exposures", []))
+            row["osint_vulns"] = len(host.get("vulns", []))
+        row["risk_levels"] = dict(row["risk_levels"])
+        row["finding_types"] = dict(row["finding_types"].most_common())
+
+    ordered = sorted(rows.values(), key=lambda r: (-r["risk_levels"].get("HIGH", 0), -r["max_risk_score"],
+                                                   -r["findings"], r["domain"]))
+    totals = Counter()
+    for row in ordered:
+        totals.update(row["risk_levels"])
+    return {
+        "domains": ordered,
+        "totals": {
+            "domains": len(ordered),
+            "domains_with_findings": sum(1 for row in ordered if row["findings"]),
+            "pages": sum(row["pages"] for row in ordered),
+            "findings": sum(row["findings"] for row in ordered),
+            "risk_levels": dict(totals)
+        }
+    }
+
+
+def write_batch_summary(summary: Dict[str, Any], output_dir: str, name: str) -> Tuple[str, str]:
+    """
+    Writes the combined summary as JSON and as a one-row-per-domain CSV.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    json_path = os.path.join(output_dir, f"{name}_{timestamp}.json")
+    csv_path = os.path.join(output_dir, f"{name}_{timestamp}.csv")
+    with open(json_path, "w") as f:
+        json.dump(summary, f, indent=4)
+    with open(csv_path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["domain", "pages", "findings", "high", "medium", "low", "max_risk_score",
+                         "top_finding_types", "osint_exposures", "report_json", "report_csv"])
+        for row in summary["domains"]:
+            levels = row["risk_levels"]
+            writer.writerow([row["domain"], row["pages"], row["findings"], *(levels.get(level, 0) for level in RISK_LEVELS),
+                             row["max_risk_score"], "; ".join(list(row["finding_types"])[:5]),
+                             row.get("osint_exposures", ""), row["reports"].get("json", ""), row["reports"].get("csv", "")])
+    return json_path, csv_path
@@ -0,0 +1,93 @@
+import bisect
+from collections import OrderedDict
+from typing import List, Optional, Sequence, Set, Tuple
+from urllib.parse import urlparse
+
+from modules.metrics import TEMPLATE_CHARS
+
+
+class PageSplit:
+    """
+    A page's text split into per-page content and the site template.
+    template_spans are (start, end) offsets into the full text, which is the
+    blocks joined by single spaces as produced by extract_text().
+    """
+
+    def __init__(self, unique_text: str, template_spans: List[Tuple[int, int]]):
+        self.unique_text = unique_text
+        self.template_spans = template_spans
+        self._starts = [start for start, _ in template_spans]
+
+    def in_template(self, start: int, end: int) -> bool:
+        i = bisect.bisect_right(self._starts, start) - 1
+        return i >= 0 and end <= self.template_spans[i][1]
+
+
+class BoilerplateFilter:
+    """
+    Learns each host's page template (header, navigation, footer) from the
+    pages seen so far. A page is cut into text blocks; every run of
+    shingle_size consecutive blocks is hashed, and blocks covered by a
+    shingle that already appeared on an earlier page of the same host are
+    template. They were analyzed in full on that earlier page, so NLP and ML
+    only need to see the rest.
+    """
+
+    def __init__(self, shingle_size: int = 3, max_hosts: int = 200):
+        self.shingle_size = shingle_size
+        self.max_hosts = max_hosts
+        self._hosts: "OrderedDict[str, Set[int]]" = OrderedDict()
+
+    def clear(self):
+        """
+        Forgets every host's template, e.g. when a new scan starts.
+        """
+        self._hosts.clear()
+
+    def _shingles(self, blocks: Sequence[str]) -> List[int]:
+        width = min(self.shingle_size, len(blocks))
+        return [hash(tuple(blocks[i:i + width])) for i in range(len(blocks) - width + 1)]
+
+    def _host_shingles(self, url: str) -> Set[int]:
+        host = urlparse(url).hostname or ""
+        seen = self._hosts.get(host)
+        if seen is None:
+            seen = self._hosts[host] = set()
+            if len(self._hosts) > self.max_hosts:
+                self._hosts.popitem(last=False)
+        else:
+            self._hosts.move_to_end(host)
+        return seen
+
+    def split(self, url: str, blocks: Sequence[str]) -> Optional[PageSplit]:
+        """
+        Splits a page into unique text and template spans, and adds its
+        shingles to the host's template. Returns None for pages without blocks.
+        """
+        if not blocks:
+            return None
+        seen = self._host_shingles(url)
+        shingles = self._shingles(blocks)
+        width = min(self.shingle_size, len(blocks))
+        template = [False] * len(blocks)
+        for i, shingle in enumerate(shingles):
+            if shingle in seen:
+                template[i:i + width] = [True] * width
+        seen.update(shingles)
+
+        unique, spans = [], []
+        offset = 0
+        for block, is_template in zip(blocks, template):
+            if is_template:
+                if spans and spans[-1][1] + 1 == offset:
+                    spans[-1] = (spans[-1][0], offset + len(block))
+                else:
+                    spans.append((offset, offset + len(block)))
+            else:
+                unique.append(block)
+            offset += len(block) + 1
+
+        unique_text = " ".join(unique)
+        TEMPLATE_CHARS.inc(len(unique_text), part="unique")
+        TEMPLATE_CHARS.inc(offset - 1 - len(unique_text), part="template")
+        return PageSplit(unique_text, spans)
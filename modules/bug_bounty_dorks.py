@@ -8,8 +8,14 @@ def get_bug_bounty_dorks(domain):
     Returns a comprehensive list of Google Dorks for the target domain.
     These dorks are designed to find sensitive exposures commonly found during bug bounty hunting.
     """
-    
-    dorks = []
+    return [dork for _, dork in get_categorized_bug_bounty_dorks(domain)]
+
+
+def get_categorized_bug_bounty_dorks(domain):
+    """
+    Same dorks as get_bug_bounty_dorks, as (category, dork) pairs.
+    Categories are the keys of get_dork_categories().
+    """
     
     # Admin panels and login pages
     admin_dorks = [
@@ -138,19 +144,21 @@ def get_bug_bounty_dorks(domain):
     ]
     
     # Combine all dorks
-    dorks.extend(admin_dorks)
-    dorks.extend(config_dorks)
-    dorks.extend(database_dorks)
-    dorks.extend(log_dorks)
-    dorks.extend(document_dorks)
-    dorks.extend(source_code_dorks)
-    dorks.extend(api_dorks)
-    dorks.extend(error_dorks)
-    dorks.extend(directory_dorks)
-    dorks.extend(subdomain_dorks)
-    dorks.extend(email_dorks)
+    categorized = [
+        ("admin_panels", admin_dorks),
+        ("config_files", config_dorks),
+        ("databases", database_dorks),
+        ("logs", log_dorks),
+        ("documents", document_dorks),
+        ("source_code", source_code_dorks),
+        ("api", api_dorks),
+        ("errors", error_dorks),
+        ("directories", directory_dorks),
+        ("subdomains", subdomain_dorks),
+        ("emails", email_dorks),
+    ]
     
-    return dorks
+    return [(category, dork) for category, dorks in categorized for dork in dorks]
 
 
 def get_dork_categories():
@@ -0,0 +1,302 @@
+import time
+import asyncio
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from urllib.parse import urlparse
+
+from modules.metrics import CONCURRENCY_LIMIT, CONCURRENCY_IN_FLIGHT
+
+# Responses that mean "slow down" rather than "this request failed"
+OVERLOAD_STATUSES = (429, 503)
+
+
+def classify(error: BaseException) -> str:
+    """
+    Outcome of a call that raised: throttled (HTTP 429/503 or a rate limit
+    message), timeout, or error. Works for requests, googleapiclient and
+    shodan exceptions without importing them.
+    """
+    response = getattr(error, "response", None)
+    if response is None:
+        response = getattr(error, "resp", None)  # googleapiclient HttpError
+    status = getattr(response, "status_code", None) or getattr(response, "status", None)
+    message = str(error).lower()
+    if status in OVERLOAD_STATUSES or "rate limit" in message or "too many requests" in message:
+        return "throttled"
+    if isinstance(error, TimeoutError) or "Timeout" in type(error).__name__:
+        return "timeout"
+    return "error"
+
+
+class Call:
+    """
+    Handed out by AdaptiveLimit.slot(). The outcome defaults to ok, or to
+    classify() of the exception leaving the block; set it to override.
+    """
+
+    def __init__(self):
+        self.outcome: Optional[str] = None
+
+    def record_status(self, status: Optional[int]):
+        if status in OVERLOAD_STATUSES:
+            self.outcome = "throttled"
+        elif status is not None and status >= 500:
+            self.outcome = "error"
+
+
+class AdaptiveLimit:
+    """
+    AIMD concurrency limit for one fetched host or external API. Every
+    successful call adds 1/limit, i.e. one slot per window of successes. An
+    error, a timeout, or smoothed latency above latency_tolerance times the
+    fastest latency seen multiplies the limit by backoff, at most once per
+    round trip. A throttled call (HTTP 429/503) also pauses new calls for
+    pause_seconds, doubling while throttling continues. The limit stays
+    between min_limit and max_limit. Calls start at least min_interval
+    seconds apart however many slots are free.
+    """
+
+    def __init__(self, initial: float = 1, min_limit: int = 1, max_limit: int = 4, backoff: float = 0.5,
+                 latency_tolerance: float = 2.0, smoothing: float = 0.2, pause_seconds: float = 1.0,
+                 max_pause_seconds: float = 30.0, timeout_factor: float = 4.0, min_timeout: float = 5.0,
+                 min_interval: float = 0.0):
+        self.min_limit = max(int(min_limit), 1)
+        self.max_limit = max(int(max_limit), self.min_limit)
+        self.limit = float(min(max(initial, self.min_limit), self.max_limit))
+        self.backoff = backoff
+        self.latency_tolerance = latency_tolerance
+        self.smoothing = smoothing
+        self.pause_seconds = pause_seconds
+        self.max_pause_seconds = max_pause_seconds
+        self.timeout_factor = timeout_factor
+        self.min_timeout = min_timeout
+        self.min_interval = min_interval
+        self.in_flight = 0
+        self.latency: Optional[float] = None  # smoothed latency of successful calls
+        self.baseline: Optional[float] = None  # fastest latency, drifting up slowly
+        self.paused_until = 0.0
+        self._next_start = 0.0
+        self._throttled = 0
+        self._last_decrease = 0.0
+        self._cond = threading.Condition()
+        self._async_waiters: List[Tuple[asyncio.AbstractEventLoop, asyncio.Event]] = []
+
+    @property
+    def capacity(self) -> int:
+        return int(self.limit)
+
+    def acquire(self, timeout: Optional[float] = None) -> bool:
+        """
+        Waits for a free slot; returns False if none freed up within timeout
+        (timeout=0 only takes a slot that is free right now).
+        """
+        deadline = time.monotonic() + timeout if timeout is not None else None
+        with self._cond:
+            while True:
+                now = time.monotonic()
+                wait = self._take(now, deadline)
+                if wait == 0:
+                    return True
+                if wait is not None and wait < 0:
+                    return False
+                self._cond.wait(wait)
+
+    async def acquire_async(self, timeout: Optional[float] = None) -> bool:
+        """
+        acquire() for the event loop: waits without blocking the loop or a
+        thread, woken when a slot is released or a pause ends.
+        """
+        loop = asyncio.get_running_loop()
+        deadline = time.monotonic() + timeout if timeout is not None else None
+        while True:
+            event = asyncio.Event()
+            with self._cond:
+                wait = self._take(time.monotonic(), deadline)
+                if wait == 0:
+                    return True
+                if wait is not None and wait < 0:
+                    return False
+                self._async_waiters.append((loop, event))
+            try:
+                await asyncio.wait_for(event.wait(), wait)
+            except asyncio.TimeoutError:
+                pass
+            finally:
+                with self._cond:
+                    if (loop, event) in self._async_waiters:
+                        self._async_waiters.remove((loop, event))
+
+    def _take(self, now: float, deadline: Optional[float]) -> Optional[float]:
+        """
+        Takes a slot if one is free (returns 0). Otherwise returns how long to
+        wait before trying again (None: until a release), or -1 if the
+        deadline passed.
+        """
+        paused = max(self.paused_until, self._next_start) - now
+        if paused <= 0 and self.in_flight < self.capacity:
+            self.in_flight += 1
+            self._next_start = now + self.min_interval
+            return 0
+        waits = [paused] if paused > 0 else []
+        if deadline is not None:
+            if now >= deadline:
+                return -1
+            waits.append(deadline - now)
+        return min(waits) if waits else None
+
+    def _notify(self):
+        # Called with _cond held: wake threads in acquire() and coroutines in acquire_async()
+        self._cond.notify_all()
+        for loop, event in self._async_waiters:
+            loop.call_soon_threadsafe(event.set)
+        self._async_waiters.clear()
+
+    def release(self, latency: float, outcome: str = "ok"):
+        with self._cond:
+            self.in_flight -= 1
+            now = time.monotonic()
+            if outcome == "ok":
+                self._throttled = 0
+                if self.latency is None:
+                    self.latency = latency
+                else:
+                    self.latency += self.smoothing * (latency - self.latency)
+                if self.baseline is None or latency < self.baseline:
+                    self.baseline = latency
+                else:
+                    # A target that got slower for good stops counting as congested eventually
+                    self.baseline += self.smoothing / 10 * (latency - self.baseline)
+                # Both the smoothed latency and this call slow: queueing, not a slow outlier or a lagging average
+                if min(latency, self.latency) > self.latency_tolerance * self.baseline:
+                    self._decrease(now)
+                else:
+                    self.limit = min(self.limit + 1 / self.limit, float(self.max_limit))
+            else:
+                self._decrease(now)
+                if outcome == "throttled":
+                    self._throttled += 1
+                    pause = min(self.pause_seconds * 2 ** (self._throttled - 1), self.max_pause_seconds)
+                    self.paused_until = max(self.paused_until, now + pause)
+            self._notify()
+
+    def cancel(self):
+        """
+        Gives back a slot taken with acquire() that was never used for a call.
+        """
+        with self._cond:
+            self.in_flight -= 1
+            self._notify()
+
+    def _decrease(self, now: float):
+        # Calls already in flight when the limit dropped report the same congestion
+        if now - self._last_decrease < (self.latency or 0):
+            return
+        self._last_decrease = now
+        self.limit = max(self.limit * self.backoff, float(self.min_limit))
+
+    def timeout(self, ceiling: Optional[float]) -> Optional[float]:
+        """
+        Per-call timeout: timeout_factor times the smoothed latency (at least
+        min_timeout), never above ceiling.
+        """
+        if ceiling is None or self.latency is None:
+            return ceiling
+        return min(ceiling, max(self.min_timeout, self.timeout_factor * self.latency))
+
+    @contextmanager
+    def slot(self, timeout: Optional[float] = None, acquired: bool = False) -> Iterator[Call]:
+        """
+        Runs the block in a slot and feeds its latency and outcome back into
+        the limit. Raises TimeoutError if no slot freed up within timeout.
+        With acquired, the caller already holds the slot (acquire() returned
+        True) and the block releases it.
+        """
+        if not acquired and not self.acquire(timeout):
+            raise TimeoutError(f"No free slot within {timeout:.1f}s")
+        call = Call()
+        start = time.monotonic()
+        try:
+            yield call
+        except BaseException as e:
+            if call.outcome is None:
+                call.outcome = classify(e)
+            raise
+        finally:
+            self.release(time.monotonic() - start, call.outcome or "ok")
+
+
+@contextmanager
+def limited(limit: Optional[AdaptiveLimit], timeout: Optional[float] = None, acquired: bool = False) -> Iterator[Call]:
+    """
+    limit.slot(timeout, acquired), or an unlimited slot when there is no limit.
+    """
+    if limit is None:
+        yield Call()
+    else:
+        with limit.slot(timeout, acquired) as call:
+            yield call
+
+
+class ConcurrencyLimits:
+    """
+    Adaptive limits per fetched host and per external API (search, vision,
+    shodan), built from the concurrency section of config.yaml. Host limits
+    are created on first use; beyond max_hosts the least recently used is
+    dropped. Current limits and calls in flight are exported as metrics.
+    """
+
+    def __init__(self, host_settings: Optional[Dict[str, Any]] = None,
+                 api_settings: Optional[Dict[str, Dict[str, Any]]] = None,
+                 defaults: Optional[Dict[str, Any]] = None, max_hosts: int = 200):
+        self.host_settings = host_settings or {}
+        self.api_settings = api_settings or {}
+        self.defaults = defaults or {}
+        self.max_hosts = max_hosts
+        self._hosts: "OrderedDict[str, AdaptiveLimit]" = OrderedDict()
+        self._apis: Dict[str, AdaptiveLimit] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, settings: Dict[str, Any]) -> "ConcurrencyLimits":
+        tuning = ("backoff", "latency_tolerance", "smoothing", "pause_seconds", "max_pause_seconds",
+                  "timeout_factor", "min_timeout")
+        hosts = dict(settings.get("hosts", {}))
+        return cls(
+            host_settings=hosts,
+            api_settings=settings.get("apis", {}),
+            defaults={key: settings[key] for key in tuning if key in settings},
+            max_hosts=hosts.pop("max_hosts", 200)
+        )
+
+    def _create(self, kind: str, name: str, settings: Dict[str, Any]) -> AdaptiveLimit:
+        limit = AdaptiveLimit(
+            initial=settings.get("initial", 1),
+            max_limit=settings.get("max", 4),
+            min_interval=settings.get("min_interval", 0.0),
+            **self.defaults
+        )
+        CONCURRENCY_LIMIT.set_function(lambda: limit.limit, kind=kind, name=name)
+        CONCURRENCY_IN_FLIGHT.set_function(lambda: limit.in_flight, kind=kind, name=name)
+        return limit
+
+    def host(self, url: str) -> AdaptiveLimit:
+        host = (urlparse(url).hostname or url).lower()
+        with self._lock:
+            limit = self._hosts.get(host)
+            if limit is not None:
+                self._hosts.move_to_end(host)
+                return limit
+            limit = self._hosts[host] = self._create("host", host, self.host_settings)
+            if len(self._hosts) > self.max_hosts:
+                dropped, _ = self._hosts.popitem(last=False)
+                CONCURRENCY_LIMIT.remove(kind="host", name=dropped)
+                CONCURRENCY_IN_FLIGHT.remove(kind="host", name=dropped)
+            return limit
+
+    def api(self, name: str) -> AdaptiveLimit:
+        with self._lock:
+            if name not in self._apis:
+                self._apis[name] = self._create("api", name, self.api_settings.get(name, {}))
+            return self._apis[name]
@@ -0,0 +1,125 @@
+import time
+from collections import Counter
+from typing import Any, Dict, List, Optional
+
+STAGES = ("search", "fetch", "analysis", "vision")
+
+
+def _earliest(*limits: Optional[float]) -> Optional[float]:
+    limits = [limit for limit in limits if limit is not None]
+    return max(min(limits), 0.0) if limits else None
+
+
+class PageBudget:
+    """
+    Time budget for analyzing one page. The analyzer asks before each
+    expensive stage; stages that would start after the budget ran out are
+    skipped and listed in skipped.
+    """
+
+    def __init__(self, seconds: Optional[float] = None, vision_seconds: Optional[float] = None):
+        self.deadline = time.monotonic() + seconds if seconds is not None else None
+        self.vision_seconds = vision_seconds
+        self.skipped: List[str] = []
+
+    def remaining(self) -> Optional[float]:
+        if self.deadline is None:
+            return None
+        return max(self.deadline - time.monotonic(), 0.0)
+
+    def allows(self, stage: str) -> bool:
+        if self.deadline is not None and time.monotonic() >= self.deadline:
+            self.skip(stage)
+            return False
+        return True
+
+    def skip(self, stage: str):
+        if stage not in self.skipped:
+            self.skipped.append(stage)
+
+    def truncate(self, stage: str, text: str, chars_per_second: Optional[float]) -> str:
+        """
+        The part of text that stage can get through in the time left, at
+        chars_per_second (all of it without a deadline or a rate). A cut is
+        listed in skipped as "<stage>_truncated".
+        """
+        remaining = self.remaining()
+        if remaining is None or not chars_per_second or len(text) <= remaining * chars_per_second:
+            return text
+        self.skip(f"{stage}_truncated")
+        return text[:int(remaining * chars_per_second)]
+
+    def vision_timeout(self) -> Optional[float]:
+        return _earliest(self.vision_seconds, self.remaining())
+
+
+class ScanBudget:
+    """
+    Wall-clock deadline for a whole scan plus per-stage budgets: search per
+    dork, fetch per URL, analysis and vision per page (seconds; None means no
+    limit). Stage limits are capped by the time left in the scan. Once the
+    deadline passes the scan stops taking new work; what was skipped is
+    counted for the summary and reports.
+    """
+
+    def __init__(self, scan_seconds: Optional[float] = None, stages: Optional[Dict[str, Optional[float]]] = None):
+        self.scan_seconds = scan_seconds
+        self.started = time.monotonic()
+        self.deadline = self.started + scan_seconds if scan_seconds else None
+        self.stages = {stage: seconds for stage, seconds in (stages or {}).items() if seconds}
+        # dorks/urls: work not done at all; fetch/nlp/ml/vision: pages analyzed without that stage
+        self.skipped: Counter = Counter()
+
+    @classmethod
+    def from_config(cls, settings: Dict[str, Any], scan_seconds: Optional[float] = None) -> "ScanBudget":
+        return cls(
+            scan_seconds=scan_seconds or settings.get("scan_seconds"),
+            stages={stage: settings.get(f"{stage}_seconds") for stage in STAGES}
+        )
+
+    def remaining(self) -> Optional[float]:
+        if self.deadline is None:
+            return None
+        return max(self.deadline - time.monotonic(), 0.0)
+
+    @property
+    def expired(self) -> bool:
+        return self.deadline is not None and time.monotonic() >= self.deadline
+
+    def limit(self, stage: str) -> Optional[float]:
+        return _earliest(self.stages.get(stage), self.remaining())
+
+    def page_limits(self) -> Dict[str, Optional[float]]:
+        """
+        Per-page limits, as sent to workers with each job.
+        """
+        return {stage: self.limit(stage) for stage in ("fetch", "analysis", "vision")}
+
+    def page_budget(self) -> PageBudget:
+        return PageBudget(self.limit("analysis"), self.limit("vision"))
+
+    def skip(self, what: str, count: int = 1):
+        if count:
+            self.skipped[what] += count
+
+    def record_page(self, skipped: List[str]):
+        for stage in skipped:
+            self.skip(stage)
+
+    def report(self) -> Dict[str, Any]:
+        return {
+            "deadline_seconds": self.scan_seconds,
+            "elapsed_seconds": round(time.monotonic() - self.started, 1),
+            "deadline_hit": self.expired,
+            "complete": not self.skipped,
+            "skipped": dict(self.skipped)
+        }
+
+    def report_for(self, results: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        report() limited to some of the scan's page results, e.g. one domain
+        of a batch: only the stages those pages skipped. Dorks, URLs and OSINT
+        skipped scan-wide cannot be attributed to a page and stay in report().
+        """
+        skipped = Counter(stage for result in results for stage in result.get("skipped", []))
+        return dict(self.report(), complete=not skipped, skipped=dict(skipped))
@@ -1,5 +1,21 @@
 import os
 
+def parse_dorks(lines):
+    """
+    Yields cleaned dorks from an iterable of lines.
+    Whitespace is stripped, empty/commented lines are skipped and duplicates dropped.
+    """
+    seen = set()
+    for line in lines:
+        line = line.strip()
+        # Skip empty lines and comments
+        if not line or line.startswith('#'):
+            continue
+        if line in seen:
+            continue
+        seen.add(line)
+        yield line
+
 def load_dorks(file_path):
     """
     Loads Google Dorks from a text file.
@@ -9,13 +25,5 @@ def load_dorks(file_path):
         print(f"[!] Dork file not found: {file_path}")
         return []
 
-    dorks = []
     with open(file_path, 'r', encoding='utf-8') as f:
-        for line in f:
-            line = line.strip()
-            # Skip empty lines and comments
-            if not line or line.startswith('#'):
-                continue
-            dorks.append(line)
-    
-    return dorks
+        return list(parse_dorks(f))
@@ -0,0 +1,125 @@
+import re
+import bisect
+from typing import List, Sequence, Tuple
+
+import numpy as np
+
+from modules.findings import Finding
+
+FINDING_TYPE = "high_entropy_secret"
+
+# Byte classes for charset statistics
+LOWER, UPPER, DIGIT, SYMBOL = range(4)
+_CLASS = np.full(256, SYMBOL, dtype=np.int64)
+_CLASS[np.frombuffer(b"abcdefghijklmnopqrstuvwxyz", dtype=np.uint8)] = LOWER
+_CLASS[np.frombuffer(b"ABCDEFGHIJKLMNOPQRSTUVWXYZ", dtype=np.uint8)] = UPPER
+_CLASS[np.frombuffer(b"0123456789", dtype=np.uint8)] = DIGIT
+_HEX = np.zeros(256, dtype=np.int64)
+_HEX[np.frombuffer(b"0123456789abcdefABCDEF", dtype=np.uint8)] = 1
+
+# Words right before a token that make it a secret, or make it a hash/ID
+SECRET_HINT = re.compile(r'(?:key|secret|token|passw|pwd|auth|bearer|signature|credential|private|salt)', re.I)
+HASH_HINT = re.compile(r'(?:sha\d*|md5|checksum|hash|integrity|commit|digest|etag|uuid|version)', re.I)
+HINT_WINDOW = 40
+
+
+def random_entropy(lengths: np.ndarray, alphabet: int) -> np.ndarray:
+    """
+    Approximate Shannon entropy (bits/char) of uniformly random strings of the
+    given lengths: log2 of the expected number of distinct symbols.
+    """
+    distinct = alphabet * (1.0 - (1.0 - 1.0 / alphabet) ** lengths)
+    return np.log2(distinct)
+
+
+class EntropyDetector:
+    """
+    Finds generic high-entropy tokens (random API secrets, JWT segments, hex
+    keys) that have no known prefix. Candidate tokens are cut out with one
+    regex pass; entropy and charset statistics for a whole batch of tokens are
+    computed with a few NumPy bincounts instead of a Python loop per token.
+    A token is reported when its entropy is close to that of a random string
+    of the same length and alphabet.
+    """
+
+    def __init__(self, min_length: int = 20, max_length: int = 128, margin: float = 0.45,
+                 hex_margin: float = 0.6, hex_min_length: int = 32, batch_size: int = 4096):
+        self.min_length = min_length
+        self.max_length = max_length
+        self.margin = margin
+        self.hex_margin = hex_margin
+        self.hex_min_length = hex_min_length
+        self.batch_size = batch_size
+        # Base64/base64url alphabet with optional padding; '.' splits JWTs into
+        # their segments and '=' elsewhere splits KEY=value pairs
+        self.candidates = re.compile(r'[A-Za-z0-9+/_-]{%d,}={0,2}' % min_length)
+
+    def token_stats(self, tokens: Sequence[str]) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Returns (lengths, entropy in bits/char, class counts [n, 4], is_hex) for ASCII tokens.
+        """
+        n = len(tokens)
+        lengths = np.fromiter(map(len, tokens), dtype=np.int64, count=n)
+        data = np.frombuffer("".join(tokens).encode("ascii"), dtype=np.uint8)
+        rows = np.repeat(np.arange(n, dtype=np.int64), lengths)
+
+        counts = np.bincount(rows * 256 + data, minlength=n * 256).reshape(n, 256).astype(np.float64)
+        # H = log2(L) - sum(c * log2(c)) / L
+        clog = np.zeros_like(counts)
+        np.log2(counts, out=clog, where=counts > 0)
+        entropy = np.log2(lengths) - (counts * clog).sum(axis=1) / lengths
+
+        classes = np.bincount(rows * 4 + _CLASS[data], minlength=n * 4).reshape(n, 4)
+        is_hex = np.bincount(rows, weights=_HEX[data], minlength=n) == lengths
+        return lengths, entropy, classes, is_hex
+
+    def _select(self, tokens: Sequence[str]) -> Tuple[np.ndarray, np.ndarray]:
+        lengths, entropy, classes, is_hex = self.token_stats(tokens)
+        mixed = ((classes[:, LOWER] > 0) & (classes[:, UPPER] > 0) & (classes[:, DIGIT] > 0))
+        base64_like = ~is_hex & mixed & (entropy >= random_entropy(lengths, 64) - self.margin)
+        hex_like = (is_hex & (lengths >= self.hex_min_length)
+                    & (classes[:, DIGIT] > 0) & (classes[:, DIGIT] < lengths)
+                    & (entropy >= random_entropy(lengths, 16) - self.hex_margin))
+        return np.flatnonzero(base64_like | hex_like), is_hex
+
+    def scan(self, text: str) -> List[Tuple[int, int, bool]]:
+        """
+        (start, end, is_hex) of every high-entropy token in text.
+        """
+        spans = [m.span() for m in self.candidates.finditer(text)
+                 if m.end() - m.start() <= self.max_length]
+        hits = []
+        for offset in range(0, len(spans), self.batch_size):
+            batch = spans[offset:offset + self.batch_size]
+            selected, is_hex = self._select([text[s:e] for s, e in batch])
+            hits.extend((batch[i][0], batch[i][1], bool(is_hex[i])) for i in selected)
+        return hits
+
+    def analyze(self, text: str, known: Sequence[Tuple[int, int]] = ()) -> List[Finding]:
+        """
+        High-entropy findings in text, skipping spans already covered by
+        known (start, end) spans such as regex findings.
+        """
+        # Merged into disjoint intervals, so the last one starting before a
+        # token's end is the only one that can overlap it
+        merged: List[Tuple[int, int]] = []
+        for start, end in sorted(known):
+            if merged and start <= merged[-1][1]:
+                merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+            else:
+                merged.append((start, end))
+        known = merged
+        starts = [s for s, _ in known]
+        findings = []
+        for start, end, is_hex in self.scan(text):
+            i = bisect.bisect_left(starts, end) - 1
+            if i >= 0 and known[i][1] > start:
+                continue
+            before = text[max(0, start - HINT_WINDOW):start]
+            secret_hint = SECRET_HINT.search(before) is not None
+            if not secret_hint and (is_hex or HASH_HINT.search(before)):
+                # Bare hex strings are usually hashes, commit IDs or asset fingerprints
+                continue
+            findings.append(Finding(FINDING_TYPE, source="entropy", page=text, start=start, end=end,
+                                    confidence=0.9 if secret_hint else 0.6))
+        return findings
@@ -0,0 +1,131 @@
+import sys
+from typing import Any, Dict, Iterator, List, Optional
+
+CONTEXT_CHARS = 50
+
+
+class Finding:
+    """
+    Compact representation of a single finding.
+
+    Regex findings keep (start, end) offsets into the page text they were found
+    in instead of copies of the match and its context; both are built lazily on
+    access. Finding types are interned, so every finding of a type shares one
+    string. Dict-style access (finding["type"], finding.get(...)) is supported
+    so scoring, ML verification and reporting work on findings and on plain
+    dicts (e.g. results posted back by scan workers) alike.
+    """
+
+    __slots__ = ("type", "source", "start", "end", "confidence", "severity", "ml_verification",
+                 "_page", "_match", "_context", "_extra")
+
+    FIELDS = ("type", "match", "context", "source", "confidence", "severity", "ml_verification")
+
+    def __init__(self, type: str, source: str = "regex", page: Optional[str] = None, start: int = 0,
+                 end: int = 0, match: Optional[str] = None, context: Optional[str] = None,
+                 confidence: Optional[float] = None, severity: Optional[str] = None):
+        self.type = sys.intern(type)
+        self.source = sys.intern(source)
+        self.start = start
+        self.end = end
+        self.confidence = confidence
+        self.severity = severity
+        self.ml_verification = None
+        self._page = page
+        self._match = match
+        self._context = context
+        self._extra = None
+
+    @property
+    def match(self) -> str:
+        if self._match is not None:
+            return self._match
+        return self._page[self.start:self.end] if self._page is not None else ""
+
+    @property
+    def context(self) -> str:
+        if self._context is not None:
+            return self._context
+        if self._page is None:
+            return ""
+        start = max(0, self.start - CONTEXT_CHARS)
+        end = min(len(self._page), self.end + CONTEXT_CHARS)
+        snippet = self._page[start:end].replace('\n', ' ').strip()
+        return f"...{snippet}..."
+
+    def detach(self):
+        """
+        Copies match and context out of the page text so the page can be freed.
+        """
+        if self._page is not None:
+            self._match = self.match
+            self._context = self.context
+            self._page = None
+
+    # Mapping-style access
+    def __getitem__(self, key: str) -> Any:
+        value = self.get(key)
+        if value is None:
+            raise KeyError(key)
+        return value
+
+    def __setitem__(self, key: str, value: Any):
+        if key == "match":
+            self._match = value
+        elif key == "context":
+            self._context = value
+        elif key in self.FIELDS:
+            setattr(self, key, value)
+        else:
+            if self._extra is None:
+                self._extra = {}
+            self._extra[key] = value
+
+    def get(self, key: str, default: Any = None) -> Any:
+        if key in self.FIELDS:
+            value = getattr(self, key)
+        elif self._extra is not None:
+            value = self._extra.get(key)
+        else:
+            value = None
+        return default if value is None else value
+
+    def __contains__(self, key: str) -> bool:
+        return self.get(key) is not None
+
+    def keys(self) -> Iterator[str]:
+        for key in self.FIELDS:
+            if getattr(self, key) is not None:
+                yield key
+        if self._extra:
+            yield from self._extra
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {key: self.get(key) for key in self.keys()}
+
+    def __repr__(self):
+        return f"Finding(type={self.type!r}, source={self.source!r}, match={self.match[:40]!r})"
+
+
+def compact(findings: List[Any], page: Optional[str]) -> List[Any]:
+    """
+    Detaches findings from their page when keeping the whole page alive would
+    cost more than copying each finding's match and context.
+    """
+    if page is None or not findings:
+        return findings
+    per_finding = 2 * CONTEXT_CHARS + 60
+    if len(page) > len(findings) * per_finding:
+        for finding in findings:
+            if isinstance(finding, Finding):
+                finding.detach()
+    return findings
+
+
+def finding_json_default(obj: Any) -> Any:
+    """
+    json.dumps default= hook that serializes Finding objects.
+    """
+    if isinstance(obj, Finding):
+        return obj.to_dict()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
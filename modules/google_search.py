@@ -1,13 +1,14 @@
 import os
-from googleapiclient.discovery import build
 from dotenv import load_dotenv
+from modules.metrics import timed
+from modules.concurrency import limited
 
 load_dotenv()
 
-def google_search(query, api_key=None, cse_id=None, num_results=10):
+def google_search(query, api_key=None, cse_id=None, num_results=10, limit=None):
     """
     Performs a Google Search using the Custom Search API.
-    Returns a list of URLs.
+    Returns a list of URLs. limit is the search API's AdaptiveLimit, if any.
     """
     api_key = api_key or os.getenv("GOOGLE_API_KEY")
     cse_id = cse_id or os.getenv("GOOGLE_CSE_ID")
@@ -17,8 +18,11 @@ def google_search(query, api_key=None, cse_id=None, num_results=10):
         return []
 
     try:
-        service = build("customsearch", "v1", developerKey=api_key)
-        res = service.cse().list(q=query, cx=cse_id, num=num_results).execute()
+        # Imported on first search; googleapiclient is slow to import
+        from googleapiclient.discovery import build
+        with timed("search"), limited(limit):
+            service = build("customsearch", "v1", developerKey=api_key)
+            res = service.cse().list(q=query, cx=cse_id, num=num_results).execute()
         
         urls = []
         if 'items' in res:
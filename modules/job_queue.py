@@ -0,0 +1,214 @@
+import json
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Any, Dict, List, Optional
+
+
+class JobQueue:
+    """
+    SQLite-backed job queue shared between the API node and scan workers.
+    Jobs are leased for a limited time; if a worker crashes its lease expires and
+    the job is handed out again until max_attempts is reached. Expired leases
+    are also settled when the API node polls, so a scan whose workers all died
+    still sees its jobs fail.
+    """
+
+    def __init__(self, db_path: str = "jobs.db", lease_seconds: int = 120, max_attempts: int = 3):
+        self.db_path = db_path
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self._lock = threading.Lock()
+        # Last time any worker asked for a job (see idle_seconds)
+        self.last_poll = time.time()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False, isolation_level=None)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS jobs (
+                id TEXT PRIMARY KEY,
+                scan_id TEXT NOT NULL,
+                kind TEXT NOT NULL,
+                payload TEXT NOT NULL,
+                status TEXT NOT NULL DEFAULT 'pending',
+                attempts INTEGER NOT NULL DEFAULT 0,
+                worker_id TEXT,
+                lease_expires REAL,
+                result TEXT,
+                error TEXT,
+                collected INTEGER NOT NULL DEFAULT 0,
+                priority REAL NOT NULL DEFAULT 0,
+                created_at REAL NOT NULL
+            )
+        """)
+        columns = {row["name"] for row in self._conn.execute("PRAGMA table_info(jobs)")}
+        if "priority" not in columns:
+            # Queue files created before jobs were prioritized
+            self._conn.execute("ALTER TABLE jobs ADD COLUMN priority REAL NOT NULL DEFAULT 0")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs (status, created_at)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_scan ON jobs (scan_id, collected)")
+
+    def enqueue(self, scan_id: str, kind: str, payload: Dict[str, Any], priority: float = 0) -> str:
+        job_id = uuid.uuid4().hex
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO jobs (id, scan_id, kind, payload, priority, created_at) VALUES (?, ?, ?, ?, ?, ?)",
+                (job_id, scan_id, kind, json.dumps(payload), priority, time.time())
+            )
+        return job_id
+
+    def _expire_leases(self, now: float):
+        """
+        Requeues jobs whose lease expired, or marks them failed once they used
+        up all attempts. Called with the lock held.
+        """
+        self._conn.execute(
+            "UPDATE jobs SET status = CASE WHEN attempts >= ? THEN 'failed' ELSE 'pending' END, "
+            "error = 'lease expired', worker_id = NULL, lease_expires = NULL "
+            "WHERE status = 'leased' AND lease_expires < ?",
+            (self.max_attempts, now)
+        )
+
+    def lease(self, worker_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Hands the highest-priority available job (oldest first among equals)
+        to a worker. Jobs whose lease expired are retried, or marked failed
+        once they used up all attempts.
+        """
+        now = time.time()
+        self.last_poll = now
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._expire_leases(now)
+                row = self._conn.execute(
+                    "SELECT * FROM jobs WHERE status = 'pending' "
+                    "ORDER BY priority DESC, created_at LIMIT 1"
+                ).fetchone()
+                if row is None:
+                    self._conn.execute("COMMIT")
+                    return None
+                self._conn.execute(
+                    "UPDATE jobs SET status = 'leased', attempts = attempts + 1, "
+                    "worker_id = ?, lease_expires = ? WHERE id = ?",
+                    (worker_id, now + self.lease_seconds, row["id"])
+                )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+        return {
+            "id": row["id"],
+            "scan_id": row["scan_id"],
+            "kind": row["kind"],
+            "payload": json.loads(row["payload"]),
+            "attempt": row["attempts"] + 1,
+            "lease_seconds": self.lease_seconds
+        }
+
+    def complete(self, job_id: str, worker_id: str, result: Dict[str, Any]) -> bool:
+        """
+        Stores a job result. Returns False if the worker no longer holds the lease.
+        """
+        with self._lock:
+            cur = self._conn.execute(
+                "UPDATE jobs SET status = 'done', result = ?, lease_expires = NULL "
+                "WHERE id = ? AND worker_id = ? AND status = 'leased'",
+                (json.dumps(result), job_id, worker_id)
+            )
+        return cur.rowcount == 1
+
+    def fail(self, job_id: str, worker_id: str, error: str) -> bool:
+        """
+        Releases a job after a worker error so it can be retried.
+        """
+        with self._lock:
+            cur = self._conn.execute(
+                "UPDATE jobs SET status = CASE WHEN attempts >= ? THEN 'failed' ELSE 'pending' END, "
+                "error = ?, worker_id = NULL, lease_expires = NULL "
+                "WHERE id = ? AND worker_id = ? AND status = 'leased'",
+                (self.max_attempts, error, job_id, worker_id)
+            )
+        return cur.rowcount == 1
+
+    def collect(self, scan_id: str) -> List[Dict[str, Any]]:
+        """
+        Returns finished (done or failed) jobs of a scan that were not collected yet.
+        """
+        with self._lock:
+            self._expire_leases(time.time())
+            rows = self._conn.execute(
+                "SELECT * FROM jobs WHERE scan_id = ? AND collected = 0 "
+                "AND status IN ('done', 'failed') ORDER BY created_at",
+                (scan_id,)
+            ).fetchall()
+            if rows:
+                self._conn.executemany(
+                    "UPDATE jobs SET collected = 1 WHERE id = ?",
+                    [(row["id"],) for row in rows]
+                )
+
+        return [{
+            "id": row["id"],
+            "status": row["status"],
+            "payload": json.loads(row["payload"]),
+            "result": json.loads(row["result"]) if row["result"] else None,
+            "error": row["error"]
+        } for row in rows]
+
+    def cancel(self, scan_id: str) -> int:
+        """
+        Drops a scan's queued and running jobs, e.g. when its deadline passed.
+        Workers still running one lose the lease. Returns the number cancelled.
+        """
+        with self._lock:
+            cur = self._conn.execute(
+                "UPDATE jobs SET status = 'cancelled', lease_expires = NULL "
+                "WHERE scan_id = ? AND status IN ('pending', 'leased')",
+                (scan_id,)
+            )
+        return cur.rowcount
+
+    def abandon(self, scan_id: str, error: str) -> int:
+        """
+        Marks a scan's queued and running jobs failed, e.g. when no worker is
+        left to run them. They are then collected like any failed job.
+        """
+        with self._lock:
+            cur = self._conn.execute(
+                "UPDATE jobs SET status = 'failed', error = ?, lease_expires = NULL "
+                "WHERE scan_id = ? AND status IN ('pending', 'leased')",
+                (error, scan_id)
+            )
+        return cur.rowcount
+
+    def idle_seconds(self) -> float:
+        """
+        Seconds since a worker last asked for a job.
+        """
+        return time.time() - self.last_poll
+
+    def outstanding(self, scan_id: str) -> int:
+        """
+        Number of jobs of a scan that are still queued or running.
+        """
+        with self._lock:
+            self._expire_leases(time.time())
+            row = self._conn.execute(
+                "SELECT COUNT(*) FROM jobs WHERE scan_id = ? AND status IN ('pending', 'leased')",
+                (scan_id,)
+            ).fetchone()
+        return row[0]
+
+    def pending(self) -> int:
+        """
+        Number of jobs waiting for a worker, across all scans.
+        """
+        with self._lock:
+            row = self._conn.execute("SELECT COUNT(*) FROM jobs WHERE status = 'pending'").fetchone()
+        return row[0]
+
+    def close(self):
+        self._conn.close()
@@ -0,0 +1,240 @@
+"""
+Minimal Prometheus-style metrics registry.
+Metrics are rendered in the Prometheus text exposition format by the /metrics
+endpoint, so any Prometheus-compatible scraper can collect them.
+"""
+import time
+import threading
+from contextlib import contextmanager
+from typing import Callable, Dict, List, Tuple
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+def _format_labels(labelnames: Tuple[str, ...], values: Tuple[str, ...], extra: str = "") -> str:
+    parts = []
+    for name, value in zip(labelnames, values):
+        escaped = str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+        parts.append(f'{name}="{escaped}"')
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> Tuple[str, ...]:
+        return tuple(str(labels.get(name, "")) for name in self.labelnames)
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        lines.extend(self._samples())
+        return lines
+
+    def _samples(self) -> List[str]:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name, documentation, labelnames=()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1.0, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def get(self, **labels) -> float:
+        return self._values.get(self._key(labels), 0.0)
+
+    def _samples(self):
+        with self._lock:
+            items = list(self._values.items())
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {value}" for key, value in items]
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def __init__(self, name, documentation, labelnames=()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._callbacks: Dict[Tuple[str, ...], Callable[[], float]] = {}
+
+    def set(self, value: float, **labels):
+        with self._lock:
+            self._values[self._key(labels)] = float(value)
+
+    def inc(self, amount: float = 1.0, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def dec(self, amount: float = 1.0, **labels):
+        self.inc(-amount, **labels)
+
+    def set_function(self, fn: Callable[[], float], **labels):
+        """
+        Evaluates fn at scrape time instead of storing a value.
+        """
+        with self._lock:
+            self._callbacks[self._key(labels)] = fn
+
+    def remove(self, **labels):
+        """
+        Drops the sample (stored value or callback) for these labels.
+        """
+        key = self._key(labels)
+        with self._lock:
+            self._values.pop(key, None)
+            self._callbacks.pop(key, None)
+
+    def get(self, **labels) -> float:
+        key = self._key(labels)
+        if key in self._callbacks:
+            return float(self._callbacks[key]())
+        return self._values.get(key, 0.0)
+
+    def _samples(self):
+        with self._lock:
+            items = list(self._values.items())
+            callbacks = list(self._callbacks.items())
+        for key, fn in callbacks:
+            try:
+                items.append((key, float(fn())))
+            except Exception:
+                continue
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {value}" for key, value in items]
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._counts: Dict[Tuple[str, ...], List[int]] = {}
+        self._sums: Dict[Tuple[str, ...], float] = {}
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            counts = self._counts.setdefault(key, [0] * (len(self.buckets) + 1))
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[i] += 1
+                    break
+            else:
+                counts[-1] += 1
+            self._sums[key] = self._sums.get(key, 0.0) + value
+
+    def count(self, **labels) -> int:
+        return sum(self._counts.get(self._key(labels), []))
+
+    def _samples(self):
+        lines = []
+        with self._lock:
+            items = [(key, list(counts), self._sums[key]) for key, counts in self._counts.items()]
+        for key, counts, total in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets, counts):
+                cumulative += count
+                labels = _format_labels(self.labelnames, key, 'le="%s"' % bound)
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            cumulative += counts[-1]
+            labels = _format_labels(self.labelnames, key, 'le="+Inf"')
+            lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, key)} {total}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, key)} {cumulative}")
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+
+    def register(self, metric: _Metric) -> _Metric:
+        self._metrics[metric.name] = metric
+        return metric
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics.values():
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+STAGE_SECONDS = REGISTRY.register(Histogram(
+    "aegis_stage_duration_seconds",
+    "Time spent per scan stage (search, fetch, extract, regex, nlp, ml, vision, report, ...).",
+    ("stage",)
+))
+FINDINGS_TOTAL = REGISTRY.register(Counter(
+    "aegis_findings_total", "Findings reported, by finding type.", ("type",)
+))
+PAGES_TOTAL = REGISTRY.register(Counter(
+    "aegis_pages_total", "Pages processed, by outcome (analyzed/failed).", ("outcome",)
+))
+SCANS_TOTAL = REGISTRY.register(Counter(
+    "aegis_scans_total", "Scans started, by kind.", ("kind",)
+))
+CASCADE_DECISIONS = REGISTRY.register(Counter(
+    "aegis_cascade_decisions_total", "Findings settled by each detection cascade tier, by verdict.", ("tier", "verdict")
+))
+CACHE_REQUESTS = REGISTRY.register(Counter(
+    "aegis_cache_requests_total", "Cache lookups, by cache name and result (hit/miss).", ("cache", "result")
+))
+TEMPLATE_CHARS = REGISTRY.register(Counter(
+    "aegis_template_chars_total", "Page text characters by part: unique (sent to NLP/ML) or per-host template (skipped).",
+    ("part",)
+))
+QUEUE_DEPTH = REGISTRY.register(Gauge(
+    "aegis_queue_depth", "Items waiting in internal queues.", ("queue",)
+))
+BROWSERS_OPEN = REGISTRY.register(Gauge(
+    "aegis_browsers_open", "Selenium browser instances currently open."
+))
+BROWSERS_BUSY = REGISTRY.register(Gauge(
+    "aegis_browsers_busy", "Selenium browser instances currently loading a page."
+))
+WEBSOCKET_CLIENTS = REGISTRY.register(Gauge(
+    "aegis_websocket_clients", "Connected dashboard WebSocket clients."
+))
+CONCURRENCY_LIMIT = REGISTRY.register(Gauge(
+    "aegis_concurrency_limit", "Current adaptive concurrency limit per fetched host or external API.", ("kind", "name")
+))
+CONCURRENCY_IN_FLIGHT = REGISTRY.register(Gauge(
+    "aegis_concurrency_in_flight", "Calls in flight per fetched host or external API.", ("kind", "name")
+))
+
+
+@contextmanager
+def timed(stage: str):
+    """
+    Records the duration of the wrapped block in the stage histogram.
+    """
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        STAGE_SECONDS.observe(time.perf_counter() - start, stage=stage)
+
+
+def record_cache(cache: str, hit: bool):
+    CACHE_REQUESTS.inc(cache=cache, result="hit" if hit else "miss")
+
+
+def render_metrics() -> str:
+    return REGISTRY.render()
@@ -1,20 +1,23 @@
-try:
-    from transformers import pipeline
-    TRANSFORMERS_AVAILABLE = True
-except ImportError:
-    TRANSFORMERS_AVAILABLE = False
-
+from importlib.util import find_spec
 from typing import List, Dict, Any
+import os
 import warnings
+from modules.onnx_classifier import ONNX_AVAILABLE, DEFAULT_MODEL_DIR, MODEL_NAME, OnnxZeroShotClassifier
 warnings.filterwarnings('ignore')
 
+# transformers (and torch) are imported when the model is loaded, not when this module loads
+TRANSFORMERS_AVAILABLE = find_spec("transformers") is not None
+
 class MLThreatClassifier:
     """
     Machine Learning-based threat classifier using transformers for zero-shot classification.
+    backend="onnx" runs an int8-quantized ONNX export of the same model with
+    onnxruntime instead of PyTorch (see modules/onnx_classifier.py).
     """
     
-    def __init__(self):
+    def __init__(self, backend: str = "pytorch", onnx_model_dir: str = DEFAULT_MODEL_DIR):
         self.classifier = None
+        self.backend = backend
         self.threat_labels = [
             "credential leak",
             "api key exposure",
@@ -27,21 +30,45 @@ class MLThreatClassifier:
             "benign content"
         ]
         
+        if backend == "onnx":
+            self._load_onnx(onnx_model_dir)
+        else:
+            self._load_pytorch()
+
+    def _load_pytorch(self):
         if not TRANSFORMERS_AVAILABLE:
             print("[!] Transformers not installed. ML classification disabled.")
             return
 
         try:
+            from transformers import pipeline
             print("[*] Loading zero-shot classification model (using distilbart for speed)...")
             self.classifier = pipeline(
                 "zero-shot-classification",
-                model="valhalla/distilbart-mnli-12-1",
+                model=MODEL_NAME,
                 device=-1  # CPU mode
             )
             print("[+] ML threat classifier loaded successfully")
         except Exception as e:
             print(f"[!] Failed to load ML classifier: {e}")
             self.classifier = None
+
+    def _load_onnx(self, model_dir: str):
+        if not ONNX_AVAILABLE:
+            print("[!] onnxruntime/tokenizers not installed. ML classification disabled.")
+            return
+        if not os.path.isdir(model_dir):
+            print(f"[!] ONNX model not found in {model_dir}. Export it with: "
+                  f"python -m modules.onnx_classifier --output {model_dir}")
+            return
+
+        try:
+            print(f"[*] Loading quantized ONNX threat classifier from {model_dir}...")
+            self.classifier = OnnxZeroShotClassifier.from_pretrained(model_dir)
+            print("[+] ML threat classifier loaded successfully (onnxruntime)")
+        except Exception as e:
+            print(f"[!] Failed to load ONNX classifier: {e}")
+            self.classifier = None
     
     def classify_threat(self, text: str, max_length: int = 500) -> Dict[str, Any]:
         """
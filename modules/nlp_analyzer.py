@@ -1,11 +1,9 @@
-try:
-    import spacy
-    SPACY_AVAILABLE = True
-except ImportError:
-    SPACY_AVAILABLE = False
-
+from importlib.util import find_spec
 from typing import List, Dict, Any
 
+# spaCy is imported when an analyzer is created, not when this module loads
+SPACY_AVAILABLE = find_spec("spacy") is not None
+
 class NLPAnalyzer:
     """
     NLP-based analyzer using spaCy for Named Entity Recognition and linguistic analysis.
@@ -18,6 +16,7 @@ class NLPAnalyzer:
             return
 
         try:
+            import spacy
             self.nlp = spacy.load("en_core_web_sm")
             print("[+] NLP model loaded successfully")
         except Exception as e:
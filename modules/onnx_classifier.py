@@ -0,0 +1,157 @@
+"""
+Int8-quantized ONNX Runtime backend for zero-shot threat classification.
+
+Export the model once (needs torch and transformers, only on the machine that
+runs the export):
+    python -m modules.onnx_classifier --output models/distilbart-mnli-12-1-int8
+
+Inference only needs onnxruntime and tokenizers.
+"""
+import os
+import json
+import argparse
+from importlib.util import find_spec
+from typing import Any, Dict, List, Union
+
+import numpy as np
+
+# onnxruntime and tokenizers are imported when a model is loaded
+ONNX_AVAILABLE = find_spec("onnxruntime") is not None and find_spec("tokenizers") is not None
+
+MODEL_NAME = "valhalla/distilbart-mnli-12-1"
+MODEL_FILE = "model_quantized.onnx"
+DEFAULT_MODEL_DIR = os.path.join("models", "distilbart-mnli-12-1-int8")
+# Same template the transformers zero-shot pipeline uses
+HYPOTHESIS_TEMPLATE = "This example is {}."
+
+
+class OnnxZeroShotClassifier:
+    """
+    NLI-based zero-shot classification on an exported ONNX model.
+    Called like the transformers zero-shot pipeline and returns the same
+    {"sequence", "labels", "scores"} dict, so MLThreatClassifier can use either.
+    All candidate labels are scored in one batched session run.
+    """
+
+    def __init__(self, session: Any, tokenizer: Any, entailment_id: int, contradiction_id: int,
+                 hypothesis_template: str = HYPOTHESIS_TEMPLATE):
+        self.session = session
+        self.tokenizer = tokenizer
+        self.entailment_id = entailment_id
+        self.contradiction_id = contradiction_id
+        self.hypothesis_template = hypothesis_template
+        self.input_names = {i.name for i in session.get_inputs()}
+
+    @classmethod
+    def from_pretrained(cls, model_dir: str = DEFAULT_MODEL_DIR, threads: int = 0) -> "OnnxZeroShotClassifier":
+        if not ONNX_AVAILABLE:
+            raise ImportError("onnxruntime and tokenizers are required for the ONNX backend")
+        import onnxruntime as ort
+        from tokenizers import Tokenizer
+
+        with open(os.path.join(model_dir, "config.json"), "r") as f:
+            model_config = json.load(f)
+        label2id = {label.lower(): int(idx) for label, idx in model_config["label2id"].items()}
+        entailment_id = next(idx for label, idx in label2id.items() if label.startswith("entail"))
+        contradiction_id = next(idx for label, idx in label2id.items() if label.startswith("contra"))
+
+        tokenizer = Tokenizer.from_file(os.path.join(model_dir, "tokenizer.json"))
+        # Like the pipeline: only the premise (page text) is truncated
+        tokenizer.enable_truncation(max_length=model_config.get("max_position_embeddings", 512),
+                                    strategy="only_first")
+        tokenizer.enable_padding(pad_id=model_config.get("pad_token_id", 1))
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if threads:
+            options.intra_op_num_threads = threads
+        session = ort.InferenceSession(os.path.join(model_dir, MODEL_FILE), options,
+                                       providers=["CPUExecutionProvider"])
+        return cls(session, tokenizer, entailment_id, contradiction_id)
+
+    def __call__(self, sequences: str, candidate_labels: List[str], multi_label: bool = False) -> Dict[str, Union[str, List]]:
+        pairs = [(sequences, self.hypothesis_template.format(label)) for label in candidate_labels]
+        encodings = self.tokenizer.encode_batch(pairs)
+        feeds = {
+            "input_ids": np.array([e.ids for e in encodings], dtype=np.int64),
+            "attention_mask": np.array([e.attention_mask for e in encodings], dtype=np.int64),
+        }
+        logits = self.session.run(None, {k: v for k, v in feeds.items() if k in self.input_names})[0]
+
+        if multi_label or len(candidate_labels) == 1:
+            # Each label independently: entailment vs contradiction
+            pair = logits[:, [self.contradiction_id, self.entailment_id]]
+            pair = np.exp(pair - pair.max(axis=1, keepdims=True))
+            scores = pair[:, 1] / pair.sum(axis=1)
+        else:
+            # Labels compete: softmax of entailment logits across labels
+            entail = logits[:, self.entailment_id]
+            entail = np.exp(entail - entail.max())
+            scores = entail / entail.sum()
+
+        order = np.argsort(-scores, kind="stable")
+        return {
+            "sequence": sequences,
+            "labels": [candidate_labels[i] for i in order],
+            "scores": [float(scores[i]) for i in order],
+        }
+
+
+def export_quantized(model_name: str = MODEL_NAME, output_dir: str = DEFAULT_MODEL_DIR, opset: int = 14) -> str:
+    """
+    Exports a Hugging Face NLI model to ONNX and quantizes its weights to int8.
+    Writes the model, tokenizer.json and config.json into output_dir.
+    """
+    import torch
+    from transformers import AutoTokenizer, AutoModelForSequenceClassification
+    from onnxruntime.quantization import quantize_dynamic, QuantType
+
+    class LogitsOnly(torch.nn.Module):
+        def __init__(self, model):
+            super().__init__()
+            self.model = model
+
+        def forward(self, input_ids, attention_mask):
+            return self.model(input_ids=input_ids, attention_mask=attention_mask, return_dict=True).logits
+
+    os.makedirs(output_dir, exist_ok=True)
+    tokenizer = AutoTokenizer.from_pretrained(model_name)
+    model = AutoModelForSequenceClassification.from_pretrained(model_name).eval()
+    sample = tokenizer("Example page text", HYPOTHESIS_TEMPLATE.format("credential leak"), return_tensors="pt")
+
+    fp32_path = os.path.join(output_dir, "model.onnx")
+    print(f"[*] Exporting {model_name} to ONNX...")
+    with torch.no_grad():
+        torch.onnx.export(
+            LogitsOnly(model), (sample["input_ids"], sample["attention_mask"]), fp32_path,
+            input_names=["input_ids", "attention_mask"], output_names=["logits"],
+            dynamic_axes={
+                "input_ids": {0: "batch", 1: "sequence"},
+                "attention_mask": {0: "batch", 1: "sequence"},
+                "logits": {0: "batch"},
+            },
+            opset_version=opset,
+        )
+
+    print("[*] Quantizing weights to int8...")
+    quantized_path = os.path.join(output_dir, MODEL_FILE)
+    quantize_dynamic(fp32_path, quantized_path, weight_type=QuantType.QInt8)
+    os.remove(fp32_path)
+
+    tokenizer.save_pretrained(output_dir)
+    model.config.save_pretrained(output_dir)
+    print(f"[+] Quantized model written to {quantized_path}")
+    return quantized_path
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Export the threat classifier to int8 ONNX")
+    parser.add_argument("--model", default=MODEL_NAME)
+    parser.add_argument("--output", default=DEFAULT_MODEL_DIR)
+    parser.add_argument("--opset", type=int, default=14)
+    args = parser.parse_args(argv)
+    export_quantized(args.model, args.output, args.opset)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,64 +1,192 @@
 import os
-import shodan
+import time
 import socket
-from typing import Dict, Any, List
+import asyncio
+from typing import Dict, Any, Iterable, List, Optional
+from urllib.parse import urlparse
+from modules.metrics import timed, record_cache
+from modules.concurrency import limited
+
+HIGH_RISK_PORTS = [3306, 5432, 27017, 6379, 21, 22, 23, 445, 3389]
+
+
+def subdomains_from_urls(urls: Iterable[str], domain: str) -> List[str]:
+    """
+    Hostnames under domain (other than domain itself) seen in a list of URLs.
+    """
+    found = []
+    for url in urls:
+        host = (urlparse(url).hostname or "").lower()
+        if host.startswith("www."):
+            host = host[4:]
+        if host != domain and host.endswith("." + domain) and host not in found:
+            found.append(host)
+    return found
+
 
 class OSINTExplorer:
     """
     OSINT Explorer that queries Shodan/Censys to find service-level exposures.
+    Resolves every A/AAAA record of the target and its subdomains asynchronously
+    and fans host lookups out with bounded concurrency. Host data is cached per
+    IP, so subdomains sharing infrastructure are only looked up once.
+    max_concurrency is a hard cap; with an AdaptiveLimit (modules/concurrency.py)
+    lookups also back off when Shodan slows down or rate limits.
     """
-    def __init__(self, api_key: str = None):
+    def __init__(self, api_key: str = None, backend: Any = None, cache_ttl: float = 3600,
+                 max_concurrency: int = 5, limit: Any = None):
         self.api_key = api_key or os.getenv("SHODAN_API_KEY")
-        self.api = None
-        if self.api_key:
+        self.api = backend
+        self.cache_ttl = cache_ttl
+        self.max_concurrency = max_concurrency
+        self.limit = limit
+        self._cache: Dict[str, tuple] = {}
+        self._semaphores: Dict[Any, asyncio.Semaphore] = {}
+
+    def _client(self) -> Any:
+        """
+        The Shodan client, created on first use so the shodan package is not
+        imported at startup.
+        """
+        if self.api is None and self.api_key:
             try:
+                import shodan
                 self.api = shodan.Shodan(self.api_key)
             except Exception as e:
                 print(f"[!] Shodan initialization failed: {e}")
+                self.api_key = None
+        return self.api
 
-    def scan_domain(self, domain: str) -> Dict[str, Any]:
+    async def resolve(self, domain: str) -> List[str]:
+        """
+        Returns all IPv4 and IPv6 addresses of a domain (empty if it does not resolve).
+        """
+        loop = asyncio.get_running_loop()
+        try:
+            infos = await loop.getaddrinfo(domain, None, proto=socket.IPPROTO_TCP)
+        except socket.gaierror:
+            return []
+        ips = []
+        for family, _, _, _, sockaddr in infos:
+            if family in (socket.AF_INET, socket.AF_INET6) and sockaddr[0] not in ips:
+                ips.append(sockaddr[0])
+        return ips
+
+    def _semaphore(self) -> asyncio.Semaphore:
+        # One limit per event loop; scan_domain() runs each call on a fresh loop
+        loop = asyncio.get_running_loop()
+        if loop not in self._semaphores:
+            self._semaphores = {loop: asyncio.Semaphore(self.max_concurrency)}
+        return self._semaphores[loop]
+
+    def _cached(self, ip: str) -> Optional[Dict[str, Any]]:
+        entry = self._cache.get(ip)
+        if entry and entry[0] > time.monotonic():
+            return entry[1]
+        return None
+
+    async def lookup_host(self, ip: str) -> Dict[str, Any]:
+        """
+        Shodan host data for one IP, served from the TTL cache when possible.
+        """
+        cached = self._cached(ip)
+        record_cache("osint_host", cached is not None)
+        if cached is not None:
+            return cached
+
+        async with self._semaphore():
+            # Another task may have fetched it while we waited
+            cached = self._cached(ip)
+            if cached is not None:
+                return cached
+            try:
+                with timed("osint"):
+                    host = await asyncio.to_thread(self._host, ip)
+                summary = self._summarize_host(ip, host)
+            except Exception as e:
+                # shodan.APIError with this message just means Shodan has no data on the IP
+                if "No information available" not in str(e):
+                    return {"ip": ip, "error": str(e)}
+                summary = {"ip": ip, "ports": [], "vulns": [], "exposures": [], "org": "Unknown", "os": "Unknown"}
+
+        self._cache[ip] = (time.monotonic() + self.cache_ttl, summary)
+        return summary
+
+    def _host(self, ip: str) -> Dict[str, Any]:
+        with limited(self.limit) as call:
+            try:
+                return self.api.host(ip)
+            except Exception as e:
+                if "No information available" in str(e):
+                    call.outcome = "ok"
+                raise
+
+    @staticmethod
+    def _summarize_host(ip: str, host: Dict[str, Any]) -> Dict[str, Any]:
+        exposures = []
+        for item in host.get('data', []):
+            port = item.get('port')
+            product = item.get('product', 'Unknown')
+            banner = item.get('data', '')
+
+            # Flag high-risk ports
+            if port in HIGH_RISK_PORTS:
+                exposures.append({
+                    "ip": ip,
+                    "port": port,
+                    "service": product,
+                    "banner_snippet": banner[:100].replace('\n', ' '),
+                    "severity": "HIGH"
+                })
+
+        return {
+            "ip": ip,
+            "ports": host.get('ports', []),
+            "vulns": list(host.get('vulns', [])),
+            "exposures": exposures,
+            "org": host.get('org', 'Unknown'),
+            "os": host.get('os', 'Unknown')
+        }
+
+    async def scan_domains(self, domains: List[str]) -> Dict[str, Any]:
         """
-        Resolves domain to IP and queries Shodan for open ports and banners.
+        Resolves all domains concurrently and looks up every distinct IP once.
+        The first domain is treated as the primary target for the summary fields.
         """
-        if not self.api:
+        if not self._client():
             return {"enabled": False, "message": "Shodan API key missing"}
+        if not domains:
+            return {"enabled": True, "domains": {}, "hosts": []}
 
-        try:
-            # Resolve domain to IP
-            ip = socket.gethostbyname(domain)
-            host = self.api.host(ip)
-            
-            ports = host.get('ports', [])
-            vulns = host.get('vulns', [])
-            data = host.get('data', [])
-            
-            exposures = []
-            for item in data:
-                port = item.get('port')
-                product = item.get('product', 'Unknown')
-                banner = item.get('data', '')
-                
-                # Flag high-risk ports
-                if port in [3306, 5432, 27017, 6379, 21, 22, 23, 445, 3389]:
-                    exposures.append({
-                        "port": port,
-                        "service": product,
-                        "banner_snippet": banner[:100].replace('\n', ' '),
-                        "severity": "HIGH"
-                    })
-
-            return {
-                "enabled": True,
-                "ip": ip,
-                "ports": ports,
-                "vulns": vulns,
-                "exposures": exposures,
-                "org": host.get('org', 'Unknown'),
-                "os": host.get('os', 'Unknown')
-            }
-
-        except Exception as e:
-            return {"enabled": True, "error": str(e)}
+        resolved = await asyncio.gather(*(self.resolve(domain) for domain in domains))
+        domain_ips = dict(zip(domains, resolved))
+        ips = list(dict.fromkeys(ip for ips in resolved for ip in ips))
+        hosts = await asyncio.gather(*(self.lookup_host(ip) for ip in ips))
+
+        primary_ips = domain_ips.get(domains[0], [])
+        primary = next((h for h in hosts if h["ip"] in primary_ips and "error" not in h), {})
+        ok_hosts = [h for h in hosts if "error" not in h]
+        result = {
+            "enabled": True,
+            "ip": ", ".join(primary_ips),
+            "ports": sorted({port for h in ok_hosts for port in h["ports"]}),
+            "vulns": sorted({vuln for h in ok_hosts for vuln in h["vulns"]}),
+            "exposures": [e for h in ok_hosts for e in h["exposures"]],
+            "org": primary.get("org", "Unknown"),
+            "os": primary.get("os", "Unknown"),
+            "domains": domain_ips,
+            "hosts": list(hosts)
+        }
+        if not ips:
+            result["error"] = f"Could not resolve {', '.join(domains)}"
+        return result
+
+    def scan_domain(self, domain: str) -> Dict[str, Any]:
+        """
+        Resolves domain to IPs and queries Shodan for open ports and banners.
+        Synchronous wrapper for callers outside an event loop.
+        """
+        return asyncio.run(self.scan_domains([domain]))
 
     def mock_scan(self, domain: str) -> Dict[str, Any]:
         """
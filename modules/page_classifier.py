@@ -0,0 +1,119 @@
+import re
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+# Zero-shot labels of MLThreatClassifier and the finding type each is scored as
+LABEL_TYPES = {
+    "credential leak": "credential_leak",
+    "api key exposure": "api_key_exposure",
+    "database configuration": "database_configuration",
+    "private key exposure": "private_key_exposure",
+    "authentication token": "authentication_token",
+    "sensitive file exposure": "sensitive_file",
+    "sql injection vulnerability": "sql_injection",
+    "path traversal vulnerability": "path_traversal",
+}
+BENIGN_LABEL = "benign content"
+
+# Words that tend to sit next to exposed secrets, configs and dumps
+HOTSPOT_KEYWORDS = re.compile(
+    r"passw(?:or)?d|secret|api[_-]?key|access[_-]?key|token|credential|private key|-----BEGIN|"
+    r"\bdb_|database|jdbc:|mysql|postgres|mongodb|create table|insert into|index of /|"
+    r"\.env\b|config|traceback|stack trace|exception",
+    re.IGNORECASE
+)
+FINDING_WEIGHT = 2.0  # a regex/entropy finding counts as much as two keywords
+KEYWORD_WEIGHT = 1.0
+
+
+class PageClassifier:
+    """
+    Page-level threat classification on a fixed inference budget. Instead
+    of the first window_chars of a page, it classifies up to max_windows
+    windows centred on hotspots (regex and entropy findings, then keywords
+    such as "password" or "CREATE TABLE"), densest first, and stops at the
+    first window whose best threat label reaches threshold. Pages without
+    hotspots get one window from the top.
+    """
+
+    def __init__(self, threshold: float = 0.6, window_chars: int = 500, max_windows: int = 4):
+        self.threshold = threshold
+        self.window_chars = window_chars
+        self.max_windows = max_windows
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> "PageClassifier":
+        settings = config.get("page_classification", {})
+        return cls(
+            threshold=config.get("ai_settings", {}).get("ml_confidence_threshold", 0.6),
+            window_chars=settings.get("window_chars", 500),
+            max_windows=settings.get("max_windows", 4)
+        )
+
+    @staticmethod
+    def hotspots(text: str, spans: Sequence[Tuple[int, int]],
+                 exclude: Optional[Callable[[int, int], bool]] = None) -> List[Tuple[int, float]]:
+        """
+        (offset, weight) of every finding span and keyword hit in text, except
+        those for which exclude(start, end) is true (the site template).
+        """
+        spots = [((start + end) // 2, FINDING_WEIGHT) for start, end in spans
+                 if end > start and not (exclude and exclude(start, end))]
+        for match in HOTSPOT_KEYWORDS.finditer(text):
+            if not (exclude and exclude(match.start(), match.end())):
+                spots.append(((match.start() + match.end()) // 2, KEYWORD_WEIGHT))
+        return spots
+
+    def windows(self, text: str, hotspots: Sequence[Tuple[int, float]]) -> List[Tuple[int, int]]:
+        """
+        Non-overlapping (start, end) windows covering the hotspots, heaviest
+        first, at most max_windows of them.
+        """
+        size = self.window_chars
+        if not hotspots:
+            return [(0, min(len(text), size))] if text else []
+        scored = []
+        start = end = None
+        weight = 0.0
+        for offset, spot_weight in sorted(hotspots):
+            if end is not None and offset < end:
+                weight += spot_weight
+                continue
+            if end is not None:
+                scored.append((weight, start, end))
+            # Centre the window on its first hotspot, shifted back inside the text
+            start = max(0, min(offset - size // 2, len(text) - size))
+            end = min(len(text), start + size)
+            weight = spot_weight
+        scored.append((weight, start, end))
+        scored.sort(key=lambda window: (-window[0], window[1]))
+        return [(start, end) for _, start, end in scored[:self.max_windows]]
+
+    def classify(self, text: str, ml_engine: Any, hotspots: Sequence[Tuple[int, float]],
+                 budget: Any = None) -> Optional[Dict[str, Any]]:
+        """
+        Classifies windows of text until a threat label reaches threshold, the
+        windows run out, or the PageBudget does. Returns the most confident
+        threat label seen (label None if every window looked benign), or None
+        if no window could be classified.
+        """
+        windows = self.windows(text, hotspots)
+        best = None
+        classified = 0
+        for start, end in windows:
+            if budget is not None and not budget.allows("ml"):
+                break
+            result = ml_engine.classify_threat(text[start:end], max_length=end - start)
+            if not result.get("enabled") or "error" in result:
+                break
+            classified += 1
+            threat = next((c for c in result.get("classifications", []) if c["label"] != BENIGN_LABEL), None)
+            if threat and (best is None or threat["confidence"] > best["confidence"]):
+                best = {"label": threat["label"], "confidence": threat["confidence"], "start": start, "end": end}
+            if best and best["confidence"] >= self.threshold:
+                break
+        if not classified:
+            return None
+        outcome = best or {"label": None, "confidence": 0.0, "start": None, "end": None}
+        outcome.update(windows_classified=classified, windows_total=len(windows),
+                       early_exit=classified < len(windows) and best is not None and best["confidence"] >= self.threshold)
+        return outcome
@@ -0,0 +1,144 @@
+import os
+import sys
+import time
+import threading
+import tracemalloc
+from collections import Counter
+from datetime import datetime
+from typing import Dict, Optional
+
+# Profilers currently using tracemalloc; tracing stops with the last of them
+_tracemalloc_lock = threading.Lock()
+_tracemalloc_users = 0
+_tracemalloc_owned = False
+
+
+def _acquire_tracemalloc(frames: int):
+    global _tracemalloc_users, _tracemalloc_owned
+    with _tracemalloc_lock:
+        if _tracemalloc_users == 0 and not tracemalloc.is_tracing():
+            tracemalloc.start(frames)
+            _tracemalloc_owned = True
+        _tracemalloc_users += 1
+
+
+def _release_tracemalloc():
+    global _tracemalloc_users, _tracemalloc_owned
+    with _tracemalloc_lock:
+        _tracemalloc_users -= 1
+        if _tracemalloc_users == 0 and _tracemalloc_owned:
+            if tracemalloc.is_tracing():
+                tracemalloc.stop()
+            _tracemalloc_owned = False
+
+
+class ScanProfiler:
+    """
+    Opt-in profiler for a single scan.
+
+    Samples the stacks of every thread (the event loop and the fetch/analyze
+    worker threads) at a fixed interval and writes them in the collapsed
+    "folded" format understood by flamegraph.pl, speedscope and inferno.
+    Takes tracemalloc snapshots at start and stop and writes the top
+    allocation growth next to the report. Profilers of overlapping scans
+    share tracemalloc; it stops when the last one does.
+    """
+
+    def __init__(self, output_dir: str = "reports", label: str = "scan",
+                 interval: float = 0.005, top_allocations: int = 25, trace_frames: int = 10):
+        self.output_dir = output_dir
+        self.label = label
+        self.interval = interval
+        self.top_allocations = top_allocations
+        self.trace_frames = trace_frames
+
+        self._stacks = Counter()
+        self._samples = 0
+        self._stop_event = threading.Event()
+        self._sampler: Optional[threading.Thread] = None
+        self._snapshot_start = None
+        self._peak = 0
+        self._started_at = 0.0
+        self.outputs: Dict[str, str] = {}
+
+    def start(self):
+        self._started_at = time.perf_counter()
+        _acquire_tracemalloc(self.trace_frames)
+        self._snapshot_start = tracemalloc.take_snapshot()
+
+        self._sampler = threading.Thread(target=self._sample_loop, name="scan-profiler", daemon=True)
+        self._sampler.start()
+        return self
+
+    def stop(self) -> Dict[str, str]:
+        """
+        Stops profiling and writes the output files. Returns {kind: path}.
+        """
+        elapsed = time.perf_counter() - self._started_at
+        if self._sampler:
+            self._stop_event.set()
+            self._sampler.join()
+
+        # Someone else may have stopped tracemalloc under us
+        snapshot_end = None
+        if tracemalloc.is_tracing():
+            snapshot_end = tracemalloc.take_snapshot()
+            self._peak = tracemalloc.get_traced_memory()[1]
+        _release_tracemalloc()
+
+        if not os.path.exists(self.output_dir):
+            os.makedirs(self.output_dir)
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        base = os.path.join(self.output_dir, f"profile_{self.label}_{timestamp}")
+
+        self.outputs["folded"] = f"{base}.folded"
+        with open(self.outputs["folded"], "w", encoding="utf-8") as f:
+            for stack, count in self._stacks.most_common():
+                f.write(f"{stack} {count}\n")
+
+        self.outputs["allocations"] = f"{base}_allocations.txt"
+        self._write_allocations(snapshot_end, elapsed, self.outputs["allocations"])
+        return self.outputs
+
+    def _sample_loop(self):
+        own_id = threading.get_ident()
+        names = {}
+        while not self._stop_event.wait(self.interval):
+            for thread in threading.enumerate():
+                names[thread.ident] = thread.name
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id:
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                    frame = frame.f_back
+                stack.append(names.get(thread_id, str(thread_id)))
+                self._stacks[";".join(reversed(stack))] += 1
+            self._samples += 1
+
+    def _write_allocations(self, snapshot_end, elapsed: float, path: str):
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(f"Scan profile: {self.label}\n")
+            f.write(f"Wall time: {elapsed:.2f}s\n")
+            f.write(f"Stack samples: {self._samples} every {self.interval * 1000:.1f}ms\n")
+            if snapshot_end is None:
+                f.write("Allocations not recorded: tracemalloc was stopped during the scan\n")
+                return
+            filters = [tracemalloc.Filter(False, tracemalloc.__file__), tracemalloc.Filter(False, __file__)]
+            start = self._snapshot_start.filter_traces(filters)
+            end = snapshot_end.filter_traces(filters)
+            total_start = sum(stat.size for stat in start.statistics("filename"))
+            total_end = sum(stat.size for stat in end.statistics("filename"))
+            f.write(f"Traced memory: {total_start / 1e6:.1f} MB -> {total_end / 1e6:.1f} MB\n")
+            f.write(f"Peak traced memory: {self._peak / 1e6:.1f} MB\n")
+            f.write(f"\nTop {self.top_allocations} allocation sites by growth:\n")
+            for stat in end.compare_to(start, "lineno")[:self.top_allocations]:
+                f.write(f"{stat}\n")
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
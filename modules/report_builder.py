@@ -1,12 +1,23 @@
 import json
-import pandas as pd
 import os
+from collections import Counter
 from datetime import datetime
+from modules.metrics import timed
+from modules.findings import finding_json_default
+from modules.aggregation import ExposureAggregator
 
-def generate_reports(results, output_dir):
+def generate_reports(results, output_dir, aggregator=None, budget=None):
     """
     Generates JSON and CSV reports from scan results.
+    Repeated findings are collapsed into one entry per unique exposure with
+    the list of URLs it was found at. budget is the scan's ScanBudget report;
+    partial scans say in the JSON summary what was skipped. Pages with a
+    page-level ML threat label carry it as classification.
     """
+    with timed("report"):
+        return _write_reports(results, output_dir, aggregator, budget)
+
+def _write_reports(results, output_dir, aggregator=None, budget=None):
     if not os.path.exists(output_dir):
         os.makedirs(output_dir)
 
@@ -14,28 +25,64 @@ def generate_reports(results, output_dir):
     json_path = os.path.join(output_dir, f"report_{timestamp}.json")
     csv_path = os.path.join(output_dir, f"report_{timestamp}.csv")
 
+    if aggregator is None:
+        aggregator = ExposureAggregator()
+        aggregator.add_results(results)
+    exposures = aggregator.exposures()
+
+    pages = []
+    for entry in results:
+        counts = Counter(finding["type"] for finding in entry.get("findings", []))
+        page = {
+            "url": entry.get("url"),
+            "risk_score": entry.get("risk_score"),
+            "risk_level": entry.get("risk_level"),
+            "finding_counts": dict(counts),
+            "skipped": entry.get("skipped", [])
+        }
+        threat = next((f for f in entry.get("findings", []) if f.get("source") == "ml_page"), None)
+        if threat:
+            page["classification"] = {"label": threat["match"], "confidence": threat["confidence"]}
+        pages.append(page)
+
     # JSON Report
+    report = {
+        "generated_at": timestamp,
+        "summary": {
+            "pages": len(pages),
+            "unique_exposures": len(exposures),
+            "total_occurrences": sum(e["occurrences"] for e in exposures)
+        },
+        "pages": pages,
+        "exposures": exposures
+    }
+    if budget:
+        report["summary"]["complete"] = budget["complete"]
+        report["summary"]["budget"] = budget
     with open(json_path, 'w', encoding='utf-8') as f:
-        json.dump(results, f, indent=4)
+        json.dump(report, f, indent=4, default=finding_json_default)
 
-    # CSV Report Flattening
+    # CSV Report: one row per unique exposure
     flat_data = []
-    for entry in results:
-        url = entry.get("url")
-        score = entry.get("risk_score")
-        level = entry.get("risk_level")
-        for finding in entry.get("findings", []):
-            flat_data.append({
-                "timestamp": timestamp,
-                "url": url,
-                "risk_score": score,
-                "risk_level": level,
-                "finding_type": finding["type"],
-                "match": finding["match"],
-                "context": finding["context"]
-            })
+    for exposure in exposures:
+        flat_data.append({
+            "timestamp": timestamp,
+            "finding_type": exposure["type"],
+            "match": exposure["match"],
+            "context": exposure["context"],
+            "source": exposure["source"],
+            "severity": exposure.get("severity", ""),
+            "confidence": exposure["confidence"],
+            "max_risk_score": exposure["max_risk_score"],
+            "max_risk_level": exposure["max_risk_level"],
+            "occurrences": exposure["occurrences"],
+            "url_count": exposure["url_count"],
+            "locations": "; ".join(f"{loc['url']} ({loc['count']})" for loc in exposure["locations"])
+        })
 
     if flat_data:
+        # pandas is only needed here and takes longer to import than the rest of the app
+        import pandas as pd
         df = pd.DataFrame(flat_data)
         df.to_csv(csv_path, index=False)
     
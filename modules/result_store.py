@@ -0,0 +1,224 @@
+import json
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, List, Optional
+from urllib.parse import urlparse
+
+from modules.findings import finding_json_default
+
+SORT_COLUMNS = {
+    "seq": "seq",
+    "url": "url",
+    "risk_score": "risk_score",
+    "finding_count": "finding_count",
+}
+
+
+class ResultStore:
+    """
+    SQLite-backed store of per-page scan results, queried a page at a time so
+    neither the WebSocket nor the browser has to carry a whole scan at once.
+    Only the newest max_scans scans are kept, plus any still running.
+    """
+
+    def __init__(self, db_path: str = "results.db", max_scans: int = 20):
+        self.db_path = db_path
+        self.max_scans = max_scans
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False, isolation_level=None)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS scans (
+                id TEXT PRIMARY KEY,
+                kind TEXT NOT NULL,
+                target TEXT,
+                status TEXT NOT NULL DEFAULT 'running',
+                summary TEXT,
+                created_at REAL NOT NULL,
+                finished_at REAL
+            )
+        """)
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS results (
+                scan_id TEXT NOT NULL,
+                seq INTEGER NOT NULL,
+                url TEXT NOT NULL,
+                domain TEXT NOT NULL DEFAULT '',
+                skipped TEXT NOT NULL DEFAULT '',
+                risk_score INTEGER NOT NULL,
+                risk_level TEXT NOT NULL,
+                finding_count INTEGER NOT NULL,
+                finding_types TEXT NOT NULL,
+                findings TEXT NOT NULL,
+                PRIMARY KEY (scan_id, seq)
+            )
+        """)
+        columns = {row["name"] for row in self._conn.execute("PRAGMA table_info(results)")}
+        if "domain" not in columns:
+            # Stores created before batch scans
+            self._conn.execute("ALTER TABLE results ADD COLUMN domain TEXT NOT NULL DEFAULT ''")
+        if "skipped" not in columns:
+            # Stores created before scan time limits
+            self._conn.execute("ALTER TABLE results ADD COLUMN skipped TEXT NOT NULL DEFAULT ''")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_results_risk ON results (scan_id, risk_score)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_results_domain ON results (scan_id, domain)")
+
+    def create_scan(self, scan_id: str, kind: str, target: Optional[str] = None):
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO scans (id, kind, target, created_at) VALUES (?, ?, ?, ?)",
+                (scan_id, kind, target, time.time())
+            )
+            # Scans still running are kept however old; their results are still being written
+            stale = [row["id"] for row in self._conn.execute(
+                "SELECT id FROM scans WHERE id NOT IN "
+                "(SELECT id FROM scans ORDER BY created_at DESC LIMIT ?) AND status != 'running'",
+                (self.max_scans,)
+            )]
+            for old_id in stale:
+                self._conn.execute("DELETE FROM results WHERE scan_id = ?", (old_id,))
+                self._conn.execute("DELETE FROM scans WHERE id = ?", (old_id,))
+
+    def add(self, scan_id: str, result: Dict[str, Any]) -> int:
+        """
+        Stores one page result and returns its sequence number within the scan.
+        domain is the batch target the page belongs to, or the URL's host.
+        """
+        findings = result.get("findings", [])
+        domain = result.get("domain") or urlparse(result["url"]).hostname or ""
+        # Delimited so a type filter can match whole names with LIKE
+        types = "," + ",".join(sorted({f["type"] for f in findings})) + ","
+        with self._lock:
+            seq = self._conn.execute(
+                "SELECT COALESCE(MAX(seq), 0) + 1 FROM results WHERE scan_id = ?", (scan_id,)
+            ).fetchone()[0]
+            self._conn.execute(
+                "INSERT INTO results (scan_id, seq, url, domain, risk_score, risk_level, finding_count, finding_types, "
+                "findings, skipped) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (scan_id, seq, result["url"], domain, result.get("risk_score", 0), result.get("risk_level", "NONE"),
+                 len(findings), types, json.dumps(findings, default=finding_json_default),
+                 ",".join(result.get("skipped", [])))
+            )
+        return seq
+
+    def finish(self, scan_id: str, summary: Dict[str, Any], status: str = "done"):
+        with self._lock:
+            self._conn.execute(
+                "UPDATE scans SET status = ?, summary = ?, finished_at = ? WHERE id = ?",
+                (status, json.dumps(summary, default=finding_json_default), time.time(), scan_id)
+            )
+
+    def fail_unfinished(self, error: str) -> int:
+        """
+        Marks every scan still 'running' as failed, e.g. at startup after the
+        process running them died. Returns how many there were.
+        """
+        with self._lock:
+            cursor = self._conn.execute(
+                "UPDATE scans SET status = 'failed', summary = ?, finished_at = ? WHERE status = 'running'",
+                (json.dumps({"error": error}), time.time())
+            )
+        return cursor.rowcount
+
+    def summary(self, scan_id: str) -> Dict[str, Any]:
+        """
+        Page and finding counts of a scan, by risk level and finding type.
+        """
+        with self._lock:
+            levels = self._conn.execute(
+                "SELECT risk_level, COUNT(*) AS pages, SUM(finding_count) AS findings "
+                "FROM results WHERE scan_id = ? GROUP BY risk_level", (scan_id,)
+            ).fetchall()
+            types = self._conn.execute(
+                "SELECT finding_types FROM results WHERE scan_id = ? AND finding_count > 0", (scan_id,)
+            ).fetchall()
+        type_pages: Dict[str, int] = {}
+        for row in types:
+            for ftype in row["finding_types"].strip(",").split(","):
+                type_pages[ftype] = type_pages.get(ftype, 0) + 1
+        return {
+            "pages": sum(row["pages"] for row in levels),
+            "findings": sum(row["findings"] or 0 for row in levels),
+            "risk_levels": {row["risk_level"]: row["pages"] for row in levels},
+            "finding_types": type_pages
+        }
+
+    def get_scan(self, scan_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM scans WHERE id = ?", (scan_id,)).fetchone()
+        if row is None:
+            return None
+        return self._scan_dict(row)
+
+    def list_scans(self, limit: int = 20) -> List[Dict[str, Any]]:
+        with self._lock:
+            rows = self._conn.execute("SELECT * FROM scans ORDER BY created_at DESC LIMIT ?", (limit,)).fetchall()
+        return [self._scan_dict(row) for row in rows]
+
+    @staticmethod
+    def _scan_dict(row: sqlite3.Row) -> Dict[str, Any]:
+        return {
+            "scan_id": row["id"],
+            "kind": row["kind"],
+            "target": row["target"],
+            "status": row["status"],
+            "summary": json.loads(row["summary"]) if row["summary"] else None,
+            "created_at": row["created_at"],
+            "finished_at": row["finished_at"]
+        }
+
+    def query(self, scan_id: str, page: int = 1, page_size: int = 50, sort: str = "seq", order: str = "asc",
+              risk_level: Optional[str] = None, finding_type: Optional[str] = None,
+              search: Optional[str] = None, domain: Optional[str] = None) -> Dict[str, Any]:
+        """
+        One page of results, filtered by risk level, finding type, domain and URL substring.
+        """
+        if sort not in SORT_COLUMNS:
+            raise ValueError(f"Unknown sort column: {sort}")
+        direction = "DESC" if order.lower() == "desc" else "ASC"
+        where, params = ["scan_id = ?"], [scan_id]
+        if risk_level:
+            where.append("risk_level = ?")
+            params.append(risk_level.upper())
+        if domain:
+            where.append("domain = ?")
+            params.append(domain.lower())
+        if finding_type:
+            where.append("finding_types LIKE ?")
+            params.append(f"%,{finding_type},%")
+        if search:
+            where.append("url LIKE ? ESCAPE '\\'")
+            escaped = search.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+            params.append(f"%{escaped}%")
+        clause = " AND ".join(where)
+
+        with self._lock:
+            total = self._conn.execute(f"SELECT COUNT(*) FROM results WHERE {clause}", params).fetchone()[0]
+            rows = self._conn.execute(
+                f"SELECT * FROM results WHERE {clause} ORDER BY {SORT_COLUMNS[sort]} {direction}, seq "
+                f"LIMIT ? OFFSET ?",
+                params + [page_size, (page - 1) * page_size]
+            ).fetchall()
+
+        return {
+            "scan_id": scan_id,
+            "total": total,
+            "page": page,
+            "page_size": page_size,
+            "pages": (total + page_size - 1) // page_size,
+            "items": [{
+                "seq": row["seq"],
+                "url": row["url"],
+                "domain": row["domain"],
+                "skipped": row["skipped"].split(",") if row["skipped"] else [],
+                "risk_score": row["risk_score"],
+                "risk_level": row["risk_level"],
+                "finding_count": row["finding_count"],
+                "findings": json.loads(row["findings"])
+            } for row in rows]
+        }
+
+    def close(self):
+        self._conn.close()
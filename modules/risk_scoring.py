@@ -1,44 +1,124 @@
-def calculate_risk_score(findings, config):
+import numpy as np
+from typing import Any, Dict, List, Tuple
+
+
+class RiskScorer:
     """
-    Calculates a risk score based on findings, weights from config, 
-    and AI/ML confidence levels if available.
-    Returns (score, level)
+    Risk scoring engine compiled once from config.
+    Finding types map to rows of weight/cap lookup tables, and whole batches of
+    pages are scored with array operations instead of per-finding dict lookups.
     """
-    weights = config.get("scoring", {}).get("weights", {})
-    max_score = config.get("scoring", {}).get("max_score", 100)
-    
-    total_score = 0
-    unique_types = set()
-
-    for finding in findings:
-        ftype = finding["type"]
-        base_weight = weights.get(ftype, 10)
-        
-        # Adjust weight based on ML confidence if present
-        confidence = finding.get("confidence", 1.0) # Default to 1.0 for regex
-        
+
+    def __init__(self, config: Dict[str, Any]):
+        scoring = config.get("scoring", {})
+        thresholds = scoring.get("thresholds", {})
+
+        self.max_score = scoring.get("max_score", 100)
+        self.default_weight = scoring.get("default_weight", 10)
+        self.high_threshold = thresholds.get("high", 75)
+        self.medium_threshold = thresholds.get("medium", 40)
+        # Each further finding of the same type on a page counts repeat_decay times the previous one
+        self.repeat_decay = float(scoring.get("repeat_decay", 1.0))
+
+        self._type_index: Dict[str, int] = {}
+        self._weights: List[float] = []
+        self._caps: List[float] = []
+        self._cap_config = scoring.get("type_caps", {})
+        for ftype, weight in scoring.get("weights", {}).items():
+            self._add_type(ftype, weight)
+        self._compile()
+
+    def _add_type(self, ftype: str, weight: float) -> int:
+        self._type_index[ftype] = len(self._weights)
+        self._weights.append(float(weight))
+        self._caps.append(float(self._cap_config.get(ftype, np.inf)))
+        return self._type_index[ftype]
+
+    def _compile(self):
+        self.weight_table = np.array(self._weights, dtype=np.float64)
+        self.cap_table = np.array(self._caps, dtype=np.float64)
+
+    def type_index(self, ftype: str) -> int:
+        index = self._type_index.get(ftype)
+        if index is None:
+            index = self._add_type(ftype, self.default_weight)
+            self._compile()
+        return index
+
+    @staticmethod
+    def finding_confidence(finding: Dict[str, Any]) -> float:
+        confidence = finding.get("confidence", 1.0)  # Default to 1.0 for regex
+
         # If ML verified it as low severity or low confidence, reduce weight
-        if "ml_verification" in finding:
-            ml_data = finding["ml_verification"]
+        ml_data = finding.get("ml_verification")
+        if ml_data:
             if ml_data.get("severity") == "LOW":
                 confidence *= 0.5
             if not ml_data.get("context_verified", True):
                 confidence *= 0.3
-        
-        # Apply confidence-weighted score
-        total_score += base_weight * confidence
-        unique_types.add(ftype)
-
-    # Simplified categorization
-    score = int(min(total_score, max_score))
-    
-    if score >= 75:
-        level = "HIGH"
-    elif score >= 40:
-        level = "MEDIUM"
-    elif score > 0:
-        level = "LOW"
-    else:
-        level = "NONE"
-        
-    return score, level
+        return confidence
+
+    def level_for(self, score: int) -> str:
+        if score >= self.high_threshold:
+            return "HIGH"
+        elif score >= self.medium_threshold:
+            return "MEDIUM"
+        elif score > 0:
+            return "LOW"
+        return "NONE"
+
+    def score_batch(self, pages: List[List[Dict[str, Any]]]) -> List[Tuple[int, str]]:
+        """
+        Scores the findings of several pages at once. Returns [(score, level)] in page order.
+        """
+        page_ids, type_ids, confidences = [], [], []
+        for page_id, findings in enumerate(pages):
+            for finding in findings:
+                page_ids.append(page_id)
+                type_ids.append(self.type_index(finding["type"]))
+                confidences.append(self.finding_confidence(finding))
+
+        num_pages, num_types = len(pages), len(self._weights)
+        totals = np.zeros(num_pages, dtype=np.float64)
+        if page_ids:
+            page_arr = np.array(page_ids, dtype=np.int64)
+            type_arr = np.array(type_ids, dtype=np.int64)
+            conf_arr = np.array(confidences, dtype=np.float64)
+            contributions = self.weight_table[type_arr] * conf_arr
+
+            group = page_arr * num_types + type_arr
+            if self.repeat_decay != 1.0:
+                # Rank findings within each (page, type) group, strongest first
+                order = np.lexsort((-contributions, group))
+                sorted_groups = group[order]
+                _, starts, counts = np.unique(sorted_groups, return_index=True, return_counts=True)
+                ranks = np.empty_like(order)
+                ranks[order] = np.arange(len(order)) - np.repeat(starts, counts)
+                contributions = contributions * np.power(self.repeat_decay, ranks)
+
+            per_type = np.bincount(group, weights=contributions, minlength=num_pages * num_types)
+            per_type = np.minimum(per_type.reshape(num_pages, num_types), self.cap_table)
+            totals = per_type.sum(axis=1)
+
+        scores = np.minimum(totals, self.max_score).astype(np.int64)
+        return [(int(score), self.level_for(int(score))) for score in scores]
+
+    def score(self, findings: List[Dict[str, Any]]) -> Tuple[int, str]:
+        return self.score_batch([findings])[0]
+
+
+_cached_scorer: Tuple[Any, RiskScorer] = (None, None)
+
+
+def calculate_risk_score(findings, config):
+    """
+    Calculates a risk score based on findings, weights from config,
+    and AI/ML confidence levels if available.
+    Returns (score, level)
+    """
+    global _cached_scorer
+    cached_config, scorer = _cached_scorer
+    if cached_config is not config:
+        scorer = RiskScorer(config)
+        _cached_scorer = (config, scorer)
+    return scorer.score(findings)
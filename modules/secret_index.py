@@ -0,0 +1,166 @@
+import os
+import hmac
+import time
+import hashlib
+import secrets
+import sqlite3
+import threading
+from typing import Any, Dict, Iterable, List, Optional
+from urllib.parse import urlparse
+
+from modules.aggregation import normalize_match
+
+DEFAULT_TYPES = ("aws_key", "google_api_key", "github_token", "openai_key", "password_alike", "high_entropy_secret")
+
+
+def load_salt(salt_path: str) -> bytes:
+    """
+    The index salt: SECRET_INDEX_SALT if set, otherwise a random salt created
+    once in salt_path (readable by the owner only).
+    """
+    env_salt = os.getenv("SECRET_INDEX_SALT")
+    if env_salt:
+        return env_salt.encode("utf-8")
+    if not os.path.exists(salt_path):
+        fd = os.open(salt_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+        with os.fdopen(fd, "w") as f:
+            f.write(secrets.token_hex(32))
+    with open(salt_path, "r") as f:
+        return f.read().strip().encode("utf-8")
+
+
+class SecretIndex:
+    """
+    Persistent cross-scan index of matched secrets, keyed by a salted hash
+    (HMAC-SHA256) of the normalized match. Raw secrets are never written; the
+    index only answers "where else has this value been seen", with first/last
+    seen times and every URL it appeared on.
+    """
+
+    def __init__(self, db_path: str = "secret_index.db", salt: bytes = b"",
+                 types: Iterable[str] = DEFAULT_TYPES):
+        if not salt:
+            raise ValueError("SecretIndex needs a salt")
+        self.db_path = db_path
+        self.types = set(types)
+        self._salt = salt
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False, isolation_level=None)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS secrets (
+                hash TEXT PRIMARY KEY,
+                type TEXT NOT NULL,
+                first_seen REAL NOT NULL,
+                last_seen REAL NOT NULL,
+                occurrences INTEGER NOT NULL
+            )
+        """)
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS locations (
+                hash TEXT NOT NULL,
+                url TEXT NOT NULL,
+                domain TEXT NOT NULL,
+                first_seen REAL NOT NULL,
+                last_seen REAL NOT NULL,
+                first_scan_id TEXT NOT NULL,
+                last_scan_id TEXT NOT NULL,
+                scans INTEGER NOT NULL,
+                occurrences INTEGER NOT NULL,
+                PRIMARY KEY (hash, url)
+            )
+        """)
+
+    def hash(self, ftype: str, match: str) -> str:
+        value = normalize_match(ftype, match)
+        return hmac.new(self._salt, value.encode("utf-8"), hashlib.sha256).hexdigest()
+
+    def record(self, scan_id: str, url: str, findings: List[Any], seen_at: Optional[float] = None) -> List[Dict[str, Any]]:
+        """
+        Adds the secrets found on one page. Each indexed finding gets a
+        secret_hash and seen_elsewhere (number of other URLs the same value
+        was seen on before). Returns one entry per distinct secret on the page.
+        """
+        now = seen_at or time.time()
+        domain = urlparse(url).hostname or ""
+        page: Dict[str, Dict[str, Any]] = {}
+        for finding in findings:
+            if finding["type"] not in self.types or not finding.get("match"):
+                continue
+            digest = self.hash(finding["type"], finding["match"])
+            entry = page.setdefault(digest, {"hash": digest, "type": finding["type"], "count": 0, "findings": []})
+            entry["count"] += 1
+            entry["findings"].append(finding)
+        if not page:
+            return []
+
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                for digest, entry in page.items():
+                    row = self._conn.execute(
+                        "SELECT COUNT(*), MIN(first_seen) FROM locations WHERE hash = ? AND url != ?", (digest, url)
+                    ).fetchone()
+                    entry["other_locations"], entry["first_seen"] = row[0], row[1] or now
+                    self._conn.execute(
+                        "INSERT INTO secrets (hash, type, first_seen, last_seen, occurrences) VALUES (?, ?, ?, ?, ?) "
+                        "ON CONFLICT(hash) DO UPDATE SET last_seen = excluded.last_seen, "
+                        "occurrences = occurrences + excluded.occurrences",
+                        (digest, entry["type"], now, now, entry["count"])
+                    )
+                    # A location counts one more scan only the first time a scan sees it
+                    self._conn.execute(
+                        "INSERT INTO locations (hash, url, domain, first_seen, last_seen, first_scan_id, last_scan_id, "
+                        "scans, occurrences) VALUES (?, ?, ?, ?, ?, ?, ?, 1, ?) "
+                        "ON CONFLICT(hash, url) DO UPDATE SET last_seen = excluded.last_seen, "
+                        "scans = scans + (last_scan_id != excluded.last_scan_id), "
+                        "last_scan_id = excluded.last_scan_id, occurrences = occurrences + excluded.occurrences",
+                        (digest, url, domain, now, now, scan_id, scan_id, entry["count"])
+                    )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+        for entry in page.values():
+            for finding in entry.pop("findings"):
+                finding["secret_hash"] = entry["hash"]
+                finding["seen_elsewhere"] = entry["other_locations"]
+        return list(page.values())
+
+    def lookup(self, digest: str) -> Optional[Dict[str, Any]]:
+        """
+        First/last seen and every location of a secret hash, or None if it was never seen.
+        """
+        with self._lock:
+            secret = self._conn.execute("SELECT * FROM secrets WHERE hash = ?", (digest,)).fetchone()
+            if secret is None:
+                return None
+            locations = self._conn.execute(
+                "SELECT * FROM locations WHERE hash = ? ORDER BY first_seen", (digest,)
+            ).fetchall()
+        return {
+            "hash": digest,
+            "type": secret["type"],
+            "first_seen": secret["first_seen"],
+            "last_seen": secret["last_seen"],
+            "occurrences": secret["occurrences"],
+            "domains": sorted({row["domain"] for row in locations}),
+            "locations": [{
+                "url": row["url"],
+                "domain": row["domain"],
+                "first_seen": row["first_seen"],
+                "last_seen": row["last_seen"],
+                "first_scan_id": row["first_scan_id"],
+                "last_scan_id": row["last_scan_id"],
+                "scans": row["scans"],
+                "occurrences": row["occurrences"]
+            } for row in locations]
+        }
+
+    def lookup_value(self, ftype: str, match: str) -> Optional[Dict[str, Any]]:
+        return self.lookup(self.hash(ftype, match))
+
+    def close(self):
+        self._conn.close()
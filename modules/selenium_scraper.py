@@ -1,77 +1,270 @@
 import time
-import requests
-from selenium import webdriver
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.chrome.service import Service
-from webdriver_manager.chrome import ChromeDriverManager
-from bs4 import BeautifulSoup
-
 import base64
-from io import BytesIO
-from PIL import Image
+
+from modules.metrics import timed, BROWSERS_OPEN, BROWSERS_BUSY
+from modules.concurrency import limited
+
+# Blockable resource types as URL patterns for CDP Network.setBlockedURLs
+RESOURCE_EXTENSIONS = {
+    "image": (".png", ".jpg", ".jpeg", ".gif", ".webp", ".avif", ".svg", ".ico", ".bmp"),
+    "font": (".woff", ".woff2", ".ttf", ".otf", ".eot"),
+    "media": (".mp4", ".webm", ".ogg", ".ogv", ".mp3", ".wav", ".m4a", ".mov"),
+    "stylesheet": (".css",),
+}
+DEFAULT_BLOCKED_RESOURCES = ("image", "font", "media")
+# Analytics and ad hosts that never hold page text
+DEFAULT_BLOCKED_DOMAINS = (
+    "google-analytics.com", "googletagmanager.com", "doubleclick.net", "googlesyndication.com",
+    "facebook.net", "hotjar.com", "segment.io", "scorecardresearch.com",
+)
+
+def extract_blocks(html):
+    """
+    Returns the visible text blocks (text nodes) of a page, without script
+    and style contents.
+    """
+    from bs4 import BeautifulSoup
+    soup = BeautifulSoup(html, 'html.parser')
+    for script in soup(["script", "style"]):
+        script.decompose()
+    return list(soup.stripped_strings)
+
+def extract_text(html):
+    """
+    Returns the visible text of a page, without script and style contents.
+    """
+    return ' '.join(extract_blocks(html))
 
 class SeleniumScraper:
-    def __init__(self, headless=True, timeout=10, rate_limit_delay=2):
+    """
+    Headless Chrome fetcher tuned for text extraction: images, fonts, media
+    and tracker domains are blocked through CDP, and navigation returns at
+    DOMContentLoaded ("eager").
+
+    With limits (modules/concurrency.py) page loads are paced per host by an
+    adaptive limit shared with the scan's other browsers (concurrent loads
+    and a minimum interval between them), and timeout is the ceiling of the
+    host's adaptive timeout. Without them rate_limit_delay is a minimum
+    interval between this browser's page loads.
+    """
+
+    def __init__(self, headless=True, timeout=10, rate_limit_delay=2, page_load_strategy="eager",
+                 wait_for="dom", network_idle_ms=500, block_resources=DEFAULT_BLOCKED_RESOURCES,
+                 block_domains=DEFAULT_BLOCKED_DOMAINS, screenshots=True, limits=None):
         self.headless = headless
         self.timeout = timeout
         self.rate_limit_delay = rate_limit_delay
+        self.page_load_strategy = page_load_strategy
+        self.wait_for = wait_for
+        self.network_idle = network_idle_ms / 1000
+        self.block_resources = tuple(block_resources or ())
+        self.block_domains = tuple(block_domains or ())
+        self.screenshots = screenshots
+        self.limits = limits
         self.driver = None
+        self._last_fetch = None
+        self._page_load_timeout = None
+
+    @classmethod
+    def from_config(cls, settings, limits=None):
+        """
+        Scraper built from the scraper section of config.yaml.
+        """
+        return cls(
+            headless=settings.get("headless", True),
+            timeout=settings.get("timeout", 10),
+            rate_limit_delay=settings.get("rate_limit_delay", 2),
+            page_load_strategy=settings.get("page_load_strategy", "eager"),
+            wait_for=settings.get("wait_for", "dom"),
+            network_idle_ms=settings.get("network_idle_ms", 500),
+            block_resources=settings.get("block_resources", DEFAULT_BLOCKED_RESOURCES),
+            block_domains=settings.get("block_domains", DEFAULT_BLOCKED_DOMAINS),
+            screenshots=settings.get("screenshots", True),
+            limits=limits
+        )
+
+    def blocked_urls(self):
+        """
+        URL patterns for Network.setBlockedURLs ('*' is the only wildcard).
+        """
+        patterns = []
+        for resource in self.block_resources:
+            for ext in RESOURCE_EXTENSIONS.get(resource, ()):
+                patterns += [f"*{ext}", f"*{ext}?*"]
+        for domain in self.block_domains:
+            patterns += [f"*://{domain}/*", f"*://*.{domain}/*"]
+        return patterns
+
+    def chrome_options(self):
+        from selenium.webdriver.chrome.options import Options
 
-    def _init_driver(self):
         chrome_options = Options()
         if self.headless:
             chrome_options.add_argument("--headless")
         chrome_options.add_argument("--no-sandbox")
         chrome_options.add_argument("--disable-dev-shm-usage")
         chrome_options.add_argument("--window-size=1280,800")
-        
+        chrome_options.add_argument("--disable-extensions")
+        chrome_options.add_argument("--disable-gpu")
+        chrome_options.page_load_strategy = self.page_load_strategy
+        if "image" in self.block_resources:
+            # Also covers images served without a file extension
+            chrome_options.add_experimental_option("prefs", {"profile.managed_default_content_settings.images": 2})
+        return chrome_options
+
+    def _init_driver(self):
+        # Selenium and webdriver_manager are imported with the first browser, not at startup
+        from selenium import webdriver
+        from selenium.webdriver.chrome.service import Service
+        from webdriver_manager.chrome import ChromeDriverManager
+
         try:
-            self.driver = webdriver.Chrome(service=Service(ChromeDriverManager().install()), options=chrome_options)
+            self.driver = webdriver.Chrome(service=Service(ChromeDriverManager().install()), options=self.chrome_options())
             self.driver.set_page_load_timeout(self.timeout)
+            self._page_load_timeout = self.timeout
+            BROWSERS_OPEN.inc()
         except Exception as e:
             print(f"[!] Failed to initialize Selenium Driver: {e}")
+            return
+        self._apply_blocking()
+
+    def _apply_blocking(self):
+        patterns = self.blocked_urls()
+        if not patterns:
+            return
+        try:
+            self.driver.execute_cdp_cmd("Network.enable", {})
+            self.driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": patterns})
+        except Exception as e:
+            print(f"[!] Resource blocking unavailable: {e}")
 
-    def fetch_content(self, url):
+    def _throttle(self):
+        if self._last_fetch is not None:
+            remaining = self._last_fetch + self.rate_limit_delay - time.monotonic()
+            if remaining > 0:
+                time.sleep(remaining)
+        self._last_fetch = time.monotonic()
+
+    def _wait_ready(self, deadline):
+        """
+        Waits until the DOM is parsed and, with wait_for="network_idle", until
+        no new resource has started for network_idle seconds.
+        """
+        while self.driver.execute_script("return document.readyState") == "loading":
+            if time.monotonic() > deadline:
+                return
+            time.sleep(0.05)
+        if self.wait_for != "network_idle":
+            return
+        count, quiet_since = -1, time.monotonic()
+        while time.monotonic() < deadline:
+            current = self.driver.execute_script("return performance.getEntriesByType('resource').length")
+            now = time.monotonic()
+            if current != count:
+                count, quiet_since = current, now
+            elif now - quiet_since >= self.network_idle:
+                return
+            time.sleep(0.05)
+
+    def _load(self, url, timeout):
+        """
+        Navigates to url. A page still loading after timeout seconds is
+        stopped and kept as far as it got; returns False in that case.
+        """
+        if timeout != self._page_load_timeout:
+            self.driver.set_page_load_timeout(timeout)
+            self._page_load_timeout = timeout
+        try:
+            self.driver.get(url)
+            return True
+        except Exception as e:
+            # selenium's TimeoutException, without importing selenium here
+            if type(e).__name__ != "TimeoutException":
+                raise
+            self.driver.execute_script("window.stop();")
+            return False
+
+    def _status(self):
+        """
+        HTTP status of the loaded document (Chrome 109+), or None.
+        """
+        try:
+            return self.driver.execute_script(
+                "const nav = performance.getEntriesByType('navigation')[0]; return nav ? nav.responseStatus : null;"
+            )
+        except Exception:
+            return None
+
+    def fetch_content(self, url, timeout=None, held_slot=None):
         """
         Fetches the content of a URL using Selenium.
-        Returns a dictionary with 'html', 'text', and 'screenshot'.
+        Returns a dictionary with 'html', 'text', and 'screenshot'; 'partial'
+        is set if the page did not finish loading within timeout seconds
+        (at most the scraper's own timeout). With limits, the page load
+        waits for a slot on the host first; timeout does not count that
+        wait. A caller that already took a slot on the host passes its
+        AdaptiveLimit as held_slot and the fetch releases it.
         """
-        if not self.driver:
-            self._init_driver()
+        timeout = min(timeout, self.timeout) if timeout is not None else self.timeout
+        host_limit = held_slot or (self.limits.host(url) if self.limits else None)
+        if host_limit:
+            timeout = host_limit.timeout(timeout)
 
+        loading = False
+        BROWSERS_BUSY.inc()
         try:
+            if not self.driver:
+                self._init_driver()
+                if not self.driver:
+                    return None
             print(f"[*] Scraping: {url}")
-            self.driver.get(url)
-            time.sleep(self.rate_limit_delay) # Rate limiting
-            
+            with limited(host_limit, acquired=held_slot is not None) as call:
+                loading = True
+                if not host_limit:
+                    self._throttle() # Rate limiting
+                with timed("fetch"):
+                    deadline = time.monotonic() + timeout
+                    loaded = self._load(url, timeout)
+                    if loaded:
+                        self._wait_ready(deadline)
+                        call.record_status(self._status())
+                    else:
+                        call.outcome = "timeout"
+
             # Capture screenshot
             screenshot_b64 = None
-            try:
-                screenshot = self.driver.get_screenshot_as_png()
-                screenshot_b64 = base64.b64encode(screenshot).decode('utf-8')
-            except Exception as e:
-                print(f"[!] Screenshot failed for {url}: {e}")
+            if self.screenshots:
+                try:
+                    with timed("screenshot"):
+                        screenshot = self.driver.get_screenshot_as_png()
+                        screenshot_b64 = base64.b64encode(screenshot).decode('utf-8')
+                except Exception as e:
+                    print(f"[!] Screenshot failed for {url}: {e}")
 
             html = self.driver.page_source
-            soup = BeautifulSoup(html, 'html.parser')
-            
-            # Remove script and style elements
-            for script in soup(["script", "style"]):
-                script.decompose()
-
-            text = soup.get_text(separator=' ', strip=True)
+            with timed("extract"):
+                blocks = extract_blocks(html)
+                text = ' '.join(blocks)
             
             return {
                 "url": url,
                 "html": html,
                 "text": text,
-                "screenshot": screenshot_b64
+                "blocks": blocks, # lets the analyzer recognize the site's template
+                "screenshot": screenshot_b64,
+                "partial": not loaded
             }
         except Exception as e:
             print(f"[!] Error scraping {url}: {e}")
             return None
+        finally:
+            if held_slot is not None and not loading:
+                # The slot handed over was never used for a page load
+                held_slot.cancel()
+            BROWSERS_BUSY.dec()
 
     def close(self):
         if self.driver:
             self.driver.quit()
             self.driver = None
+            BROWSERS_OPEN.dec()
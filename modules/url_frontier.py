@@ -0,0 +1,115 @@
+import heapq
+import asyncio
+import itertools
+from collections import Counter, deque
+from typing import Deque, Dict, List, Optional
+from modules.metrics import QUEUE_DEPTH
+
+
+class UrlFrontier:
+    """
+    Deduplicating async queue between the search and fetch stages.
+    Search puts URLs in as soon as each dork returns; fetching starts on the
+    first one instead of waiting for every search to finish.
+
+    With a priority model (see modules/url_scheduler.py) queued URLs are
+    handed out highest predicted risk first; without one they come out in
+    arrival order.
+
+    URLs can be put under a group (the target domain of a batch scan).
+    Groups are served round-robin, so one domain with many results cannot
+    starve the others; max_per_group caps how many URLs a group may queue.
+    """
+
+    def __init__(self, model=None, max_per_group: Optional[int] = None):
+        self.model = model
+        self.max_per_group = max_per_group
+        self._heaps: Dict[Optional[str], List] = {}
+        self._rotation: Deque[Optional[str]] = deque()
+        self._group_sizes: Counter = Counter()
+        self._ready = asyncio.Event()
+        self._seq = itertools.count()
+        self._seen: Dict[str, Optional[str]] = {}
+        self._groups: Dict[str, Optional[str]] = {}
+        self.closed = False
+
+    def put(self, url: str, category: Optional[str] = None, group: Optional[str] = None) -> bool:
+        """
+        Queues a URL unless it was seen before or its group is full. Returns
+        True if it was queued. category is the dork category that produced
+        the URL, if known.
+        """
+        if self.closed or url in self._seen:
+            return False
+        if self.max_per_group and self._group_sizes[group] >= self.max_per_group:
+            return False
+        self._seen[url] = category
+        self._groups[url] = group
+        self._group_sizes[group] += 1
+        heap = self._heaps.get(group)
+        if heap is None:
+            heap = self._heaps[group] = []
+            self._rotation.append(group)
+        heapq.heappush(heap, (-self.priority_of(url), next(self._seq), url))
+        QUEUE_DEPTH.inc(queue="fetch")
+        self._ready.set()
+        return True
+
+    def priority_of(self, url: str) -> float:
+        if self.model is None:
+            return 0.0
+        return self.model.score(url, self._seen.get(url))
+
+    def category_of(self, url: str) -> Optional[str]:
+        return self._seen.get(url)
+
+    def group_of(self, url: str) -> Optional[str]:
+        return self._groups.get(url)
+
+    def close(self):
+        """
+        Marks the end of input; get() returns None once the queue is drained.
+        """
+        self.closed = True
+        self._ready.set()
+
+    async def get(self) -> Optional[str]:
+        while True:
+            url = self.get_nowait()
+            if url is not None or self.closed:
+                return url
+            self._ready.clear()
+            await self._ready.wait()
+
+    def get_nowait(self) -> Optional[str]:
+        """
+        Returns a queued URL, or None if nothing is queued right now.
+        """
+        for _ in range(len(self._rotation)):
+            group = self._rotation[0]
+            self._rotation.rotate(-1)
+            heap = self._heaps[group]
+            if heap:
+                QUEUE_DEPTH.dec(queue="fetch")
+                return heapq.heappop(heap)[2]
+        return None
+
+    @property
+    def drained(self) -> bool:
+        return self.closed and self.pending == 0
+
+    @property
+    def pending(self) -> int:
+        return sum(len(heap) for heap in self._heaps.values())
+
+    def __len__(self):
+        return len(self._seen)
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self) -> str:
+        url = await self.get()
+        if url is None:
+            raise StopAsyncIteration
+        return url
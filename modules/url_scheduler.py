@@ -0,0 +1,107 @@
+import os
+import re
+import json
+import posixpath
+from typing import Dict, Optional
+from urllib.parse import urlparse, unquote
+
+# Prior likelihood that a URL found by a dork category exposes something risky
+CATEGORY_PRIORS = {
+    "config_files": 0.9,
+    "databases": 0.9,
+    "logs": 0.7,
+    "source_code": 0.6,
+    "directories": 0.6,
+    "api": 0.55,
+    "errors": 0.5,
+    "admin_panels": 0.4,
+    "documents": 0.3,
+    "emails": 0.3,
+    "subdomains": 0.2,
+}
+DEFAULT_PRIOR = 0.3
+
+EXTENSION_BONUS = {
+    ".env": 0.5, ".sql": 0.45, ".bak": 0.4, ".backup": 0.4, ".dump": 0.4, ".db": 0.4, ".mdb": 0.35,
+    ".pem": 0.5, ".key": 0.5, ".ppk": 0.5, ".log": 0.3, ".ini": 0.3, ".conf": 0.3, ".cfg": 0.3,
+    ".config": 0.3, ".yml": 0.25, ".yaml": 0.25, ".json": 0.15, ".xml": 0.1, ".txt": 0.1,
+    ".zip": 0.15, ".gz": 0.15, ".tar": 0.15, ".xls": 0.1, ".xlsx": 0.1, ".csv": 0.15,
+}
+PATH_KEYWORDS = ("backup", "dump", "config", ".git", ".svn", "secret", "password", "passwd", "credential",
+                 "private", "debug", "phpinfo", "admin", "internal", "token", "export", "wp-config")
+KEYWORD_BONUS = 0.1
+MAX_KEYWORD_BONUS = 0.3
+
+# Dork operators -> category, used for dorks that do not come with a category
+DORK_RULES = [
+    (re.compile(r'(?:ext|filetype):(?:env|ini|conf|config|cfg|yml|yaml)|web\.config|DB_PASSWORD', re.I), "config_files"),
+    (re.compile(r'(?:ext|filetype):(?:sql|db|dbf|mdb|bak|backup)|INSERT INTO|CREATE TABLE|inurl:(?:backup|dump)', re.I), "databases"),
+    (re.compile(r'(?:ext|filetype):log|inurl:log', re.I), "logs"),
+    (re.compile(r'\.git|\.svn|(?:ext|filetype):(?:php|asp|aspx|jsp|java|py)', re.I), "source_code"),
+    (re.compile(r'api[_ ]?key|apikey|api token|inurl:/?api|inurl:/v1', re.I), "api"),
+    (re.compile(r'sql syntax|syntax error|fatal error|stack trace|inurl:error', re.I), "errors"),
+    (re.compile(r'intitle:"index of', re.I), "directories"),
+    (re.compile(r'admin|login|controlpanel|wp-admin', re.I), "admin_panels"),
+    (re.compile(r'(?:ext|filetype):(?:pdf|doc|docx|xls|xlsx|ppt|txt)', re.I), "documents"),
+    (re.compile(r'site:\*\.', re.I), "subdomains"),
+    (re.compile(r'@|email', re.I), "emails"),
+]
+
+
+def categorize_dork(dork: str) -> Optional[str]:
+    """
+    Best-effort mapping of a free-form dork to a get_dork_categories() key.
+    """
+    for pattern, category in DORK_RULES:
+        if pattern.search(dork):
+            return category
+    return None
+
+
+class UrlPriorityModel:
+    """
+    Predicts how risky a URL is likely to be before fetching it, from the dork
+    category that found it, its file extension, path keywords and the
+    historical hit rate of the category. Hit rates are persisted between scans.
+    """
+
+    def __init__(self, stats_path: Optional[str] = None, history_weight: float = 10.0):
+        self.stats_path = stats_path
+        # Observations needed before history counts as much as the prior
+        self.history_weight = history_weight
+        self.stats: Dict[str, Dict[str, int]] = {}
+        if stats_path and os.path.exists(stats_path):
+            try:
+                with open(stats_path, "r") as f:
+                    self.stats = json.load(f)
+            except (OSError, ValueError) as e:
+                print(f"[!] Could not load scheduler stats: {e}")
+
+    def category_score(self, category: Optional[str]) -> float:
+        prior = CATEGORY_PRIORS.get(category, DEFAULT_PRIOR)
+        stats = self.stats.get(category or "uncategorized")
+        if not stats or not stats.get("fetched"):
+            return prior
+        # Blend the prior with the observed hit rate as evidence accumulates
+        fetched, hits = stats["fetched"], stats["hits"]
+        return (prior * self.history_weight + hits) / (self.history_weight + fetched)
+
+    def score(self, url: str, category: Optional[str] = None) -> float:
+        path = unquote(urlparse(url).path or "").lower()
+        ext = posixpath.splitext(path)[1]
+        keyword_bonus = min(MAX_KEYWORD_BONUS, KEYWORD_BONUS * sum(1 for k in PATH_KEYWORDS if k in path))
+        return self.category_score(category) + EXTENSION_BONUS.get(ext, 0.0) + keyword_bonus
+
+    def record(self, category: Optional[str], hit: bool):
+        stats = self.stats.setdefault(category or "uncategorized", {"fetched": 0, "hits": 0})
+        stats["fetched"] += 1
+        stats["hits"] += int(hit)
+
+    def save(self):
+        if not self.stats_path:
+            return
+        try:
+            with open(self.stats_path, "w") as f:
+                json.dump(self.stats, f, indent=2)
+        except OSError as e:
+            print(f"[!] Could not save scheduler stats: {e}")
@@ -1,16 +1,21 @@
 import os
+import time
 import base64
 import requests
 from typing import Dict, Any
+from modules.concurrency import limited
 
 class VisionAnalyzer:
     """
     AI Visual Auditor that analyzes screenshots to detect sensitive UI elements.
     Interfaces with OpenAI's GPT-4o-mini or similar vision models.
+    With an AdaptiveLimit (modules/concurrency.py) calls are limited and
+    timed out by what the API currently tolerates.
     """
-    def __init__(self, api_key: str = None):
+    def __init__(self, api_key: str = None, limit=None):
         self.api_key = api_key or os.getenv("OPENAI_API_KEY")
         self.enabled = self.api_key is not None
+        self.limit = limit
         
         # UI Elements we want to detect
         self.target_elements = [
@@ -24,9 +29,10 @@ class VisionAnalyzer:
             "cloud storage bucket with files"
         ]
 
-    def analyze_screenshot(self, base64_image: str) -> Dict[str, Any]:
+    def analyze_screenshot(self, base64_image: str, timeout: float = 30) -> Dict[str, Any]:
         """
-        Sends the screenshot to the Vision API for analysis.
+        Sends the screenshot to the Vision API for analysis. timeout is the
+        ceiling; waiting for a slot counts against it.
         """
         if not self.enabled:
             return {"enabled": False, "message": "Vision API key missing (OPENAI_API_KEY)"}
@@ -62,8 +68,14 @@ class VisionAnalyzer:
                 "max_tokens": 150
             }
 
-            response = requests.post("https://api.openai.com/v1/chat/completions", headers=headers, json=payload)
-            response.raise_for_status()
+            if self.limit:
+                timeout = self.limit.timeout(timeout)
+            start = time.monotonic()
+            with limited(self.limit, timeout):
+                remaining = max(timeout - (time.monotonic() - start), 0.1)
+                response = requests.post("https://api.openai.com/v1/chat/completions", headers=headers, json=payload,
+                                         timeout=remaining)
+                response.raise_for_status()
             result = response.json()
             analysis_text = result['choices'][0]['message']['content']
 
@@ -79,6 +91,8 @@ class VisionAnalyzer:
                 "is_sensitive": classification != "benign"
             }
 
+        except (requests.Timeout, TimeoutError):
+            return {"enabled": True, "error": f"No answer within {timeout:.0f}s", "timed_out": True}
         except Exception as e:
             return {"enabled": True, "error": str(e)}
 
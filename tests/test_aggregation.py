@@ -0,0 +1,63 @@
+import json
+import pandas as pd
+from modules.aggregation import ExposureAggregator
+from modules.ai_analyzer import AIAnalyzer
+from modules.report_builder import generate_reports
+
+def make_results():
+    footer = "Contact Admin@Example.com. Key: AKIA1234567890ABCDEF"
+    analyzer = AIAnalyzer(config_path="/dev/null")
+    results = []
+    for i, score in enumerate([80, 20, 10]):
+        text = f"Page {i}. {footer}" + (" admin@example.com" if i == 0 else "")
+        results.append({"url": f"http://site.example/{i}", "findings": analyzer.analyze({"text": text}),
+                        "risk_score": score, "risk_level": "HIGH" if score >= 75 else "LOW"})
+    return results
+
+def test_aggregator_merges_repeated_matches():
+    aggregator = ExposureAggregator()
+    aggregator.add_results(make_results())
+    exposures = {e["type"]: e for e in aggregator.exposures()}
+
+    assert len(aggregator) == 2
+    assert exposures["email"]["occurrences"] == 4
+    assert exposures["email"]["url_count"] == 3
+    assert exposures["email"]["locations"][0] == {"url": "http://site.example/0", "count": 2}
+    assert exposures["aws_key"]["max_risk_level"] == "HIGH"
+
+    # A page's classification is its own exposure, not one label shared by every page
+    label = {"type": "credential_leak", "source": "ml_page", "match": "credential leak", "confidence": 0.9}
+    aggregator.add("http://site.example/0", [label])
+    aggregator.add("http://site.example/1", [label])
+    assert [e["url_count"] for e in aggregator.exposures() if e["type"] == "credential_leak"] == [1, 1]
+
+def test_reports_have_one_row_per_exposure(tmp_path):
+    json_path, csv_path = generate_reports(make_results(), str(tmp_path))
+    rows = pd.read_csv(csv_path)
+    assert len(rows) == 2
+    assert set(rows["url_count"]) == {3}
+
+    report = json.load(open(json_path))
+    assert report["summary"] == {"pages": 3, "unique_exposures": 2, "total_occurrences": 7}
+    assert report["pages"][0]["finding_counts"] == {"email": 2, "aws_key": 1}
+
+def test_ml_verification_runs_once_per_exposure():
+    class CountingEngine:
+        calls = 0
+        def classify_threat(self, text, max_length=500):
+            return {}
+        def analyze_context(self, text, finding):
+            CountingEngine.calls += 1
+            return {"severity": "HIGH", "ml_confidence": 0.9}
+
+    analyzer = AIAnalyzer(config_path="/dev/null")
+    analyzer.ml_engine = CountingEngine()
+    analyzer.cascade = None  # every exposure goes to the ML engine
+    for i in range(5):
+        findings = analyzer.analyze({"text": f"page {i}: AKIA1234567890ABCDEF admin@example.com"})
+        assert all(f["severity"] == "HIGH" for f in findings)
+    assert CountingEngine.calls == 2
+    # A new scan verifies its exposures again
+    analyzer.reset()
+    analyzer.analyze({"text": "page: AKIA1234567890ABCDEF admin@example.com"})
+    assert CountingEngine.calls == 4
@@ -0,0 +1,82 @@
+import asyncio
+import json
+from modules.batch_scan import normalize_domain, parse_domains, interleave_dorks, combine_results, write_batch_summary
+
+def test_parse_domains():
+    lines = ["# program scope\n", "https://www.Example.com/login\n", "\n", "api.example.com  # staging\n", "example.com\n"]
+    assert parse_domains(lines) == ["example.com", "api.example.com"]
+    assert normalize_domain(" http://shop.example.org ") == "shop.example.org"
+
+def test_interleave_dorks_shares_quota():
+    dorks = {"a.example": [("admin", "a1"), ("config", "a2"), ("logs", "a3")], "b.example": [("admin", "b1")]}
+    assert interleave_dorks(dorks) == [("a.example", "admin", "a1"), ("b.example", "admin", "b1"),
+                                       ("a.example", "config", "a2"), ("a.example", "logs", "a3")]
+    assert [d[2] for d in interleave_dorks(dorks, max_searches=2)] == ["a1", "b1"]
+
+def test_combined_summary(tmp_path):
+    results = [
+        {"url": "http://a.example/", "domain": "a.example", "risk_score": 20, "risk_level": "LOW",
+         "findings": [{"type": "email"}]},
+        {"url": "http://b.example/.env", "domain": "b.example", "risk_score": 90, "risk_level": "HIGH",
+         "findings": [{"type": "aws_key"}, {"type": "email"}]},
+    ]
+    osint = {"b.example": {"enabled": True, "exposures": ["redis"], "vulns": []}}
+    summary = combine_results(["a.example", "b.example", "c.example"], results, {"b.example": {"json": "b.json"}}, osint)
+    assert [row["domain"] for row in summary["domains"]] == ["b.example", "a.example", "c.example"]
+    assert summary["domains"][0]["osint_exposures"] == 1 and summary["domains"][0]["reports"] == {"json": "b.json"}
+    assert summary["totals"] == {"domains": 3, "domains_with_findings": 2, "pages": 2, "findings": 3,
+                                 "risk_levels": {"HIGH": 1, "LOW": 1}}
+
+    json_path, csv_path = write_batch_summary(summary, str(tmp_path), "batch_x_summary")
+    assert json.load(open(json_path))["totals"]["pages"] == 2
+    rows = open(csv_path).read().splitlines()
+    assert rows[1].startswith("b.example,1,2,1,0,0,90,aws_key; email,1,b.json")
+
+def test_batch_task_shares_one_frontier(tmp_path, monkeypatch):
+    import app
+    from modules.result_store import ResultStore
+
+    store = ResultStore(db_path=str(tmp_path / "results.db"))
+    searched = []
+    seen_frontiers = []
+
+    def fake_search(dork, num_results=10, limit=None):
+        searched.append(dork)
+        domain = dork.split()[0][len("site:"):]
+        return [f"http://{domain}/{len(searched)}"]
+
+    async def fake_scan_urls(frontier, scan_id, budget, log_prefix="Scraping"):
+        seen_frontiers.append(frontier)
+        results = []
+        async for url in frontier:
+            result = {"url": url, "domain": frontier.group_of(url), "risk_score": 0, "risk_level": "NONE", "findings": []}
+            if result["domain"] == "b.example":
+                result["skipped"] = ["ml"]
+                budget.record_page(result["skipped"])
+            results.append(result)
+            await app.publish_result(scan_id, result)
+        return results
+
+    monkeypatch.setattr(app, "result_store", store)
+    monkeypatch.setattr(app, "secret_index", None)
+    monkeypatch.setattr(app, "google_search", fake_search)
+    monkeypatch.setattr(app, "scan_urls", fake_scan_urls)
+    monkeypatch.setattr(app, "osint_settings", {"shodan_enabled": False})
+    monkeypatch.setattr(app, "batch_settings", {"max_searches": 6, "max_urls_per_domain": 2})
+    monkeypatch.chdir(tmp_path)
+
+    store.create_scan("batch1", "batch")
+    data = asyncio.run(app.run_batch_task("batch1", ["a.example", "b.example"]))
+    assert len(seen_frontiers) == 1 and len(searched) == 6
+    assert [dork.split()[0] for dork in searched[:2]] == ["site:a.example", "site:b.example"]
+    # 3 URLs found per domain, 2 fetched
+    assert data["stats"]["urls_found"] == 6
+    assert {row["domain"]: row["pages"] for row in data["summary"]["domains"]} == {"a.example": 2, "b.example": 2}
+    assert sorted(data["domain_reports"]) == ["a.example", "b.example"]
+    assert store.query("batch1", domain="b.example")["total"] == 2
+
+    # Each domain report only counts what was skipped on that domain's pages
+    budgets = {domain: json.load(open(reports["json"]))["summary"]["budget"]
+               for domain, reports in data["domain_reports"].items()}
+    assert budgets["a.example"]["complete"] and budgets["a.example"]["skipped"] == {}
+    assert budgets["b.example"]["skipped"] == {"ml": 2}
@@ -0,0 +1,24 @@
+import yaml
+from benchmarks.run_benchmarks import run, check_regressions, DEFAULT_THRESHOLDS
+
+def test_benchmark_smoke():
+    report = run(scale=0.01, iterations=1)
+    for stage in ("search", "fetch", "extract", "regex", "analyze", "score", "report"):
+        assert report["stages"][stage]["calls"] > 0
+
+def test_default_corpus_within_shipped_budgets():
+    # One pass over the default corpus; the p95 ceilings must hold for it
+    with open(DEFAULT_THRESHOLDS) as f:
+        thresholds = yaml.safe_load(f)
+    assert check_regressions(run(scale=1.0, iterations=1), thresholds) == []
+
+def test_regression_gate():
+    report = {"stages": {"regex": {"p50_ms": 13.0, "p95_ms": 20.0}}}
+    baseline = {"stages": {"regex": {"p50_ms": 10.0, "p95_ms": 15.0}}}
+    thresholds = {"max_regression": 0.25, "compare_metric": "p50_ms", "budgets_ms": {"regex": 100}}
+
+    assert check_regressions(report, thresholds, baseline) == ["regex: p50_ms 13.0ms vs baseline 10.0ms (+30%)"]
+    thresholds["max_regression"] = 0.5
+    assert check_regressions(report, thresholds, baseline) == []
+    thresholds["budgets_ms"]["regex"] = 10
+    assert len(check_regressions(report, thresholds, baseline)) == 1
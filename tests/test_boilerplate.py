@@ -0,0 +1,59 @@
+import os
+from modules.ai_analyzer import AIAnalyzer
+from modules.boilerplate import BoilerplateFilter
+
+HEADER = ["Acme Corp", "Home", "Products", "Login"]
+FOOTER = ["Contact admin@acme.example", "Key AKIA1234567890ABCDEF", "© Acme Corp"]
+
+def page(*body):
+    blocks = HEADER + list(body) + FOOTER
+    return blocks, " ".join(blocks)
+
+class RecordingNLP:
+    def __init__(self):
+        self.texts = []
+
+    def analyze(self, content):
+        self.texts.append(content["text"])
+        return {"sensitive_patterns": []}
+
+def test_template_learned_per_host():
+    boilerplate = BoilerplateFilter(shingle_size=2)
+    blocks, _ = page("Release notes", "Nothing new")
+    assert boilerplate.split("http://acme.example/a", blocks).template_spans == []
+
+    blocks, text = page("Staging database", "DB_PASSWORD=hunter22")
+    split = boilerplate.split("http://acme.example/b", blocks)
+    assert split.unique_text == "Staging database DB_PASSWORD=hunter22"
+    header, footer = split.template_spans
+    assert text[header[0]:header[1]] == " ".join(HEADER) and text[footer[0]:footer[1]] == " ".join(FOOTER)
+    assert split.in_template(text.index("admin@"), text.index("admin@") + 5)
+    assert not split.in_template(text.index("DB_"), text.index("DB_") + 3)
+
+    # Another host has its own template
+    assert boilerplate.split("http://other.example/b", blocks).unique_text == text
+    assert boilerplate.split("http://acme.example/c", []) is None
+
+def test_nlp_sees_template_once():
+    analyzer = AIAnalyzer(config_path=os.devnull)
+    analyzer.nlp_engine = RecordingNLP()
+    results = []
+    for i in range(3):
+        blocks, text = page(f"Report {i}", f"password={i}secret{i}")
+        results.append(analyzer.analyze({"url": f"http://acme.example/{i}", "text": text, "blocks": blocks}))
+
+    assert analyzer.nlp_engine.texts[0].startswith("Acme Corp Home")
+    assert analyzer.nlp_engine.texts[1:] == ["Report 1 password=1secret1", "Report 2 password=2secret2"]
+    # Footer emails are reported once per host; secrets in the footer on every page
+    assert [sum(f["type"] == "email" for f in findings) for findings in results] == [1, 0, 0]
+    assert all(any(f["type"] == "aws_key" for f in findings) for findings in results)
+    assert all(any(f["type"] == "password_alike" for f in findings) for findings in results)
+
+def test_template_is_learned_per_scan():
+    analyzer = AIAnalyzer(config_path=os.devnull)
+    blocks, text = page("Report 0", "password=0secret0")
+    analyzer.analyze({"url": "http://acme.example/0", "text": text, "blocks": blocks})
+    analyzer.reset()
+    findings = analyzer.analyze({"url": "http://acme.example/1", "text": text, "blocks": blocks})
+    # First page of the next scan: the footer email is reported again
+    assert sum(f["type"] == "email" for f in findings) == 1
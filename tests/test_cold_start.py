@@ -0,0 +1,31 @@
+import os
+import shutil
+import subprocess
+import sys
+import yaml
+from benchmarks.cold_start import ROOT_DIR, DEFAULT_THRESHOLDS, import_profile, parse_importtime, check_budgets
+
+def test_parse_importtime():
+    stderr = ("import time: self [us] | cumulative | imported package\n"
+              "import time:       120 |        120 |   yaml\n"
+              "import time:      3000 |       5120 | app\n")
+    assert parse_importtime(stderr) == [("yaml", 0.12, 0.12, 1), ("app", 3.0, 5.12, 0)]
+
+def test_app_import_is_lazy_and_within_budget():
+    with open(DEFAULT_THRESHOLDS, "r") as f:
+        budget = yaml.safe_load(f)["cold_start_ms"]["import"]
+    # Best of a few fresh interpreters, so one slow run on a busy machine does not fail the test
+    profiles = [import_profile() for _ in range(3)]
+    assert all(p["eager_heavy_modules"] == [] for p in profiles)
+    assert min(p["import_ms"] for p in profiles) <= budget
+
+def test_budget_check():
+    report = {"import_ms": 1200.0, "first_response_ms": 900.0, "eager_heavy_modules": ["pandas"]}
+    failures = check_budgets(report, {"cold_start_ms": {"import": 1000, "first_response": 4000}})
+    assert failures == ["imported at startup: pandas", "import: 1200.0ms exceeds budget 1000ms"]
+
+def test_app_import_creates_no_stores(tmp_path):
+    shutil.copy(os.path.join(ROOT_DIR, "config.yaml"), tmp_path)
+    subprocess.run([sys.executable, "-c", f"import sys; sys.path.insert(0, {ROOT_DIR!r}); import app"],
+                   cwd=tmp_path, check=True, capture_output=True)
+    assert sorted(os.listdir(tmp_path)) == ["config.yaml", "reports"]
@@ -0,0 +1,159 @@
+import time
+import threading
+from modules.concurrency import AdaptiveLimit, ConcurrencyLimits, classify, limited
+from modules.metrics import render_metrics
+
+class HttpError(Exception):
+    def __init__(self, status):
+        super().__init__(f"HTTP {status}")
+        self.response = type("Response", (), {"status_code": status})()
+
+class ReadTimeout(Exception):
+    pass
+
+def run(limit, outcome="ok", latency=0.01):
+    assert limit.acquire(timeout=0)
+    limit.release(latency, outcome)
+
+def test_limit_grows_per_window_and_halves_on_errors():
+    limit = AdaptiveLimit(initial=1, max_limit=4, pause_seconds=0)
+    run(limit)
+    assert limit.capacity == 2
+    for _ in range(20):
+        run(limit)
+    assert limit.limit == 4.0  # never above the ceiling
+    run(limit, "error")
+    assert limit.capacity == 2
+    # Calls that were in flight during the same round trip do not halve it again
+    run(limit, "timeout")
+    assert limit.capacity == 2
+    time.sleep(0.02)
+    run(limit, "timeout")
+    assert limit.capacity == 1
+
+def test_throttling_pauses_new_calls():
+    limit = AdaptiveLimit(initial=2, pause_seconds=0.2)
+    run(limit, "throttled")
+    assert limit.capacity == 1
+    assert not limit.acquire(timeout=0.05)
+    start = time.monotonic()
+    assert limit.acquire(timeout=1)
+    assert time.monotonic() - start >= 0.1
+
+def test_slowdown_reduces_limit():
+    limit = AdaptiveLimit(initial=4, latency_tolerance=2.0, smoothing=1.0)
+    run(limit, latency=0.01)
+    assert limit.limit == 4
+    run(limit, latency=0.1)
+    assert limit.capacity == 2
+
+def test_acquire_waits_for_a_free_slot():
+    limit = AdaptiveLimit(initial=1)
+    assert limit.acquire()
+    assert not limit.acquire(timeout=0.05)
+    threading.Timer(0.1, limit.release, (0.1,)).start()
+    assert limit.acquire(timeout=2)
+
+def test_slot_classifies_exceptions():
+    assert classify(HttpError(429)) == "throttled"
+    assert classify(HttpError(500)) == "error"
+    assert classify(ReadTimeout()) == "timeout"
+    assert classify(Exception("API rate limit reached")) == "throttled"
+
+    limit = AdaptiveLimit(initial=2, pause_seconds=0)
+    try:
+        with limit.slot():
+            raise HttpError(503)
+    except HttpError:
+        pass
+    assert limit.capacity == 1 and limit.in_flight == 0
+    with limited(None) as call:
+        call.record_status(429)
+    assert call.outcome == "throttled"
+
+def test_limits_per_host_and_api_exported_as_metrics():
+    limits = ConcurrencyLimits.from_config({
+        "hosts": {"initial": 1, "max": 2, "max_hosts": 2},
+        "apis": {"vision": {"initial": 3, "max": 6}},
+        "backoff": 0.25
+    })
+    assert limits.host("https://A.example/x") is limits.host("http://a.example/y")
+    assert limits.api("vision").capacity == 3 and limits.api("vision").backoff == 0.25
+    limits.host("http://b.example/")
+    text = render_metrics()
+    assert 'aegis_concurrency_limit{kind="host",name="a.example"} 1.0' in text
+    assert 'aegis_concurrency_limit{kind="api",name="vision"} 3.0' in text
+    limits.host("http://c.example/")
+    assert 'name="a.example"' not in render_metrics()
+
+def test_min_interval_paces_calls_on_free_slots():
+    limit = AdaptiveLimit(initial=4, min_interval=0.1)
+    assert limit.acquire(timeout=0)
+    assert not limit.acquire(timeout=0)  # slots free, but too soon
+    start = time.monotonic()
+    assert limit.acquire(timeout=1)
+    assert time.monotonic() - start >= 0.05
+    limit.cancel()
+    limit.cancel()
+    assert limit.in_flight == 0 and limit.limit == 4
+
+def test_acquire_async_is_woken_by_release():
+    import asyncio
+    limit = AdaptiveLimit(initial=1)
+
+    async def wait_for_slot():
+        assert limit.acquire()
+        assert not await limit.acquire_async(timeout=0.05)
+        threading.Timer(0.1, limit.release, (0.1,)).start()
+        start = time.monotonic()
+        assert await limit.acquire_async(timeout=2)
+        return time.monotonic() - start
+
+    assert 0.05 < asyncio.run(wait_for_slot()) < 1
+    assert limit.in_flight == 1 and not limit._async_waiters
+
+def test_local_scan_waits_for_host_slots_without_dropping_pages(tmp_path, monkeypatch):
+    import asyncio
+    import app
+    import modules.ai_analyzer
+    from modules.result_store import ResultStore
+
+    limits = ConcurrencyLimits.from_config({"hosts": {"initial": 1, "max": 1}})
+    fetching = []
+
+    class SlowScraper:
+        @classmethod
+        def from_config(cls, settings, limits=None):
+            return cls()
+        def fetch_content(self, url, timeout=None, held_slot=None):
+            with limited(held_slot, acquired=held_slot is not None):
+                fetching.append(held_slot.in_flight)
+                time.sleep(0.1)  # longer than the fetch limit, as is the wait for the host
+                if url.endswith("/3"):
+                    raise RuntimeError("tab crashed")
+            return {"url": url, "text": "", "screenshot": None}
+        def close(self):
+            pass
+
+    class PlainAnalyzer:
+        def __init__(self, concurrency=None):
+            pass
+        def analyze(self, content, budget=None):
+            return []
+
+    store = ResultStore(db_path=str(tmp_path / "results.db"))
+    monkeypatch.setattr(app, "result_store", store)
+    monkeypatch.setattr(app, "secret_index", None)
+    monkeypatch.setattr(app, "url_model", None)
+    monkeypatch.setattr(app, "job_queue", None)
+    monkeypatch.setattr(app, "concurrency", limits)
+    monkeypatch.setattr(app, "concurrency_settings", {"browsers": 2})
+    monkeypatch.setattr(app, "SeleniumScraper", SlowScraper)
+    monkeypatch.setattr(modules.ai_analyzer, "AIAnalyzer", PlainAnalyzer)
+    monkeypatch.setattr(app, "budget_settings", {"fetch_seconds": 0.05})
+    monkeypatch.chdir(tmp_path)
+
+    store.create_scan("s1", "scan")
+    asyncio.run(app.run_scan_task("s1", [f"http://site.example/{i}" for i in range(4)]))
+    assert store.get_scan("s1")["summary"]["pages"] == 3  # the crashed fetch costs its page only
+    assert fetching == [1, 1, 1, 1] and limits.host("http://site.example/").in_flight == 0
@@ -0,0 +1,211 @@
+import time
+import json
+import asyncio
+from modules.ai_analyzer import AIAnalyzer
+from modules.deadlines import PageBudget, ScanBudget
+
+class SlowNLP:
+    def analyze(self, content):
+        time.sleep(0.05)
+        return {"sensitive_patterns": []}
+
+class CountingML:
+    calls = 0
+    def classify_threat(self, text, max_length=500):
+        CountingML.calls += 1
+        return {}
+    def analyze_context(self, text, finding):
+        CountingML.calls += 1
+        return {"severity": "HIGH", "ml_confidence": 0.9}
+
+def test_stage_limits_capped_by_scan_deadline():
+    budget = ScanBudget(scan_seconds=5, stages={"fetch": 30, "search": 2, "vision": None})
+    assert 4 < budget.limit("fetch") <= 5 and budget.limit("search") == 2
+    assert ScanBudget().limit("fetch") is None and not ScanBudget().expired
+    budget.skip("urls", 3)
+    budget.record_page(["ml", "vision"])
+    report = budget.report()
+    assert not report["complete"] and report["skipped"] == {"urls": 3, "ml": 1, "vision": 1}
+    assert ScanBudget.from_config({"scan_seconds": None, "fetch_seconds": 10}, 60).stages == {"fetch": 10}
+
+def test_analysis_degrades_when_page_budget_runs_out():
+    analyzer = AIAnalyzer(config_path="/dev/null")
+    analyzer.nlp_engine = SlowNLP()
+    analyzer.ml_engine = CountingML()
+    analyzer.cascade = None
+    content = {"text": "key AKIA1234567890ABCDEF password=hunter22"}
+
+    budget = PageBudget(seconds=0.01)
+    findings = analyzer.analyze(content, budget)
+    # NLP ran past the budget: ML is skipped, regex findings are kept unverified
+    assert budget.skipped == ["ml"] and CountingML.calls == 0
+    assert {f["type"] for f in findings} == {"aws_key", "password_alike"}
+    assert all("ml_verification" not in f for f in findings)
+
+    budget = PageBudget(seconds=10)
+    analyzer.analyze(content, budget)
+    assert budget.skipped == [] and CountingML.calls == 3
+
+def test_nlp_text_cut_to_page_budget():
+    class RecordingNLP:
+        texts = []
+        def analyze(self, content):
+            RecordingNLP.texts.append(content["text"])
+            return {"sensitive_patterns": []}
+
+    analyzer = AIAnalyzer(config_path="/dev/null")
+    analyzer.nlp_engine = RecordingNLP()
+    analyzer.nlp_chars_per_second = 1000
+    content = {"text": "word " * 2000}
+
+    budget = PageBudget(seconds=0.5)
+    analyzer.analyze(content, budget)
+    assert len(RecordingNLP.texts[-1]) <= 500 and budget.skipped == ["nlp_truncated"]
+
+    budget = PageBudget(seconds=30)
+    analyzer.analyze(content, budget)
+    assert RecordingNLP.texts[-1] == content["text"] and budget.skipped == []
+
+def test_scan_stops_at_deadline_with_partial_report(tmp_path, monkeypatch):
+    import app
+    import modules.ai_analyzer
+    from modules.result_store import ResultStore
+
+    class SlowScraper:
+        timeouts = []
+        @classmethod
+        def from_config(cls, settings, limits=None):
+            return cls()
+        def fetch_content(self, url, timeout=None, held_slot=None):
+            SlowScraper.timeouts.append(timeout)
+            time.sleep(0.15)
+            return {"url": url, "text": "admin@example.com", "screenshot": None}
+        def close(self):
+            pass
+
+    class PlainAnalyzer:
+        def __init__(self, concurrency=None):
+            pass
+        def analyze(self, content, budget=None):
+            return AIAnalyzer(config_path="/dev/null")._regex_analyze(content["text"])
+        def baseline(self, content):
+            return self.analyze(content)
+
+    store = ResultStore(db_path=str(tmp_path / "results.db"))
+    monkeypatch.setattr(app, "result_store", store)
+    monkeypatch.setattr(app, "secret_index", None)
+    monkeypatch.setattr(app, "url_model", None)
+    monkeypatch.setattr(app, "job_queue", None)
+    monkeypatch.setattr(app, "concurrency", None)  # one browser
+    monkeypatch.setattr(app, "SeleniumScraper", SlowScraper)
+    monkeypatch.setattr(modules.ai_analyzer, "AIAnalyzer", PlainAnalyzer)
+    monkeypatch.setattr(app, "budget_settings", {"fetch_seconds": 10})
+    monkeypatch.chdir(tmp_path)
+
+    urls = [f"http://site.example/{i}" for i in range(10)]
+    store.create_scan("s1", "scan")
+    start = time.monotonic()
+    asyncio.run(app.run_scan_task("s1", urls, deadline=0.4))
+    assert time.monotonic() - start < 1.5
+
+    summary = store.get_scan("s1")["summary"]
+    budget = summary["budget"]
+    assert budget["deadline_hit"] and not budget["complete"]
+    assert 0 < summary["pages"] < 10 and summary["pages"] + budget["skipped"]["urls"] == 10
+    # Fetch limits shrink with the time left in the scan
+    assert SlowScraper.timeouts[0] <= 0.4
+    report = json.load(open(next((tmp_path / "reports").glob("report_*.json"))))
+    assert report["summary"]["complete"] is False and report["summary"]["pages"] == summary["pages"]
+
+def test_overrunning_analysis_falls_back_to_regex(tmp_path, monkeypatch):
+    import app
+    import modules.ai_analyzer
+    from modules.result_store import ResultStore
+
+    class FastScraper:
+        @classmethod
+        def from_config(cls, settings, limits=None):
+            return cls()
+        def fetch_content(self, url, timeout=None, held_slot=None):
+            return {"url": url, "text": "key AKIA1234567890ABCDEF", "screenshot": None}
+        def close(self):
+            pass
+
+    class StuckAnalyzer(AIAnalyzer):
+        def __init__(self, concurrency=None):
+            super().__init__(config_path="/dev/null")
+        def analyze(self, content, budget=None):
+            time.sleep(1.5)  # one NLP/ML call that ignores the budget
+            return []
+
+    store = ResultStore(db_path=str(tmp_path / "results.db"))
+    monkeypatch.setattr(app, "result_store", store)
+    monkeypatch.setattr(app, "secret_index", None)
+    monkeypatch.setattr(app, "url_model", None)
+    monkeypatch.setattr(app, "job_queue", None)
+    monkeypatch.setattr(app, "concurrency", None)
+    monkeypatch.setattr(app, "SeleniumScraper", FastScraper)
+    monkeypatch.setattr(modules.ai_analyzer, "AIAnalyzer", StuckAnalyzer)
+    monkeypatch.setattr(app, "budget_settings", {})
+    monkeypatch.chdir(tmp_path)
+
+    finished = []
+    finish = store.finish
+    monkeypatch.setattr(store, "finish", lambda *args, **kwargs: (finished.append(time.monotonic()), finish(*args, **kwargs)))
+
+    store.create_scan("s1", "scan")
+    start = time.monotonic()
+    asyncio.run(app.run_scan_task("s1", ["http://site.example/"], deadline=0.4))
+    # The scan ends at its deadline, not when the stuck analysis returns
+    assert finished[0] - start < 1.2
+
+    result = store.query("s1")["items"][0]
+    assert [f["type"] for f in result["findings"]] == ["aws_key"] and result["skipped"] == ["analysis"]
+
+def test_failed_scan_stops_searching(tmp_path, monkeypatch):
+    import pytest
+    import app
+    from modules.result_store import ResultStore
+
+    import threading
+    searched = []
+    search_done = threading.Event()
+
+    def slow_search(dork, num_results=10, limit=None):
+        searched.append(dork)
+        search_done.wait(5)
+        return []
+
+    async def broken_scan_urls(frontier, scan_id, budget, log_prefix="Scraping"):
+        while not searched:
+            await asyncio.sleep(0.01)
+        raise RuntimeError("browser crashed")
+
+    store = ResultStore(db_path=str(tmp_path / "results.db"))
+    messages = []
+
+    async def broadcast(message):
+        messages.append(message)
+
+    monkeypatch.setattr(app, "result_store", store)
+    monkeypatch.setattr(app.manager, "broadcast", broadcast)
+    monkeypatch.setattr(app, "url_model", None)
+    monkeypatch.setattr(app, "concurrency", None)  # one search at a time
+    monkeypatch.setattr(app, "google_search", slow_search)
+    monkeypatch.setattr(app, "scan_urls", broken_scan_urls)
+    monkeypatch.chdir(tmp_path)
+
+    async def scan():
+        with pytest.raises(RuntimeError):
+            await app.run_scan_task("s1", [], [f"site:a.example {i}" for i in range(50)])
+        search_done.set()
+        await asyncio.sleep(0.2)
+
+    store.create_scan("s1", "scan")
+    asyncio.run(scan())
+    # The search running when the scan failed was the last one
+    assert len(searched) == 1
+    # The scan is over for the store and the UI
+    scan = store.get_scan("s1")
+    assert scan["status"] == "failed" and scan["summary"]["error"] == "browser crashed"
+    assert messages[-1] == {"type": "scan_failed", "data": {"scan_id": "s1", "message": "Scan failed: browser crashed"}}
@@ -0,0 +1,67 @@
+import os
+import math
+import random
+import string
+from collections import Counter
+import pytest
+from modules.ai_analyzer import AIAnalyzer
+from modules.entropy_detector import EntropyDetector
+
+def shannon(token):
+    counts = Counter(token)
+    return -sum(c / len(token) * math.log2(c / len(token)) for c in counts.values())
+
+def random_token(rng, length, alphabet=string.ascii_letters + string.digits):
+    return "".join(rng.choice(alphabet) for _ in range(length))
+
+def test_vectorized_stats_match_reference():
+    rng = random.Random(7)
+    tokens = [random_token(rng, rng.randint(20, 80)) for _ in range(50)] + ["zzzzzzzzzzzzzzzzzzzz", "0123456789abcdef0123"]
+    lengths, entropy, classes, is_hex = EntropyDetector().token_stats(tokens)
+    for i, token in enumerate(tokens):
+        assert lengths[i] == len(token)
+        assert entropy[i] == pytest.approx(shannon(token), abs=1e-9)
+        assert classes[i].sum() == len(token)
+    assert list(is_hex[-2:]) == [False, True]
+
+def test_random_secrets_found_and_prose_ignored():
+    rng = random.Random(1)
+    secret = random_token(rng, 37) + "Q7z"
+    text = (f"config.api_secret = '{secret}'\n"
+            "AbstractSingletonProxyFactoryBean getElementByIdAndName "
+            "application/x-www-form-urlencoded wp-content/themes/twentytwenty/assets")
+    findings = EntropyDetector().analyze(text)
+    assert [f.match for f in findings] == [secret]
+    assert findings[0].type == "high_entropy_secret" and findings[0].confidence == 0.9
+
+def test_hex_needs_a_secret_hint():
+    rng = random.Random(2)
+    digest = random_token(rng, 64, "0123456789abcdef")
+    key = random_token(rng, 64, "0123456789abcdef")
+    text = f"sha256: {digest}\nencryption_key={key}\ncommit {random_token(rng, 40, '0123456789abcdef')}"
+    assert [f.match for f in EntropyDetector().analyze(text)] == [key]
+
+def test_known_spans_and_batches():
+    rng = random.Random(3)
+    # Fixed suffix guarantees the lower/upper/digit mix every reported token needs
+    tokens = [random_token(rng, 29) + "Q7z" for _ in range(30)]
+    text = " ".join(f"token={t}" for t in tokens)
+    first = text.index(tokens[0])
+    detector = EntropyDetector(batch_size=7)
+    found = detector.analyze(text, known=[(first, first + 32)])
+    assert [f.match for f in found] == tokens[1:]
+    assert detector.scan(text) == EntropyDetector().scan(text)
+
+    # A token inside a long span that has a shorter span nested before it
+    second = text.index(tokens[1])
+    nested = [(first - 6, second + 33), (first + 1, first + 3)]
+    assert [f.match for f in detector.analyze(text, known=nested)] == tokens[2:]
+
+def test_analyzer_reports_entropy_findings_once():
+    analyzer = AIAnalyzer(config_path=os.devnull)
+    rng = random.Random(4)
+    secret = random_token(rng, 33) + "Q7z"
+    text = f"GITHUB_TOKEN=ghp_{random_token(rng, 36)}\nAuthorization: Bearer {secret}"
+    findings = analyzer.analyze({"text": text})
+    assert [f["type"] for f in findings] == ["github_token", "high_entropy_secret"]
+    assert findings[1]["match"] == secret
@@ -0,0 +1,37 @@
+import json
+from modules.findings import Finding, compact, finding_json_default
+
+PAGE = "header line\ncontact: admin@example.com\nfooter"
+
+def test_lazy_match_and_context_match_dict_format():
+    start = PAGE.index("admin@")
+    finding = Finding("email", page=PAGE, start=start, end=start + len("admin@example.com"))
+
+    assert finding["match"] == "admin@example.com"
+    assert finding["context"] == "...header line contact: admin@example.com footer..."
+    assert finding.to_dict() == {
+        "type": "email", "match": "admin@example.com",
+        "context": "...header line contact: admin@example.com footer...", "source": "regex"
+    }
+
+def test_mapping_access_and_serialization():
+    finding = Finding("aws_key", match="AKIA1234567890ABCDEF", context="...")
+    assert "ml_verification" not in finding
+    assert finding.get("confidence", 1.0) == 1.0
+
+    finding["ml_verification"] = {"severity": "HIGH"}
+    finding["confidence"] = 0.9
+    finding["locations"] = ["http://a.example"]
+    assert finding["ml_verification"]["severity"] == "HIGH"
+
+    data = json.loads(json.dumps({"findings": [finding]}, default=finding_json_default))
+    assert data["findings"][0]["confidence"] == 0.9
+    assert data["findings"][0]["locations"] == ["http://a.example"]
+
+def test_compact_detaches_from_large_pages():
+    page = "x" * 10000 + " secret@example.com"
+    start = page.index("secret@")
+    finding = Finding("email", page=page, start=start, end=len(page))
+    compact([finding], page)
+    assert finding._page is None
+    assert finding["match"] == "secret@example.com"
@@ -0,0 +1,71 @@
+import time
+from modules.job_queue import JobQueue
+
+def make_queue(tmp_path, **kwargs):
+    return JobQueue(db_path=str(tmp_path / "jobs.db"), **kwargs)
+
+def test_lease_and_complete(tmp_path):
+    queue = make_queue(tmp_path)
+    queue.enqueue("scan1", "fetch_analyze", {"url": "http://a.example"})
+    queue.enqueue("scan1", "fetch_analyze", {"url": "http://b.example"})
+
+    job = queue.lease("w1")
+    assert job["payload"]["url"] == "http://a.example"
+    assert queue.complete(job["id"], "w1", {"url": "http://a.example", "findings": []})
+    assert queue.outstanding("scan1") == 1
+
+    collected = queue.collect("scan1")
+    assert len(collected) == 1 and collected[0]["result"]["url"] == "http://a.example"
+    assert queue.collect("scan1") == []
+
+def test_cancel_drops_queued_and_running_jobs(tmp_path):
+    queue = make_queue(tmp_path)
+    for url in ("http://a.example", "http://b.example", "http://c.example"):
+        queue.enqueue("scan1", "fetch_analyze", {"url": url})
+    queue.enqueue("scan2", "fetch_analyze", {"url": "http://d.example"})
+    done = queue.lease("w1")
+    queue.complete(done["id"], "w1", {})
+    running = queue.lease("w1")
+
+    assert queue.cancel("scan1") == 2
+    assert queue.outstanding("scan1") == 0 and queue.outstanding("scan2") == 1
+    assert not queue.complete(running["id"], "w1", {})
+    assert [job["status"] for job in queue.collect("scan1")] == ["done"]
+
+def test_expired_lease_is_retried_then_failed(tmp_path):
+    queue = make_queue(tmp_path, lease_seconds=0, max_attempts=2)
+    queue.enqueue("scan1", "fetch_analyze", {"url": "http://a.example"})
+
+    first = queue.lease("crashed-worker")
+    time.sleep(0.01)
+    second = queue.lease("w2")
+    assert second["id"] == first["id"] and second["attempt"] == 2
+    # The crashed worker lost its lease
+    assert not queue.complete(first["id"], "crashed-worker", {})
+
+    time.sleep(0.01)
+    assert queue.lease("w3") is None
+    collected = queue.collect("scan1")
+    assert collected[0]["status"] == "failed"
+
+def test_fail_requeues(tmp_path):
+    queue = make_queue(tmp_path, max_attempts=3)
+    queue.enqueue("scan1", "fetch_analyze", {"url": "http://a.example"})
+    job = queue.lease("w1")
+    assert queue.fail(job["id"], "w1", "driver crashed")
+    assert queue.lease("w2")["id"] == job["id"]
+
+def test_dead_workers_do_not_stall_a_scan(tmp_path):
+    queue = make_queue(tmp_path, lease_seconds=0, max_attempts=1)
+    queue.enqueue("scan1", "fetch_analyze", {"url": "http://a.example"})
+    queue.enqueue("scan1", "fetch_analyze", {"url": "http://b.example"})
+    queue.lease("crashed-worker")
+    time.sleep(0.01)
+    # Settled without another lease() call
+    assert queue.outstanding("scan1") == 1
+    assert [job["error"] for job in queue.collect("scan1")] == ["lease expired"]
+
+    assert queue.idle_seconds() > 0
+    assert queue.abandon("scan1", "no live workers") == 1
+    assert queue.outstanding("scan1") == 0
+    assert [job["status"] for job in queue.collect("scan1")] == ["failed"]
@@ -0,0 +1,21 @@
+from benchmarks.load_test import build_parser, run, check_budgets
+
+def test_load_test_smoke():
+    args = build_parser().parse_args(["--scans", "4", "--clients", "8", "--slow-clients", "2",
+                                      "--urls-per-scan", "3", "--fetch-latency", "0", "--search-latency", "0"])
+    report = run(args)
+    assert report["scans_completed"] == 4 and not report["submit_errors"] and report["client_errors"] == 0
+    assert report["requests"]["submit"]["count"] == 4 and report["requests"]["results_page"]["count"] == 4
+    # Every fast client saw every event, each with a measured lag
+    assert report["events"]["fast_lag"]["count"] == 6 * report["events"]["per_client"]
+    assert report["broadcast"]["count"] == report["events"]["per_client"]
+    assert report["memory"]["rss_end_mb"] > 0
+
+def test_load_budget_check():
+    report = {"scans": 4, "scans_completed": 3, "submit_errors": [],
+              "requests": {"submit": {"p95_ms": 50.0}}, "events": {"fast_lag": {"p95_ms": 1500.0}},
+              "loop": {"max_ms": 10.0, "p99_ms": 5.0, "blocked_ratio": 0.6}, "memory": {"growth_mb": 5.0}}
+    failures = check_budgets(report, {"load_test": {"event_lag_p95_ms": 1000, "memory_growth_mb": 100,
+                                                    "loop_blocked_ratio": 0.5}})
+    assert failures == ["only 3/4 scans finished", "event_lag_p95_ms: 1500.0 exceeds budget 1000",
+                        "loop_blocked_ratio: 0.6 exceeds budget 0.5"]
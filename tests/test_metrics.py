@@ -0,0 +1,35 @@
+from modules.metrics import Counter, Gauge, Histogram, Registry
+
+def test_histogram_renders_cumulative_buckets():
+    registry = Registry()
+    hist = registry.register(Histogram("test_seconds", "Test histogram.", ("stage",), buckets=(0.1, 1.0)))
+    hist.observe(0.05, stage="fetch")
+    hist.observe(0.5, stage="fetch")
+    hist.observe(5.0, stage="fetch")
+
+    text = registry.render()
+    assert '# TYPE test_seconds histogram' in text
+    assert 'test_seconds_bucket{stage="fetch",le="0.1"} 1' in text
+    assert 'test_seconds_bucket{stage="fetch",le="1.0"} 2' in text
+    assert 'test_seconds_bucket{stage="fetch",le="+Inf"} 3' in text
+    assert 'test_seconds_count{stage="fetch"} 3' in text
+
+def test_counter_and_gauge_callbacks():
+    registry = Registry()
+    counter = registry.register(Counter("test_total", "Test counter.", ("type",)))
+    gauge = registry.register(Gauge("test_depth", "Test gauge.", ("queue",)))
+    counter.inc(type="email")
+    counter.inc(2, type="email")
+    gauge.set_function(lambda: 7, queue="fetch")
+
+    text = registry.render()
+    assert 'test_total{type="email"} 3.0' in text
+    assert 'test_depth{queue="fetch"} 7.0' in text
+
+def test_metrics_endpoint():
+    from fastapi.testclient import TestClient
+    import app
+
+    response = TestClient(app.app).get("/metrics")
+    assert response.status_code == 200
+    assert "aegis_stage_duration_seconds" in response.text
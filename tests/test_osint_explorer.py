@@ -0,0 +1,73 @@
+import asyncio
+from modules.osint_explorer import OSINTExplorer, subdomains_from_urls
+
+class FakeShodan:
+    """
+    Local stand-in for shodan.Shodan that serves canned host data.
+    """
+    def __init__(self, hosts):
+        self.hosts = hosts
+        self.calls = []
+
+    def host(self, ip):
+        self.calls.append(ip)
+        return self.hosts[ip]
+
+HOSTS = {
+    "10.0.0.1": {"ports": [80, 443], "org": "Example Org", "os": "Linux", "data": [{"port": 80}]},
+    "10.0.0.2": {"ports": [3306], "vulns": ["CVE-2012-2122"],
+                 "data": [{"port": 3306, "product": "MySQL", "data": "5.5.1\nready"}]},
+    "2001:db8::1": {"ports": [22], "data": [{"port": 22, "product": "OpenSSH"}]},
+}
+DNS = {
+    "example.com": ["10.0.0.1", "2001:db8::1"],
+    "db.example.com": ["10.0.0.2"],
+    "www2.example.com": ["10.0.0.1"],
+}
+
+def make_explorer(**kwargs):
+    backend = FakeShodan(HOSTS)
+    explorer = OSINTExplorer(backend=backend, **kwargs)
+
+    async def fake_resolve(domain):
+        return DNS.get(domain, [])
+    explorer.resolve = fake_resolve
+    return explorer, backend
+
+def test_fan_out_over_subdomains_looks_up_each_ip_once():
+    explorer, backend = make_explorer()
+    result = asyncio.run(explorer.scan_domains(["example.com", "db.example.com", "www2.example.com"]))
+
+    assert sorted(backend.calls) == ["10.0.0.1", "10.0.0.2", "2001:db8::1"]
+    assert result["ip"] == "10.0.0.1, 2001:db8::1"
+    assert result["org"] == "Example Org"
+    assert result["ports"] == [22, 80, 443, 3306]
+    assert result["vulns"] == ["CVE-2012-2122"]
+    assert {e["port"] for e in result["exposures"]} == {22, 3306}
+
+def test_host_cache_respects_ttl():
+    explorer, backend = make_explorer(cache_ttl=3600)
+    asyncio.run(explorer.scan_domains(["example.com"]))
+    asyncio.run(explorer.scan_domains(["example.com"]))
+    assert len(backend.calls) == 2
+
+    explorer, backend = make_explorer(cache_ttl=0)
+    explorer.scan_domain("example.com")
+    explorer.scan_domain("example.com")
+    assert len(backend.calls) == 4
+
+def test_lookup_errors_are_reported_per_host():
+    explorer, backend = make_explorer()
+    backend.hosts = {"10.0.0.1": HOSTS["10.0.0.1"]}
+    result = asyncio.run(explorer.scan_domains(["example.com"]))
+    assert [h["ip"] for h in result["hosts"] if "error" in h] == ["2001:db8::1"]
+    assert result["ports"] == [80, 443]
+
+def test_resolve_real_localhost():
+    explorer = OSINTExplorer(backend=FakeShodan({}))
+    assert "127.0.0.1" in asyncio.run(explorer.resolve("localhost"))
+
+def test_subdomains_from_urls():
+    urls = ["https://example.com/a", "https://www.example.com/b", "http://dev.example.com/x",
+            "https://dev.example.com/y", "https://notexample.com/", "https://cdn.other.org/"]
+    assert subdomains_from_urls(urls, "example.com") == ["dev.example.com"]
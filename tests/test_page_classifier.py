@@ -0,0 +1,99 @@
+import json
+from modules.ai_analyzer import AIAnalyzer
+from modules.page_classifier import PageClassifier
+from modules.report_builder import generate_reports
+from modules.risk_scoring import RiskScorer
+
+class WindowClassifier:
+    """
+    Zero-shot stand-in: a window mentioning a password is a credential leak.
+    """
+    def __init__(self):
+        self.windows = []
+
+    def classify_threat(self, text, max_length=500):
+        self.windows.append(text[:max_length])
+        if "password" in text:
+            labels = [{"label": "credential leak", "confidence": 0.9}]
+        else:
+            labels = [{"label": "benign content", "confidence": 0.8}, {"label": "api key exposure", "confidence": 0.35}]
+        return {"enabled": True, "classifications": labels}
+
+    def analyze_context(self, text, finding):
+        return {"severity": "MEDIUM", "ml_confidence": 0.7}
+
+    def get_severity_score(self, classification):
+        return "HIGH"
+
+def page(filler=2000):
+    return ("intro " * 50 + "x" * filler + " the config file " + "y" * filler
+            + " db password=hunter22 " + "z" * filler)
+
+def test_windows_follow_hotspots_densest_first():
+    classifier = PageClassifier(window_chars=100, max_windows=2)
+    text = page()
+    spots = classifier.hotspots(text, [(text.index("hunter22"), text.index("hunter22") + 8)])
+    windows = classifier.windows(text, spots)
+    assert len(windows) == 2
+    assert windows[0][0] <= text.index("password") < windows[0][1]
+    assert windows[1][0] <= text.index("config") < windows[1][1]
+    assert all(end - start == 100 for start, end in windows)
+
+    assert classifier.windows("plain text", []) == [(0, 10)]
+    # Hotspots in the site template are ignored
+    assert classifier.hotspots(text, [], exclude=lambda start, end: True) == []
+
+def test_classification_stops_at_first_confident_window():
+    engine = WindowClassifier()
+    classifier = PageClassifier(threshold=0.6, window_chars=100, max_windows=4)
+    text = page()
+    # Keywords only: the config window comes first and is benign
+    result = classifier.classify(text, engine, classifier.hotspots(text, []))
+    assert result["label"] == "credential leak" and result["confidence"] == 0.9
+    assert result["windows_classified"] == 2 and result["windows_total"] == 2 and not result["early_exit"]
+    # A regex finding next to the password puts its window first
+    engine.windows = []
+    spans = [(text.index("hunter22"), text.index("hunter22") + 8)]
+    result = classifier.classify(text, engine, classifier.hotspots(text, spans))
+    assert result["early_exit"] and result["windows_classified"] == 1 and len(engine.windows) == 1
+
+    benign = "nothing to see " * 10
+    result = classifier.classify(benign, engine, [])
+    assert result["label"] == "api key exposure" and result["confidence"] == 0.35 and not result["early_exit"]
+
+def test_page_threat_is_scored_and_reported(tmp_path):
+    analyzer = AIAnalyzer(config_path="/dev/null")
+    analyzer.ml_engine = WindowClassifier()
+    analyzer.cascade = None
+    findings = analyzer.analyze({"url": "http://a.example/", "text": page()})
+    threat = next(f for f in findings if f["source"] == "ml_page")
+    assert threat["type"] == "credential_leak" and threat["match"] == "credential leak"
+    assert "password=hunter22" in threat["context"] and threat["severity"] == "HIGH"
+    assert threat["page_classification"]["windows_classified"] == 1
+
+    scorer = RiskScorer({"scoring": {"weights": {"password_alike": 40, "credential_leak": 50}}})
+    without = [f for f in findings if f["source"] != "ml_page"]
+    assert scorer.score(findings)[0] > scorer.score(without)[0]
+
+    json_path, _ = generate_reports([{"url": "http://a.example/", "findings": findings,
+                                      "risk_score": 60, "risk_level": "MEDIUM"}], str(tmp_path))
+    report = json.load(open(json_path))
+    assert report["pages"][0]["classification"] == {"label": "credential leak", "confidence": 0.9}
+
+def test_pages_sharing_a_label_are_separate_exposures(tmp_path):
+    analyzer = AIAnalyzer(config_path="/dev/null")
+    analyzer.ml_engine = WindowClassifier()
+    analyzer.cascade = None
+    results = []
+    for url in ("http://a.example/", "http://a.example/backup"):
+        findings = analyzer.analyze({"url": url, "text": page()})
+        results.append({"url": url, "findings": findings, "risk_score": 60, "risk_level": "MEDIUM"})
+
+    json_path, _ = generate_reports(results, str(tmp_path))
+    report = json.load(open(json_path))
+    leaks = [e for e in report["exposures"] if e["type"] == "credential_leak"]
+    assert sorted(loc["url"] for e in leaks for loc in e["locations"]) == ["http://a.example/", "http://a.example/backup"]
+    assert len(leaks) == 2 and all(e["url_count"] == 1 and e["match"] == "credential leak" for e in leaks)
+    # The same password on both pages is still one exposure
+    assert [e["url_count"] for e in report["exposures"] if e["type"] == "password_alike"] == [2]
+    assert [p["classification"]["label"] for p in report["pages"]] == ["credential leak"] * 2
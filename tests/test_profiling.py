@@ -0,0 +1,30 @@
+from modules.profiling import ScanProfiler
+
+def busy_work():
+    return sum(len(str(i)) for i in range(20000))
+
+def test_sampling_profile_writes_folded_stacks(tmp_path):
+    profiler = ScanProfiler(output_dir=str(tmp_path), label="test", interval=0.001)
+    with profiler:
+        busy_work()
+
+    folded = open(profiler.outputs["folded"]).read().splitlines()
+    assert folded and all(line.rsplit(" ", 1)[1].isdigit() for line in folded)
+    assert any("busy_work" in line for line in folded)
+    assert "Top 25 allocation sites" in open(profiler.outputs["allocations"]).read()
+
+def test_overlapping_profilers_share_tracemalloc(tmp_path):
+    import tracemalloc
+    first = ScanProfiler(output_dir=str(tmp_path / "a"), label="first", interval=0.001).start()
+    second = ScanProfiler(output_dir=str(tmp_path / "b"), label="second", interval=0.001).start()
+    busy_work()
+    first.stop()
+    assert tracemalloc.is_tracing()
+    second.stop()
+    assert not tracemalloc.is_tracing()
+    assert "Top 25 allocation sites" in open(second.outputs["allocations"]).read()
+
+    # Tracing stopped by someone else: the profile is still written
+    profiler = ScanProfiler(output_dir=str(tmp_path / "c"), label="third").start()
+    tracemalloc.stop()
+    assert "not recorded" in open(profiler.stop()["allocations"]).read()
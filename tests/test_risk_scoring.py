@@ -0,0 +1,38 @@
+from modules.risk_scoring import RiskScorer, calculate_risk_score
+
+CONFIG = {
+    "scoring": {
+        "weights": {"email": 10, "aws_key": 50},
+        "max_score": 100,
+        "thresholds": {"high": 60, "medium": 20},
+        "type_caps": {"email": 30},
+    }
+}
+
+def test_matches_legacy_scoring_without_caps():
+    findings = [
+        {"type": "aws_key"},
+        {"type": "email", "confidence": 0.5},
+        {"type": "unknown_type", "ml_verification": {"severity": "LOW", "context_verified": False}},
+    ]
+    # 50 + 10 * 0.5 + 10 (default weight) * 0.5 * 0.3
+    assert calculate_risk_score(findings, {"scoring": {"weights": {"email": 10, "aws_key": 50}}}) == (56, "MEDIUM")
+
+def test_type_caps_and_thresholds():
+    scorer = RiskScorer(CONFIG)
+    emails = [{"type": "email"} for _ in range(500)]
+    assert scorer.score(emails) == (30, "MEDIUM")
+    assert scorer.score(emails + [{"type": "aws_key"}]) == (80, "HIGH")
+    assert scorer.score([]) == (0, "NONE")
+
+def test_repeat_decay_counts_strongest_first():
+    config = {"scoring": {"weights": {"aws_key": 50}, "repeat_decay": 0.5}}
+    scorer = RiskScorer(config)
+    findings = [{"type": "aws_key", "confidence": 0.2}, {"type": "aws_key", "confidence": 1.0}]
+    # 50 * 1.0 + 50 * 0.2 * 0.5
+    assert scorer.score(findings)[0] == 55
+
+def test_batch_matches_single_page_scores():
+    scorer = RiskScorer(CONFIG)
+    pages = [[{"type": "email"}] * 5, [], [{"type": "aws_key"}, {"type": "new_type"}]]
+    assert scorer.score_batch(pages) == [scorer.score(page) for page in pages]
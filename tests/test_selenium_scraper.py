@@ -0,0 +1,128 @@
+import time
+from modules.selenium_scraper import SeleniumScraper
+from modules.concurrency import ConcurrencyLimits
+
+class FakeDriver:
+    """
+    Stand-in for a Chrome WebDriver: records CDP commands and reports a page
+    whose resources keep loading for a few polls.
+    """
+    def __init__(self, loading_polls=2, resource_polls=3, status=200):
+        self.cdp = []
+        self.status = status
+        self.loading_polls = loading_polls
+        self.resource_polls = resource_polls
+        self.resources = 0
+
+    def execute_cdp_cmd(self, cmd, params):
+        self.cdp.append((cmd, params))
+
+    def set_page_load_timeout(self, seconds):
+        self.page_load_timeout = seconds
+
+    def get(self, url):
+        self.url = url
+
+    def execute_script(self, script):
+        if "readyState" in script:
+            self.loading_polls -= 1
+            return "loading" if self.loading_polls >= 0 else "interactive"
+        if "responseStatus" in script:
+            return self.status
+        if self.resource_polls > 0:
+            self.resource_polls -= 1
+            self.resources += 1
+        return self.resources
+
+    def get_screenshot_as_png(self):
+        return b"png"
+
+    @property
+    def page_source(self):
+        return "<html><body><p>DB_PASSWORD=x</p><script>var a;</script></body></html>"
+
+def test_blocking_patterns_and_options():
+    scraper = SeleniumScraper(block_resources=("font",), block_domains=("doubleclick.net",))
+    assert scraper.blocked_urls() == [
+        "*.woff", "*.woff?*", "*.woff2", "*.woff2?*", "*.ttf", "*.ttf?*", "*.otf", "*.otf?*", "*.eot", "*.eot?*",
+        "*://doubleclick.net/*", "*://*.doubleclick.net/*",
+    ]
+    options = SeleniumScraper().chrome_options()
+    assert options.page_load_strategy == "eager"
+    assert {"--disable-extensions", "--disable-gpu"} <= set(options.arguments)
+    assert options.experimental_options["prefs"]["profile.managed_default_content_settings.images"] == 2
+    assert "prefs" not in SeleniumScraper(block_resources=()).chrome_options().experimental_options
+
+def test_blocked_urls_sent_over_cdp():
+    scraper = SeleniumScraper()
+    scraper.driver = FakeDriver()
+    scraper._apply_blocking()
+    assert scraper.driver.cdp[0] == ("Network.enable", {})
+    cmd, params = scraper.driver.cdp[1]
+    assert cmd == "Network.setBlockedURLs" and "*.png" in params["urls"] and "*://*.hotjar.com/*" in params["urls"]
+
+def test_fetch_waits_for_dom_not_a_fixed_sleep():
+    scraper = SeleniumScraper(rate_limit_delay=0.3, screenshots=False)
+    scraper.driver = FakeDriver()
+    start = time.monotonic()
+    content = scraper.fetch_content("http://a.example/")
+    assert time.monotonic() - start < 0.3
+    assert content["text"] == "DB_PASSWORD=x" and content["screenshot"] is None
+    assert scraper.driver.loading_polls < 0
+
+    # The delay is a minimum interval between page loads
+    scraper.fetch_content("http://b.example/")
+    assert time.monotonic() - start >= 0.3
+
+def test_network_idle_wait():
+    scraper = SeleniumScraper(wait_for="network_idle", network_idle_ms=100)
+    scraper.driver = FakeDriver(loading_polls=0, resource_polls=3)
+    content = scraper.fetch_content("http://a.example/")
+    assert scraper.driver.resources == 3 and scraper.driver.resource_polls == 0
+    assert content["screenshot"] == "cG5n"
+
+def test_from_config():
+    scraper = SeleniumScraper.from_config({"headless": False, "timeout": 5, "rate_limit_delay": 1,
+                                           "page_load_strategy": "normal", "block_domains": []})
+    assert (scraper.headless, scraper.timeout, scraper.page_load_strategy) == (False, 5, "normal")
+    assert scraper.block_domains == () and "image" in scraper.block_resources
+
+def test_host_limit_replaces_fixed_delay_and_backs_off_on_429():
+    limits = ConcurrencyLimits.from_config({"hosts": {"initial": 2}, "pause_seconds": 0})
+    scraper = SeleniumScraper(rate_limit_delay=5, screenshots=False, limits=limits)
+    scraper.driver = FakeDriver()
+    start = time.monotonic()
+    scraper.fetch_content("http://a.example/1")
+    scraper.fetch_content("http://a.example/2")
+    assert time.monotonic() - start < 1
+    assert limits.host("http://a.example/").limit > 2
+
+    scraper.driver.status = 429
+    scraper.fetch_content("http://a.example/3")
+    assert limits.host("http://a.example/").capacity == 1
+    assert limits.host("http://b.example/").capacity == 2
+
+def test_waiting_for_a_host_slot_is_not_the_fetch_timeout():
+    import threading
+    limits = ConcurrencyLimits.from_config({"hosts": {"initial": 1, "max": 1}})
+    scraper = SeleniumScraper(screenshots=False, limits=limits)
+    scraper.driver = FakeDriver()
+    host = limits.host("http://a.example/")
+    assert host.acquire()
+    threading.Timer(0.3, host.cancel).start()
+    assert scraper.fetch_content("http://a.example/", timeout=0.1)["text"] == "DB_PASSWORD=x"
+
+    # A slot the caller already holds is used and released by the fetch
+    assert host.acquire(timeout=0)
+    assert scraper.fetch_content("http://a.example/", timeout=0.1, held_slot=host)
+    assert host.in_flight == 0
+
+    # ... also when the browser cannot even start
+    def broken_driver():
+        raise ImportError("No module named 'selenium'")
+
+    scraper.driver = None
+    scraper._init_driver = broken_driver
+    assert host.acquire(timeout=0)
+    assert scraper.fetch_content("http://a.example/", held_slot=host) is None
+    assert host.in_flight == 0
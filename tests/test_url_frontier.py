@@ -0,0 +1,49 @@
+import asyncio
+from modules.dork_loader import parse_dorks, load_dorks
+from modules.url_frontier import UrlFrontier
+
+def test_parse_dorks_skips_comments_and_duplicates():
+    lines = ["# admin panels\n", "site:example.com inurl:admin\n", "\n", "  site:example.com inurl:admin  \n", "ext:env\n"]
+    assert list(parse_dorks(lines)) == ["site:example.com inurl:admin", "ext:env"]
+
+def test_load_dorks_uses_shared_parser(tmp_path):
+    path = tmp_path / "dorks.txt"
+    path.write_text("# comment\next:sql\next:sql\n")
+    assert load_dorks(str(path)) == ["ext:sql"]
+
+def test_frontier_streams_until_closed():
+    async def scenario():
+        frontier = UrlFrontier()
+        received = []
+
+        async def consumer():
+            async for url in frontier:
+                received.append(url)
+
+        task = asyncio.create_task(consumer())
+        assert frontier.put("http://a.example")
+        await asyncio.sleep(0)
+        assert received == ["http://a.example"]
+
+        assert not frontier.put("http://a.example")
+        frontier.put("http://b.example")
+        frontier.close()
+        assert not frontier.put("http://c.example")
+        await task
+        return received, frontier
+
+    received, frontier = asyncio.run(scenario())
+    assert received == ["http://a.example", "http://b.example"]
+    assert frontier.drained and len(frontier) == 2
+
+def test_frontier_round_robin_by_group():
+    frontier = UrlFrontier(max_per_group=3)
+    for i in range(5):
+        frontier.put(f"http://big.example/{i}", group="big.example")
+    frontier.put("http://small.example/", group="small.example")
+    frontier.put("http://other.example/", group="other.example")
+    frontier.close()
+    order = [frontier.get_nowait() for _ in range(frontier.pending)]
+    assert order == ["http://big.example/0", "http://small.example/", "http://other.example/",
+                     "http://big.example/1", "http://big.example/2"]
+    assert frontier.group_of("http://small.example/") == "small.example" and frontier.drained
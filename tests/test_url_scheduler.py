@@ -0,0 +1,53 @@
+import asyncio
+from modules.bug_bounty_dorks import get_bug_bounty_dorks, get_categorized_bug_bounty_dorks, get_dork_categories
+from modules.job_queue import JobQueue
+from modules.url_frontier import UrlFrontier
+from modules.url_scheduler import UrlPriorityModel, categorize_dork
+
+def test_categorized_dorks_match_plain_list():
+    pairs = get_categorized_bug_bounty_dorks("example.com")
+    assert [dork for _, dork in pairs] == get_bug_bounty_dorks("example.com")
+    assert {category for category, _ in pairs} <= set(get_dork_categories())
+
+def test_categorize_uploaded_dorks():
+    assert categorize_dork("site:example.com ext:env") == "config_files"
+    assert categorize_dork("site:example.com filetype:sql") == "databases"
+    assert categorize_dork('intitle:"index of" site:example.com') == "directories"
+    assert categorize_dork("site:example.com") is None
+
+def test_model_ranks_risky_urls_first():
+    model = UrlPriorityModel()
+    assert model.score("http://x.example/backup/db.sql", "databases") > model.score("http://x.example/about", "databases")
+    assert model.score("http://x.example/.env", "config_files") > model.score("http://x.example/.env", "documents")
+
+def test_history_shifts_category_score(tmp_path):
+    path = tmp_path / "stats.json"
+    model = UrlPriorityModel(stats_path=str(path))
+    prior = model.category_score("subdomains")
+    for _ in range(20):
+        model.record("subdomains", True)
+    assert model.category_score("subdomains") > prior
+    model.save()
+    assert UrlPriorityModel(stats_path=str(path)).category_score("subdomains") == model.category_score("subdomains")
+
+def test_frontier_hands_out_highest_priority_first():
+    async def scenario():
+        frontier = UrlFrontier(UrlPriorityModel())
+        frontier.put("http://x.example/contact", "subdomains")
+        frontier.put("http://x.example/about", "subdomains")
+        frontier.put("http://x.example/.env", "config_files")
+        frontier.close()
+        return [url async for url in frontier], frontier
+
+    order, frontier = asyncio.run(scenario())
+    # Equal priorities keep arrival order
+    assert order == ["http://x.example/.env", "http://x.example/contact", "http://x.example/about"]
+    assert frontier.category_of("http://x.example/.env") == "config_files"
+
+def test_job_queue_leases_by_priority(tmp_path):
+    queue = JobQueue(db_path=str(tmp_path / "jobs.db"))
+    queue.enqueue("scan", "fetch_analyze", {"url": "low"}, priority=0.2)
+    queue.enqueue("scan", "fetch_analyze", {"url": "high"}, priority=1.4)
+    assert queue.lease("w1")["payload"]["url"] == "high"
+    assert queue.lease("w1")["payload"]["url"] == "low"
+    queue.close()
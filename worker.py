@@ -0,0 +1,124 @@
+"""
+Aegis Scan Worker
+Pulls URL fetch/analyze jobs from the API node's job queue, runs them with a
+local browser and analyzer, and pushes the results back.
+
+Usage:
+    python worker.py --api http://api-node:8000 [--worker-id NAME]
+"""
+import os
+import time
+import socket
+import argparse
+import requests
+import yaml
+
+from modules.selenium_scraper import SeleniumScraper
+from modules.ai_analyzer import AIAnalyzer
+from modules.risk_scoring import RiskScorer
+from modules.deadlines import PageBudget
+from modules.concurrency import ConcurrencyLimits
+from modules.utils import log_info, log_error, log_success
+
+
+class ScanWorker:
+    def __init__(self, api_url, worker_id, config, poll_interval=2):
+        self.api_url = api_url.rstrip("/")
+        self.worker_id = worker_id
+        self.config = config
+        self.poll_interval = poll_interval
+        self.headers = {}
+        if os.getenv("WORKER_TOKEN"):
+            self.headers["X-Worker-Token"] = os.getenv("WORKER_TOKEN")
+
+        # Adaptive limits are per worker process; each worker backs off on its own
+        concurrency_settings = config.get("concurrency", {})
+        limits = ConcurrencyLimits.from_config(concurrency_settings) if concurrency_settings.get("enabled", True) else None
+        self.scraper = SeleniumScraper.from_config(config["scraper"], limits=limits)
+        self.analyzer = AIAnalyzer(concurrency=limits)
+        self.scan_id = None  # scan whose pages the analyzer has seen
+        self.risk_scorer = RiskScorer(config)
+
+    def _post(self, path, body):
+        response = requests.post(f"{self.api_url}{path}", json=body, headers=self.headers, timeout=30)
+        response.raise_for_status()
+        return response.json()
+
+    def run_job(self, job):
+        """
+        Fetches and analyzes a single URL. Returns the scan result, or None if
+        the page could not be fetched.
+        """
+        url = job["payload"]["url"]
+        if job.get("scan_id") != self.scan_id:
+            # Verdicts and site templates of one scan are not carried into another
+            self.analyzer.reset()
+            self.scan_id = job.get("scan_id")
+        # Per-page time limits of the scan, if it has any
+        limits = job["payload"].get("limits", {})
+        content = self.scraper.fetch_content(url, limits.get("fetch"))
+        if not content:
+            return None
+
+        budget = PageBudget(limits.get("analysis"), limits.get("vision"))
+        findings = self.analyzer.analyze(content, budget)
+        score, level = self.risk_scorer.score(findings)
+        result = {
+            "url": url,
+            "findings": [finding.to_dict() for finding in findings],
+            "risk_score": score,
+            "risk_level": level
+        }
+        skipped = (["fetch"] if content.get("partial") else []) + budget.skipped
+        if skipped:
+            result["skipped"] = skipped
+        return result
+
+    def run_forever(self):
+        log_info(f"Worker {self.worker_id} polling {self.api_url}")
+        try:
+            while True:
+                try:
+                    job = self._post("/jobs/lease", {"worker_id": self.worker_id}).get("job")
+                except requests.RequestException as e:
+                    log_error(f"Could not reach API node: {e}")
+                    time.sleep(self.poll_interval)
+                    continue
+
+                if not job:
+                    time.sleep(self.poll_interval)
+                    continue
+
+                log_info(f"Job {job['id']} (attempt {job['attempt']}): {job['payload']['url']}")
+                try:
+                    result = self.run_job(job)
+                    self._post(f"/jobs/{job['id']}/complete", {"worker_id": self.worker_id, "result": result or {}})
+                    log_success(f"Job {job['id']} done")
+                except Exception as e:
+                    log_error(f"Job {job['id']} failed: {e}")
+                    try:
+                        self._post(f"/jobs/{job['id']}/fail", {"worker_id": self.worker_id, "error": str(e)})
+                    except requests.RequestException:
+                        pass
+        except KeyboardInterrupt:
+            log_info("Worker stopping")
+        finally:
+            self.scraper.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Aegis distributed scan worker")
+    parser.add_argument("--api", default=os.getenv("AEGIS_API_URL", "http://localhost:8000"), help="Base URL of the API node")
+    parser.add_argument("--worker-id", default=f"{socket.gethostname()}-{os.getpid()}", help="Unique worker name")
+    parser.add_argument("--config", default="config.yaml", help="Path to config.yaml")
+    args = parser.parse_args()
+
+    with open(args.config, "r") as f:
+        config = yaml.safe_load(f)
+
+    poll_interval = config.get("workers", {}).get("poll_interval", 2)
+    ScanWorker(args.api, args.worker_id, config, poll_interval=poll_interval).run_forever()
+
+
+if __name__ == "__main__":
+    main()